@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""
+Hot path benchmark: times the packet generation, fading, error checking and
+statistics of the simulator, and a full packet loop, over a grid of packet
+sizes and values of p. Results are saved as JSON, and can be compared with
+a baseline saved by an earlier run, so that drops of packets/sec show up as
+regressions.
+
+Usage: python hot_path.py [--n-bits N ...] [--p P ...] [--repeat R]
+                          [--output FILE] [--baseline FILE] [--tolerance T]
+
+Created on Sun Oct 18 22:14:07 2026
+
+@author: Calil
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import numpy as np
+
+# Root and source directories of the simulator
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROOT_DIR = os.path.dirname(SRC_DIR)
+for path in [ROOT_DIR, SRC_DIR]:
+    if path not in sys.path:
+        sys.path.append(path)
+
+from source import Source
+from channel import Channel
+from statistics import Statistics
+from simulation_thread import SimulationThread
+from src.parameters.config import SimConfig
+from src.support.enumerations import ChannelModel
+from src.support.enumerations import EngineType
+from src.support.enumerations import PlotMode
+
+# Default grid of packet sizes and values of p
+N_BITS = [100, 1000, 10000]
+P_VALS = [1e-6, 1e-4, 1e-2]
+
+# Packets per call of the batch benchmarks
+N_PCKS = 1000
+
+# Replications passed to conf_interval
+N_REPS = 100
+
+def time_call(func,repeat,min_time = 0.05):
+    """
+    Times a function, timeit style: the function is called in loops long
+    enough to be measured, and the best loop is kept, as the one least
+    disturbed by other processes.
+
+    Keyword arguments:
+        func -- function without arguments
+        repeat -- number of timed loops
+        min_time -- minimum duration of a loop, in seconds
+
+    Returns:
+        elapsed -- best time per call, in seconds
+    """
+    # Calls per loop, grown until a loop lasts min_time
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for k in range(0,number):
+            func()
+        if time.perf_counter() - start >= min_time:
+            break
+        number = 2*number
+
+    best = np.inf
+    for r in range(0,repeat):
+        start = time.perf_counter()
+        for k in range(0,number):
+            func()
+        best = min(best,(time.perf_counter() - start)/number)
+    return best
+
+def run_loop(sim):
+    """
+    Runs the packet loop of a simulation, and closes its iteration, as
+    seed_loop() does after each replication, so that packet counts do not
+    pile up across timed calls.
+
+    Keyword arguments:
+        sim -- SimulationThread object
+    """
+    sim.pck_loop()
+    sim.stat.calc_iteration_results()
+
+def make_cases(n_bits,p_val):
+    """
+    Builds the benchmark cases of a grid point. Fading may flip the bits
+    of its input in place, so fade cases fade a copy of the packets, and
+    the copy is timed too.
+
+    Keyword arguments:
+        n_bits -- number of bits per packet
+        p_val -- BER of channel
+
+    Returns:
+        cases -- list of (name, function, packets per call) tuples
+    """
+    config = SimConfig(n_bits = n_bits,p = [p_val])
+    station = Source(n_bits,1)
+    pck = station.generate_packet()
+    pcks = station.generate_batch(N_PCKS)
+    stat = Statistics(n_bits,config.tx_rate,config.conf)
+    reps = np.random.RandomState(1).rand(N_REPS)
+
+    cases = [('generate_packet', station.generate_packet, 1),
+             ('generate_batch', lambda: station.generate_batch(N_PCKS), \
+              N_PCKS),
+             ('calculate_error', lambda: station.calculate_error(pcks), \
+              N_PCKS),
+             ('conf_interval', lambda: stat.conf_interval(reps), 0)]
+
+    for model in ChannelModel:
+        chann = Channel(model,1,p_val,config.fade_mode,config.sparse_max_p,\
+                        n_bits = n_bits,transition_mtx = config.transition_mtx)
+        name = 'fade_' + model.name.lower()
+        cases.append((name, lambda chann = chann: chann.fade(pck.copy()), 1))
+        cases.append((name + '_batch', \
+                      lambda chann = chann: chann.fade(pcks.copy()),N_PCKS))
+
+    for engine in EngineType:
+        sim = SimulationThread(config.replace(engine = engine,\
+                                              n_pcks = N_PCKS,\
+                                              plot_mode = PlotMode.NONE),"")
+        cases.append(('pck_loop_' + engine.name.lower(), \
+                      lambda sim = sim: run_loop(sim),N_PCKS))
+    return cases
+
+def run_benchmarks(n_bits_list,p_list,repeat,min_time = 0.05,names = None):
+    """
+    Runs the benchmark cases over a grid of packet sizes and values of p.
+
+    Keyword arguments:
+        n_bits_list -- list of packet sizes
+        p_list -- list of values of p
+        repeat -- number of timed loops per case
+        min_time -- minimum duration of a loop, in seconds
+        names -- list of case names to run, all if None
+
+    Returns:
+        results -- list of dictionaries with case name, n_bits, p, seconds
+                   per call and packets per second (None for cases that
+                   do not handle packets)
+    """
+    results = []
+    for n_bits in n_bits_list:
+        for p_val in p_list:
+            for name, func, n_pcks in make_cases(n_bits,p_val):
+                if names is not None and name not in names:
+                    continue
+                elapsed = time_call(func,repeat,min_time)
+                results.append({'name': name,
+                                'n_bits': n_bits,
+                                'p': p_val,
+                                'sec_per_call': elapsed,
+                                'pcks_per_sec': n_pcks/elapsed if n_pcks \
+                                                else None})
+    return results
+
+def save_results(file_name,results):
+    """
+    Saves benchmark results as JSON, with the versions they were run with.
+
+    Keyword arguments:
+        file_name -- output file
+        results -- list returned by run_benchmarks()
+    """
+    with open(file_name,'w') as f:
+        json.dump({'python': platform.python_version(),
+                   'numpy': np.__version__,
+                   'machine': platform.machine(),
+                   'results': results},f,indent = 1)
+
+def load_results(file_name):
+    """Loads benchmark results saved by save_results()."""
+    with open(file_name) as f:
+        return json.load(f)['results']
+
+def compare(results,baseline,tolerance = 0.1):
+    """
+    Compares benchmark results with a baseline. Cases are matched by name,
+    n_bits and p, and cases missing from either are ignored.
+
+    Keyword arguments:
+        results -- list returned by run_benchmarks()
+        baseline -- list of baseline results
+        tolerance -- largest relative slowdown not taken as regression
+
+    Returns:
+        rows -- list of (name, n_bits, p, speedup, regression) tuples, where
+                speedup is the baseline time per call over the current one
+    """
+    base = {(res['name'], res['n_bits'], res['p']): res['sec_per_call'] \
+            for res in baseline}
+    rows = []
+    for res in results:
+        key = (res['name'], res['n_bits'], res['p'])
+        if key not in base:
+            continue
+        speedup = base[key]/res['sec_per_call']
+        rows.append(key + (speedup, speedup < 1.0/(1.0 + tolerance)))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Hot path benchmark')
+    parser.add_argument('--n-bits',type = int,nargs = '+',default = N_BITS,\
+                        help = 'packet sizes')
+    parser.add_argument('--p',type = float,nargs = '+',default = P_VALS,\
+                        help = 'values of p')
+    parser.add_argument('--case',nargs = '+',default = None,\
+                        help = 'case names to run, all by default')
+    parser.add_argument('--repeat',type = int,default = 5,\
+                        help = 'number of timed loops per case')
+    parser.add_argument('--output',default = None,\
+                        help = 'JSON file where results are saved')
+    parser.add_argument('--baseline',default = None,\
+                        help = 'JSON file of results compared against')
+    parser.add_argument('--tolerance',type = float,default = 0.1,\
+                        help = 'largest relative slowdown not taken as '\
+                               'regression')
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.n_bits,args.p,args.repeat,\
+                             names = args.case)
+    print("{:<22} {:>7} {:>8} {:>12} {:>14}".format("case","n_bits","p",\
+          "time [us]","packets/sec"))
+    for res in results:
+        pcks_per_sec = '-' if res['pcks_per_sec'] is None else \
+                       "{:.4g}".format(res['pcks_per_sec'])
+        print("{:<22} {:>7} {:>8.0e} {:>12.2f} {:>14}".format(res['name'],\
+              res['n_bits'],res['p'],1e6*res['sec_per_call'],pcks_per_sec))
+    if args.output is not None:
+        save_results(args.output,results)
+
+    if args.baseline is None:
+        return 0
+    rows = compare(results,load_results(args.baseline),args.tolerance)
+    print("\n{:<22} {:>7} {:>8} {:>10}".format("case","n_bits","p",\
+                                                "speedup"))
+    for name, n_bits, p_val, speedup, regression in rows:
+        print("{:<22} {:>7} {:>8.0e} {:>10.2f} {}".format(name,n_bits,p_val,\
+              speedup,'REGRESSION' if regression else ''))
+    return 1 if any(row[-1] for row in rows) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+Startup time benchmark: measures the import time of the simulator modules in
+fresh interpreters, and checks which heavy dependencies they load. The
+import time of the heavy dependencies themselves is measured for reference,
+as the cost an eager import would add to every process.
+
+Usage: python startup.py [--repeat N]
+
+Created on Sun Oct 18 19:22:51 2026
+
+@author: Calil
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+import numpy as np
+
+# Root and source directories of the simulator
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROOT_DIR = os.path.dirname(SRC_DIR)
+
+# Modules whose import time is measured
+MODULES = ['simulation_thread', 'statistics', 'results']
+
+# Heavy dependencies, loaded only when needed
+HEAVY_MODULES = ['scipy.stats', 'matplotlib.pyplot', 'numba']
+
+# Code run in a fresh interpreter: prints import time and loaded modules
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [name for name in {heavy} if name in sys.modules]
+print(elapsed, ','.join(heavy))
+"""
+
+def import_time(module,repeat):
+    """
+    Measures the import time of a module in fresh interpreters.
+    
+    Keyword arguments:
+        module -- module name
+        repeat -- number of interpreters
+        
+    Returns:
+        elapsed -- median import time, in seconds
+        heavy -- list of heavy dependencies loaded by module
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([ROOT_DIR, SRC_DIR])
+    times = []
+    for k in range(0,repeat):
+        out = subprocess.run([sys.executable,'-c',\
+                              PROBE.format(module = module,\
+                                           heavy = HEAVY_MODULES)],\
+                             env = env,cwd = SRC_DIR,check = True,\
+                             capture_output = True,text = True).stdout
+        elapsed, heavy = out.split()[0], out.split()[1:]
+        times.append(float(elapsed))
+    return float(np.median(times)), heavy[0].split(',') if heavy else []
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Startup time benchmark')
+    parser.add_argument('--repeat',type = int,default = 5,\
+                        help = 'number of fresh interpreters per module')
+    args = parser.parse_args()
+    
+    print("{:<20} {:>10}   {}".format("module","time [ms]","heavy modules"))
+    for module in MODULES + HEAVY_MODULES:
+        elapsed, heavy = import_time(module,args.repeat)
+        print("{:<20} {:>10.1f}   {}".format(module,1e3*elapsed,\
+                                              ', '.join(heavy) or '-'))
+
+if __name__ == '__main__':
+    main()
@@ -2,8 +2,6 @@
 """
 Channel class, which implements three different channel models.
 
-TODO Implement Markov channel
-
 Created on Mon Mar 27 09:16:52 2017
 
 @author: Calil
@@ -11,52 +9,252 @@ Created on Mon Mar 27 09:16:52 2017
 
 import numpy as np
 
+from theoretical import is_bias
 from src.support.enumerations import ChannelModel
+from src.support.enumerations import FadeMode
+from src.support import bits
+from src.support import rng
+from src.support.enumerations import RngType
 
 class Channel(object):
     
-    def __init__(self,model,seed,p_val):
+    # Number of error gaps drawn at a time by the sparse fading method
+    SPARSE_CHUNK = 256
+    
+    # Maximum number of uniforms drawn at a time to fade packed packets
+    PACKED_CHUNK = 2**22
+    
+    def __init__(self,model,seed,p_val,fade_mode = FadeMode.DENSE,\
+                 sparse_max_p = 5e-2,packed = False,n_bits = None,\
+                 rng_type = RngType.LEGACY,uniform_dtype = np.float64,\
+                 transition_mtx = None,importance_sampling = False):
         """
         Class constructor.
         
         Keyword arguments:
             model -- channel model (IDEAL, CONSTANT or MARKOV)
-            seed -- seed for random number generator
+            seed -- seed for random number generator, integer or numpy
+                    SeedSequence
             p_val -- BER for constant channel and state 2 of Markov channel
+            fade_mode -- fading method of constant channel (DENSE, SPARSE 
+                         or AUTO)
+            sparse_max_p -- highest BER faded by SPARSE method in AUTO mode
+            packed -- if True, packets are bit-packed in uint8 words
+            n_bits -- number of bits per packet, needed for packed packets
+            rng_type -- random number generator type
+            uniform_dtype -- dtype of uniforms of DENSE method
+            transition_mtx -- transition matrix of Markov channel, row i
+                              holds the probabilities of leaving state i
+            importance_sampling -- if True, constant channel fades with a
+                                   biased BER, and packets must be weighted
+                                   by likelihood_ratio()
         """
         self.__model = model
         self.__seed = seed
         self.__p_val = p_val
-        self.__rnd_state = np.random.RandomState(seed)
+        self.__fade_mode = fade_mode
+        self.__sparse_max_p = sparse_max_p
+        self.__packed = packed
+        self.__n_bits = n_bits
+        self.__uniform_dtype = uniform_dtype
+        self.__importance_sampling = importance_sampling
+        self.__rnd_state = rng.RandomStream(rng_type,seed)
+        self.__reset_err_stream()
+        
+        if model is ChannelModel.MARKOV and transition_mtx is None:
+            raise ValueError('Markov channel needs a transition matrix!')
+        self.__transition_mtx = None if transition_mtx is None else \
+                                np.asarray(transition_mtx,dtype = np.float64)
+        if self.__transition_mtx is not None:
+            # Cumulative rows, for the inverse-CDF lookup of next states
+            self.__cum_mtx = np.cumsum(self.__transition_mtx,axis = 1)
+            self.__cum_mtx[:,-1] = 1.0
+        self.reset_markov_state()
+        
+        if importance_sampling and n_bits is None:
+            raise ValueError('Importance sampling needs n_bits!')
+        self.__update_bias()
         
     def get_model(self):
         """Returns channel model."""
         return self.__model
     
     def set_seed(self,seed):
-        """Set new seed."""
+        """Set new seed, integer or numpy SeedSequence."""
         self.__seed = seed
         self.__rnd_state.seed(seed)
+        self.__reset_err_stream()
+    
+    def get_rnd_state(self):
+        """Returns the random stream object."""
+        return self.__rnd_state
+    
+    def get_state(self):
+        """
+        Returns a picklable copy of the channel state: seed, p, generator
+        state, error positions drawn ahead by the SPARSE method and Markov
+        state.
+        """
+        return {'seed': self.__seed,
+                'p_val': self.__p_val,
+                'rnd_state': self.__rnd_state.get_state(),
+                'bit_offset': self.__bit_offset,
+                'err_last': self.__err_last,
+                'err_buffer': self.__err_buffer.copy(),
+                'markov_state': self.__markov_state}
+    
+    def set_state(self,state):
+        """Restores a state returned by get_state()."""
+        self.set_seed(state['seed'])
+        self.__p_val = state['p_val']
+        self.__update_bias()
+        self.__rnd_state.set_state(state['rnd_state'])
+        self.__bit_offset = state['bit_offset']
+        self.__err_last = state['err_last']
+        self.__err_buffer = state['err_buffer'].copy()
+        self.__markov_state = state['markov_state']
     
     def get_seed(self):
         """Returns random number generator seed."""
         return self.__seed
     
     def set_p_val(self,p_val):
-        """Set new value of p."""
+        """Set new value of p. The Markov chain restarts from state 0."""
         self.__p_val = p_val
+        self.__update_bias()
+        self.__reset_err_stream()
+        self.reset_markov_state()
         
     def get_p_val(self):
         """Returns current value of p."""
         return self.__p_val
     
+    def get_bias(self):
+        """Returns BER used to fade constant channel."""
+        return self.__bias
+    
+    def is_biased(self):
+        """Returns True if constant channel fades with a biased BER."""
+        return self.__bias != self.get_p_val()
+    
+    def __update_bias(self):
+        """
+        Sets the biased BER of importance sampling for current p. Only the
+        constant channel is biased.
+        """
+        if self.__importance_sampling and \
+           self.get_model() is ChannelModel.CONSTANT:
+            self.__bias = is_bias(self.get_p_val(),self.get_n_bits())
+        else:
+            self.__bias = self.get_p_val()
+    
+    def likelihood_ratio(self,n_errors):
+        """
+        Calculates the importance sampling weights of received packets, the
+        ratio of their probabilities with BER p and with the biased BER.
+        
+        Keyword arguments:
+            n_errors -- number of bit errors of each packet
+            
+        Returns:
+            weights -- weight of each packet, None if channel is not biased
+        """
+        if not self.is_biased():
+            return None
+        p_val = self.get_p_val()
+        q_val = self.get_bias()
+        n_errors = np.asarray(n_errors)
+        log_w = n_errors*np.log(p_val/q_val) + \
+                (self.get_n_bits() - n_errors)*np.log((1 - p_val)/(1 - q_val))
+        return np.exp(log_w)
+    
+    def get_fade_mode(self):
+        """Returns fading method of constant channel."""
+        return self.__fade_mode
+    
+    def get_sparse_max_p(self):
+        """Returns highest BER faded by SPARSE method in AUTO mode."""
+        return self.__sparse_max_p
+    
+    def is_packed(self):
+        """Returns True if packets are bit-packed."""
+        return self.__packed
+    
+    def get_n_bits(self):
+        """Returns number of bits per packet of packed packets."""
+        return self.__n_bits
+    
+    def get_transition_mtx(self):
+        """Returns transition matrix of Markov channel."""
+        return self.__transition_mtx
+    
+    def get_markov_state(self):
+        """Returns current state of Markov channel."""
+        return self.__markov_state
+    
+    def set_markov_state(self,state):
+        """Sets current state of Markov channel."""
+        self.__markov_state = int(state)
+    
+    def reset_markov_state(self):
+        """Restarts the Markov chain from state 0 (Good)."""
+        self.__markov_state = 0
+        
+    def get_state_bers(self):
+        """Returns the BER of each Markov state: Good, Bad and Ugly."""
+        return np.array([0.0, 0.5, self.get_p_val()])
+    
+    def markov_states(self,n_pcks):
+        """
+        Draws the Markov states of the next n_pcks packets at once. Each 
+        uniform maps every state to its next state by an inverse-CDF lookup
+        on the cumulative transition rows. The maps of the packets are 
+        composed with a prefix scan, in log2(n_pcks) vectorized steps, and 
+        applied to the current state. The chain moves one step before 
+        each packet, and its last state is kept for the next call.
+        
+        Keyword arguments:
+            n_pcks -- number of packets
+            
+        Returns:
+            states -- array with the state of each packet
+        """
+        if n_pcks == 0:
+            return np.array([],dtype = np.int64)
+        n_states = len(self.__cum_mtx)
+        u = self.__rnd_state.random(n_pcks)
+        
+        # step[i,s] is the state after packet i, if the state before was s
+        step = np.sum(self.__cum_mtx[np.newaxis,:,:] <= \
+                      u[:,np.newaxis,np.newaxis],axis = 2)
+        np.minimum(step,n_states - 1,out = step)
+        
+        # After the scan, step[i] maps the state before packet 0 to the
+        # state after packet i
+        shift = 1
+        while shift < n_pcks:
+            step[shift:] = np.take_along_axis(step[shift:],step[:-shift],\
+                                              axis = 1)
+            shift = 2*shift
+            
+        states = step[:,self.__markov_state]
+        self.__markov_state = int(states[-1])
+        return states
+    
+    def is_sparse(self):
+        """Returns True if constant channel uses the SPARSE method."""
+        if self.get_fade_mode() is FadeMode.AUTO:
+            return self.get_bias() <= self.get_sparse_max_p()
+        return self.get_fade_mode() is FadeMode.SPARSE
+    
     def fade(self,pck_Tx):
         """
         Applies fade to packet according to channel model, 
-        introducing bit errors.
+        introducing bit errors. A (n_pcks x n_bits) block of packets can also
+        be faded at once.
         
         Keyword arguments:
-            pck_Tx -- transmitted packet
+            pck_Tx -- transmitted packet (or block of packets)
             
         Returns:
             pck_Rx -- received packet
@@ -65,12 +263,58 @@ class Channel(object):
         if self.get_model() is ChannelModel.IDEAL:
             return self.__fade_ideal(pck_Tx)
         elif self.get_model() is ChannelModel.CONSTANT:
-            return self.__fade_constant(pck_Tx,self.get_p_val())
+            if self.is_sparse():
+                return self.__fade_sparse(pck_Tx,self.get_bias())
+            return self.__fade_constant(pck_Tx,self.get_bias())
         elif self.get_model() is ChannelModel.MARKOV:
             return self.__fade_markov(pck_Tx)
         else:
             raise NameError('Unknown channel model!')
         
+    def sample_errors(self,n_pcks,n_bits):
+        """
+        Draws the number of bit errors of n_pcks packets according to 
+        channel model, without generating the packets. Since errors do not
+        depend on packet contents, this is statistically equivalent to 
+        fading and checking the packets bit by bit.
+        
+        Keyword arguments:
+            n_pcks -- number of packets
+            n_bits -- number of bits per packet
+            
+        Returns:
+            n_errors -- array with number of bit errors in each packet
+        """
+        if self.get_model() is ChannelModel.IDEAL:
+            return np.zeros(n_pcks,dtype = np.int64)
+        elif self.get_model() is ChannelModel.CONSTANT:
+            return self.__rnd_state.binomial(n_bits,self.get_bias(),n_pcks)
+        elif self.get_model() is ChannelModel.MARKOV:
+            pck_ber = self.get_state_bers()[self.markov_states(n_pcks)]
+            return self.__rnd_state.binomial(n_bits,pck_ber,n_pcks)
+        else:
+            raise NameError('Unknown channel model!')
+        
+    def packet_bers(self,n_pcks):
+        """
+        Returns the BER of the next n_pcks packets according to channel 
+        model. The Markov chain moves as if the packets were faded.
+        
+        Keyword arguments:
+            n_pcks -- number of packets
+            
+        Returns:
+            pck_ber -- float64 array with the BER of each packet
+        """
+        if self.get_model() is ChannelModel.IDEAL:
+            return np.zeros(n_pcks)
+        elif self.get_model() is ChannelModel.CONSTANT:
+            return np.full(n_pcks,float(self.get_bias()))
+        elif self.get_model() is ChannelModel.MARKOV:
+            return self.get_state_bers()[self.markov_states(n_pcks)]
+        else:
+            raise NameError('Unknown channel model!')
+        
     def __fade_ideal(self,pck_Tx):
         """
         Ideal channel, just returns a copy of transmitted packet
@@ -95,18 +339,136 @@ class Channel(object):
         Returns:
             pck_Rx -- received packet
         """
-        err = 1.0*(self.__rnd_state.rand(len(pck_Tx)) < exp_ber)
+        if self.is_packed():
+            return self.__fade_packed(pck_Tx,exp_ber)
+        
+        err = 1.0*(self.__rnd_state.random(np.shape(pck_Tx),\
+                                           self.__uniform_dtype) < exp_ber)
         pck_Rx = abs(pck_Tx - err)
         return pck_Rx
     
+    def __fade_packed(self,pck_Tx,exp_ber):
+        """
+        Constant channel, with a constant BER, for bit-packed packets. The
+        same uniforms of the unpacked channel are drawn, a few packets at a
+        time, and their packed error mask is XORed with the packets.
+        
+        Keyword arguments:
+            pck_Tx -- transmitted packed packet (or block of packets)
+            exp_ber -- expected bit error rate
+            
+        Returns:
+            pck_Rx -- received packed packet
+        """
+        n_bits = self.get_n_bits()
+        pck_Rx = np.array(pck_Tx,copy = True)
+        rows = pck_Rx.reshape(-1,bits.n_words(n_bits))
+        chunk = max(1,self.PACKED_CHUNK // n_bits)
+        for start in range(0,len(rows),chunk):
+            n_rows = min(chunk,len(rows) - start)
+            err = self.__rnd_state.random((n_rows,n_bits),\
+                                          self.__uniform_dtype) < exp_ber
+            rows[start:start + n_rows] ^= np.packbits(err,axis = -1)
+        return pck_Rx
+    
+    def __fade_sparse(self,pck_Tx,exp_ber):
+        """
+        Constant channel, with a constant BER. Only the positions of the bit
+        errors are drawn, and those bits are flipped in place.
+        
+        Keyword arguments:
+            pck_Tx -- transmitted packet, modified in place
+            exp_ber -- expected bit error rate
+            
+        Returns:
+            pck_Rx -- received packet
+        """
+        pck_Rx = pck_Tx if pck_Tx.flags.c_contiguous else \
+                 np.ascontiguousarray(pck_Tx)
+        if self.is_packed():
+            n_bits = self.get_n_bits()
+            n_pcks = pck_Rx.size // bits.n_words(n_bits)
+            err_pos = self.__next_err_pos(n_pcks*n_bits,exp_ber)
+            bits.flip_bits(pck_Rx,n_bits,err_pos)
+        else:
+            flat = pck_Rx.reshape(-1)
+            err_pos = self.__next_err_pos(len(flat),exp_ber)
+            flat[err_pos] = 1 - flat[err_pos]
+        return pck_Rx
+    
+    def __next_err_pos(self,n_bits,exp_ber):
+        """
+        Returns the positions of bit errors in the next n_bits of the 
+        channel's bit stream. The gaps between errors are geometric, and
+        are drawn in chunks of SPARSE_CHUNK, so that the same errors are 
+        obtained whether the stream is faded packet by packet or in blocks.
+        
+        Keyword arguments:
+            n_bits -- number of bits to be faded
+            exp_ber -- expected bit error rate
+            
+        Returns:
+            err_pos -- array of error positions, relative to first bit
+        """
+        if exp_ber <= 0:
+            return np.array([],dtype = np.int64)
+        
+        end = self.__bit_offset + n_bits
+        chunks = [self.__err_buffer]
+        while self.__err_last < end:
+            gaps = self.__rnd_state.geometric(exp_ber,self.SPARSE_CHUNK)
+            chunks.append(self.__err_last + np.cumsum(gaps))
+            self.__err_last = chunks[-1][-1]
+        if len(chunks) > 1:
+            self.__err_buffer = np.concatenate(chunks)
+            
+        n_err = np.searchsorted(self.__err_buffer,end)
+        err_pos = self.__err_buffer[:n_err] - self.__bit_offset
+        self.__err_buffer = self.__err_buffer[n_err:]
+        self.__bit_offset = end
+        return err_pos
+    
+    def __reset_err_stream(self):
+        """
+        Discards the error positions already drawn by the SPARSE method.
+        """
+        self.__bit_offset = 0
+        self.__err_last = -1
+        self.__err_buffer = np.array([],dtype = np.int64)
+    
     def __fade_markov(self,pck_Tx):
         """
-        Markov chain modeled channel, BER changes for each packet.
+        Markov chain modeled channel, BER changes for each packet. The 
+        states of a whole block are drawn at once, and uniforms are only
+        drawn for the packets out of the Good state, which have no errors.
+        
+        Fading a block draws all states before the uniforms of the packets,
+        while fading packets one by one draws each state right before its
+        packet. The two are statistically equivalent, but do not draw the
+        same errors for the same seed.
         
         Keyword arguments:
-            pck_Tx -- transmitted packet
+            pck_Tx -- transmitted packet (or block of packets)
             
         Returns:
             pck_Rx -- received packet
         """
-        raise NotImplementedError
\ No newline at end of file
+        pck_Rx = np.array(pck_Tx,copy = True)
+        n_cols = bits.n_words(self.get_n_bits()) if self.is_packed() else \
+                 np.shape(pck_Tx)[-1]
+        rows = pck_Rx.reshape(-1,n_cols)
+        
+        pck_ber = self.get_state_bers()[self.markov_states(len(rows))]
+        faded = np.flatnonzero(pck_ber > 0)
+        if len(faded) == 0:
+            return pck_Rx
+        
+        n_bits = self.get_n_bits() if self.is_packed() else n_cols
+        err = self.__rnd_state.random((len(faded),n_bits),\
+                                      self.__uniform_dtype) < \
+              pck_ber[faded,np.newaxis]
+        if self.is_packed():
+            rows[faded] ^= np.packbits(err,axis = -1)
+        else:
+            rows[faded] = abs(rows[faded] - err)
+        return pck_Rx
\ No newline at end of file
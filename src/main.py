@@ -2,17 +2,84 @@
 """
 Main script.
 
+Usage: python main.py [--config FILE] [--set NAME=VALUE ...]
+                      [--checkpoint FILE] [--resume]
+                      [--profile DIR [--profile-point IDX]]
+                      [--queue DIR]
+       python main.py --worker DIR
+
 Created on Mon Apr  3 20:35:22 2017
 
 @author: Calil
 """
 
-from parameters.parameters import Parameters
+import argparse
+
 from simulation_thread import SimulationThread
+from simulation_thread import queue_worker
+from src.parameters.config import SimConfig
+from src.support.profiling import run_profile
+from src.support.enumerations import PlotMode
 
 figs_dir = "figs/"
 
-param = Parameters(1)
-sim_thread = SimulationThread(param,figs_dir)
+parser = argparse.ArgumentParser(description = 'Link level simulator')
+parser.add_argument('--config',default = None,\
+                    help = 'JSON file of parameter values')
+parser.add_argument('--set',nargs = '+',default = [],metavar = 'NAME=VALUE',\
+                    help = 'parameter values, e.g. chan_mod=MARKOV')
+parser.add_argument('--checkpoint',default = None,\
+                    help = 'checkpoint file, saved during simulation')
+parser.add_argument('--resume',action = 'store_true',\
+                    help = 'continue from the checkpoint file')
+parser.add_argument('--profile',default = None,metavar = 'DIR',\
+                    help = 'profile the simulation, writing pstats and '\
+                           'collapsed stacks to DIR')
+parser.add_argument('--profile-point',type = int,default = None,\
+                    metavar = 'IDX',\
+                    help = 'profile only the point IDX of p')
+parser.add_argument('--queue',default = None,metavar = 'DIR',\
+                    help = 'coordinate a sweep over the work queue in DIR')
+parser.add_argument('--worker',default = None,metavar = 'DIR',\
+                    help = 'work for the coordinator of the queue in DIR')
+args = parser.parse_args()
+
+if args.worker is not None:
+    n_units = queue_worker(args.worker)
+    print("Worker done, " + str(n_units) + " units simulated")
+    raise SystemExit(0)
 
-sim_thread.simulate()
\ No newline at end of file
+config = SimConfig() if args.config is None else \
+         SimConfig.from_file(args.config)
+config = SimConfig.from_args(args.set,config)
+if args.checkpoint is not None:
+    config = config.replace(checkpoint_file = args.checkpoint)
+if args.queue is not None:
+    config = config.replace(queue_dir = args.queue)
+if args.resume and config.checkpoint_file is None:
+    parser.error('--resume needs a checkpoint file')
+if args.profile_point is not None and args.profile is None:
+    parser.error('--profile-point needs --profile')
+    
+if args.profile is None:
+    sim_thread = SimulationThread(config,figs_dir)
+    sim_thread.simulate(args.resume)
+    
+    # Wait for figures rendered in background, raising their errors
+    sim_thread.res.wait_plot()
+else:
+    # Worker processes and threads are not profiled, so everything runs in
+    # this one, figures included
+    config = config.replace(n_workers = 1,n_rep_workers = 1,\
+                            plot_mode = PlotMode.SAVE)
+    if args.profile_point is not None:
+        config = config.replace(p = [config.p[args.profile_point]])
+    
+    # Profiles are tagged with the configuration digest
+    tag = config.digest()[:16]
+    sim_thread = SimulationThread(config,figs_dir)
+    out, times = run_profile(sim_thread.simulate,(args.resume,),\
+                             args.profile,tag)
+    print("Profile " + tag + " written to " + args.profile)
+    for name, elapsed in sorted(times.items(),key = lambda item: -item[1]):
+        print("{:<12} {:>10.3f} s".format(name,elapsed))
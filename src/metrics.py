@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+Metrics class: times the stages of the simulation and counts packets, bits
+and replications, exporting snapshots as JSON or in Prometheus text format.
+
+When metrics are off, NullMetrics takes its place: the stages are called
+directly, and nothing is counted or written.
+
+Created on Sun Oct 18 22:48:19 2026
+
+@author: Calil
+"""
+
+import os
+import json
+import time
+
+from src.support.enumerations import MetricsFormat
+
+# Prefix of Prometheus metric names
+PREFIX = 'linklevel'
+
+def make_metrics(param):
+    """
+    Returns the metrics of a simulation: Metrics if param.metrics_file is
+    set, NullMetrics otherwise.
+
+    Keyword parameters:
+        param -- parameters object
+    """
+    if param.metrics_file is None:
+        return NullMetrics()
+    return Metrics(param.metrics_file,param.metrics_format,\
+                   param.metrics_interval,param.n_bits)
+
+def to_prometheus(snapshot):
+    """
+    Formats a snapshot in Prometheus text exposition format.
+
+    Keyword parameters:
+        snapshot -- dictionary returned by Metrics.snapshot()
+    """
+    lines = ['# TYPE ' + PREFIX + '_stage_seconds_total counter']
+    for stage, vals in sorted(snapshot['stages'].items()):
+        lines.append(PREFIX + '_stage_seconds_total{stage="' + stage + \
+                     '"} ' + repr(vals['seconds']))
+    lines.append('# TYPE ' + PREFIX + '_stage_calls_total counter')
+    for stage, vals in sorted(snapshot['stages'].items()):
+        lines.append(PREFIX + '_stage_calls_total{stage="' + stage + \
+                     '"} ' + str(vals['calls']))
+    for name, kind in [('packets_total', 'counter'),
+                       ('bits_total', 'counter'),
+                       ('replications_total', 'counter'),
+                       ('points_total', 'counter'),
+                       ('packets_per_second', 'gauge'),
+                       ('bits_per_second', 'gauge'),
+                       ('elapsed_seconds', 'gauge')]:
+        lines.append('# TYPE ' + PREFIX + '_' + name + ' ' + kind)
+        lines.append(PREFIX + '_' + name + ' ' + repr(snapshot[name]))
+    lines.append('# TYPE ' + PREFIX + '_point_replications gauge')
+    for p_val, n_reps in snapshot['point_replications']:
+        lines.append(PREFIX + '_point_replications{p="' + repr(p_val) + \
+                     '"} ' + str(n_reps))
+    return '\n'.join(lines) + '\n'
+
+class Metrics(object):
+
+    def __init__(self,file_name,metrics_format,interval,n_bits):
+        """
+        Class constructor.
+
+        Keyword parameters:
+            file_name -- file where snapshots are written
+            metrics_format -- MetricsFormat of snapshots
+            interval -- minimum time between snapshots, in seconds
+            n_bits -- number of bits per packet
+        """
+        self.__file_name = file_name
+        self.__format = metrics_format
+        self.__interval = interval
+        self.__n_bits = n_bits
+        self.__exporting = False
+        self.reset()
+
+    def get_file_name(self):
+        """Returns file where snapshots are written."""
+        return self.__file_name
+
+    def is_enabled(self):
+        """Returns True, metrics are collected."""
+        return True
+
+    def reset(self):
+        """Clears timers and counters."""
+        self.__start = time.perf_counter()
+        self.__last_export = time.time()
+        self.__seconds = {}
+        self.__calls = {}
+        self.__n_pcks = 0
+        self.__n_reps = 0
+        self.__point_reps = []
+
+    def start(self):
+        """
+        Starts exporting snapshots, and restarts the clock of elapsed time
+        and rates, so that the time between constructing the simulation and
+        simulating is not counted. Only the simulate() loop exports, so
+        that worker processes never write the snapshot file.
+        """
+        self.__start = time.perf_counter()
+        self.__exporting = True
+
+    def timed(self,stage,func,*args):
+        """
+        Calls a function, adding its wall time to a stage.
+
+        Keyword parameters:
+            stage -- stage name
+            func -- function
+            args -- arguments of function
+
+        Returns:
+            out -- return value of function
+        """
+        start = time.perf_counter()
+        out = func(*args)
+        elapsed = time.perf_counter() - start
+        self.__seconds[stage] = self.__seconds.get(stage,0.0) + elapsed
+        self.__calls[stage] = self.__calls.get(stage,0) + 1
+        return out
+
+    def point_done(self,p_val,reps):
+        """
+        Counts the replications and packets of a finished point. Points
+        simulated in worker processes are counted too.
+
+        Keyword parameters:
+            p_val -- BER of point
+            reps -- list of (rep, seed, per, thrpt, n_pcks, elapsed) tuples
+        """
+        self.__n_reps = self.__n_reps + len(reps)
+        self.__n_pcks = self.__n_pcks + sum(rep[4] for rep in reps)
+        self.__point_reps.append((float(p_val), len(reps)))
+
+    def snapshot(self):
+        """Returns a dictionary with the current timers and counters."""
+        elapsed = time.perf_counter() - self.__start
+        n_bits = self.__n_pcks*self.__n_bits
+        return {'time': time.time(),
+                'elapsed_seconds': elapsed,
+                'stages': {stage: {'seconds': self.__seconds[stage],
+                                   'calls': self.__calls[stage]} \
+                           for stage in self.__seconds},
+                'packets_total': self.__n_pcks,
+                'bits_total': n_bits,
+                'replications_total': self.__n_reps,
+                'points_total': len(self.__point_reps),
+                'packets_per_second': self.__n_pcks/elapsed,
+                'bits_per_second': n_bits/elapsed,
+                'point_replications': list(self.__point_reps)}
+
+    def export(self,force = False):
+        """
+        Writes a snapshot, if at least the export interval passed since the
+        last one. The file is replaced atomically, so readers never see a
+        half written snapshot.
+
+        Keyword parameters:
+            force -- if True, writes even before the interval
+        """
+        if not self.__exporting:
+            return
+        now = time.time()
+        if not force and now - self.__last_export < self.__interval:
+            return
+
+        snapshot = self.snapshot()
+        tmp_name = self.get_file_name() + '.tmp'
+        with open(tmp_name,'w') as f:
+            if self.__format is MetricsFormat.JSON:
+                json.dump(snapshot,f,indent = 1)
+            elif self.__format is MetricsFormat.PROMETHEUS:
+                f.write(to_prometheus(snapshot))
+            else:
+                raise NameError('Unknown metrics format!')
+        os.replace(tmp_name,self.get_file_name())
+        self.__last_export = now
+
+class NullMetrics(object):
+    """
+    Metrics switched off: stages are called directly, and nothing is
+    counted or exported.
+    """
+
+    def is_enabled(self):
+        """Returns False, metrics are not collected."""
+        return False
+
+    def start(self):
+        pass
+
+    def timed(self,stage,func,*args):
+        return func(*args)
+
+    def point_done(self,p_val,reps):
+        pass
+
+    def export(self,force = False):
+        pass
@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""
+SimConfig class: immutable simulation configuration.
+
+A SimConfig holds the same parameters of Parameters, whose class attributes
+are the defaults, but can not be changed after creation. Configurations are
+hashable and comparable, so they can key caches, and only the values that
+differ from the defaults are pickled.
+
+Created on Sun Oct 18 19:48:33 2026
+
+@author: Calil
+"""
+
+import json
+import hashlib
+import numpy as np
+from enum import Enum
+
+from src.parameters.parameters import Parameters
+
+# Parameter names and default values, taken from Parameters class
+DEFAULTS = {name: value for name, value in vars(Parameters).items() \
+            if not name.startswith('_') and \
+            not isinstance(value,(staticmethod,classmethod)) and \
+            not (callable(value) and not isinstance(value,type))}
+
+# Parameters of the transition matrix
+MTX_NAMES = ['P00', 'P01', 'P10', 'P11', 'P20', 'P21']
+
+def freeze(value):
+    """
+    Converts a parameter value to an immutable value: arrays and lists
+    become (nested) tuples and numpy scalars become Python scalars.
+    """
+    if isinstance(value,(np.ndarray,list,tuple)):
+        return tuple(freeze(val) for val in np.asarray(value).tolist()) \
+               if isinstance(value,np.ndarray) else \
+               tuple(freeze(val) for val in value)
+    if isinstance(value,np.generic):
+        return value.item()
+    return value
+
+def key_of(value):
+    """
+    Returns a hashable key of a frozen value. Enumerations are not hashable,
+    since they override __eq__, and are keyed by class and member names.
+    """
+    if isinstance(value,Enum):
+        return (value.__class__.__name__, value.name)
+    if isinstance(value,type):
+        return np.dtype(value).name
+    if isinstance(value,tuple):
+        return tuple(key_of(val) for val in value)
+    return value
+
+def parse_value(name,value):
+    """
+    Converts a value read from a file or command line (JSON types) to the
+    type of the parameter default: enumeration names to members, dtype
+    names to numpy types and lists to arrays.
+
+    Keyword arguments:
+        name -- parameter name
+        value -- value read
+    """
+    default = DEFAULTS[name]
+    if isinstance(default,Enum) and isinstance(value,str):
+        return type(default)[value]
+    if isinstance(default,type) and isinstance(value,str):
+        return np.dtype(value).type
+    if isinstance(default,np.ndarray) and value is not None:
+        return np.array(value,dtype = default.dtype)
+    return value
+
+def make_config(changes):
+    """Creates a SimConfig from its changes, used to unpickle configs."""
+    return SimConfig(**changes)
+
+class SimConfig(object):
+
+    def __init__(self,**changes):
+        """
+        Class constructor. Parameters not given keep their defaults. If
+        any of P00 ... P21 is given, without transition_mtx, the transition
+        matrix is rebuilt from them.
+
+        Keyword parameters:
+            changes -- parameter values, by name
+        """
+        for name in changes:
+            if name not in DEFAULTS:
+                raise NameError('Unknown parameter: ' + name + '!')
+
+        values = {name: freeze(value) for name, value in DEFAULTS.items()}
+        values.update({name: freeze(value) \
+                       for name, value in changes.items()})
+        if 'transition_mtx' not in changes and \
+           any(name in changes for name in MTX_NAMES):
+            values['transition_mtx'] = \
+                ((values['P00'], values['P01'], \
+                  1 - values['P00'] - values['P01']),
+                 (values['P10'], values['P11'], \
+                  1 - values['P10'] - values['P11']),
+                 (values['P20'], values['P21'], \
+                  1 - values['P20'] - values['P21']))
+
+        key = tuple(sorted((name, key_of(value)) \
+                           for name, value in values.items()))
+        object.__setattr__(self,'_SimConfig__values',values)
+        object.__setattr__(self,'_SimConfig__key',key)
+        object.__setattr__(self,'_SimConfig__arrays',{})
+
+    @classmethod
+    def from_parameters(cls,param):
+        """
+        Freezes the current values of a Parameters object.
+
+        Keyword parameters:
+            param -- Parameters object
+        """
+        return cls(**{name: getattr(param,name) for name in DEFAULTS})
+
+    @classmethod
+    def from_dict(cls,values):
+        """
+        Creates a configuration from values read from a file or command
+        line, with enumerations and dtypes given by name.
+
+        Keyword parameters:
+            values -- dictionary of parameter values, by name
+        """
+        for name in values:
+            if name not in DEFAULTS:
+                raise NameError('Unknown parameter: ' + name + '!')
+        return cls(**{name: parse_value(name,value) \
+                      for name, value in values.items()})
+
+    @classmethod
+    def from_file(cls,file_name):
+        """
+        Loads a configuration from a JSON file, an object of parameter
+        values by name.
+
+        Keyword parameters:
+            file_name -- configuration file
+        """
+        with open(file_name) as f:
+            return cls.from_dict(json.load(f))
+
+    @classmethod
+    def from_args(cls,args,base = None):
+        """
+        Creates a configuration from NAME=VALUE strings, e.g. command line
+        arguments. Values are parsed as JSON, or taken as strings.
+
+        Keyword parameters:
+            args -- list of NAME=VALUE strings
+            base -- configuration whose values are changed, defaults if None
+        """
+        changes = {}
+        for arg in args:
+            name, sep, value = arg.partition('=')
+            name = name.strip()
+            if not sep:
+                raise ValueError('Expected NAME=VALUE, got ' + arg + '!')
+            if name not in DEFAULTS:
+                raise NameError('Unknown parameter: ' + name + '!')
+            try:
+                changes[name] = parse_value(name,json.loads(value))
+            except ValueError:
+                changes[name] = parse_value(name,value)
+        if base is None:
+            return cls(**changes)
+        return base.replace(**changes)
+
+    def __getattr__(self,name):
+        """
+        Returns a parameter value. Array parameters are returned as
+        read-only numpy arrays.
+        """
+        values = object.__getattribute__(self,'_SimConfig__values')
+        if name not in values:
+            raise AttributeError(name)
+        if not isinstance(DEFAULTS[name],np.ndarray) or values[name] is None:
+            return values[name]
+        arrays = object.__getattribute__(self,'_SimConfig__arrays')
+        if name not in arrays:
+            arr = np.array(values[name],dtype = DEFAULTS[name].dtype)
+            arr.setflags(write = False)
+            arrays[name] = arr
+        return arrays[name]
+
+    def __setattr__(self,name,value):
+        raise AttributeError('SimConfig is immutable!')
+
+    def __delattr__(self,name):
+        raise AttributeError('SimConfig is immutable!')
+
+    def __eq__(self,other):
+        if self.__class__ is other.__class__:
+            return self.__key == other.__key
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.__key)
+
+    def __reduce__(self):
+        """Pickles only the values that differ from the defaults."""
+        return (make_config, (self.changes(),))
+
+    def __repr__(self):
+        return 'SimConfig(' + ', '.join(name + '=' + repr(value) for \
+                name, value in sorted(self.changes().items())) + ')'
+
+    def changes(self):
+        """Returns the values that differ from the defaults, by name."""
+        return {name: value for name, value in self.__values.items() \
+                if key_of(value) != key_of(freeze(DEFAULTS[name]))}
+
+    def replace(self,**changes):
+        """
+        Returns a new configuration, with some values changed.
+
+        Keyword parameters:
+            changes -- parameter values, by name
+        """
+        values = self.changes()
+        values.update(changes)
+        # A transition matrix built from P00 ... P21 is built again
+        if 'transition_mtx' not in changes and \
+           any(name in changes for name in MTX_NAMES):
+            values.pop('transition_mtx',None)
+        return SimConfig(**values)
+
+    def digest(self):
+        """
+        Returns a digest of the values, stable across processes and runs,
+        unlike hash().
+        """
+        return hashlib.sha256(repr(self.__key).encode()).hexdigest()
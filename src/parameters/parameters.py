@@ -11,6 +11,14 @@ Created on Thu Mar 30 16:32:35 2017
 import numpy as np
 from src.support.enumerations import ChannelModel
 from src.support.enumerations import SimType
+from src.support.enumerations import EngineType
+from src.support.enumerations import FadeMode
+from src.support.enumerations import SeedMode
+from src.support.enumerations import ExecutorType
+from src.support.enumerations import RngType
+from src.support.enumerations import TolType
+from src.support.enumerations import PlotMode
+from src.support.enumerations import MetricsFormat
 
 class Parameters(object):
     
@@ -26,6 +34,26 @@ class Parameters(object):
         Parameters.__instance.val = val
         return Parameters.__instance    
     
+    def __getnewargs__(self):
+        """
+        Arguments of __new__ when unpickling, so that parameters can be sent
+        to worker processes.
+        """
+        return (self.val,)
+    
+    def __getstate__(self):
+        """
+        Pickled state: all parameter values, including the ones that were
+        not changed from their class defaults.
+        """
+        return {name: getattr(self,name) for name in dir(self) \
+                if not name.startswith('_') and \
+                not callable(getattr(self,name))}
+    
+    def __setstate__(self,state):
+        """Restores pickled parameter values."""
+        self.__dict__.update(state)
+    
     #########################################################################
     # SIMULATION PARAMETERS
     
@@ -42,11 +70,68 @@ class Parameters(object):
     seeds_flt = np.linspace(1,10, num = 10)
     seeds = seeds_flt.astype(int)
     
+    '''
+    Seed mode:
+        LEGACY  -- Source and Channel are seeded with small integers: the
+                   values in seeds for FIXED_SEEDS, the seed counter for 
+                   FIXED_CONF
+        SPAWNED -- each replication gets independent Source and Channel 
+                   streams, spawned from root_seed. Replications can then
+                   be run concurrently, with the same results whatever the
+                   number of workers. For FIXED_SEEDS, only the number of 
+                   seeds is used
+    '''
+    seed_mode = SeedMode.LEGACY
+    root_seed = 0
+    
+    # Number of workers that run replications concurrently in SPAWNED seed
+    # mode, and whether they are processes or threads
+    n_rep_workers = 1
+    rep_executor = ExecutorType.PROCESS
+    
+    '''
+    Random number generator:
+        LEGACY  -- numpy RandomState, reproduces the numbers of the previous
+                   versions of the simulator
+        MT19937, PCG64, PHILOX, SFC64 -- numpy Generator with the respective
+                   bit generator. PCG64 and SFC64 are the fastest, but 
+                   draw other numbers than previous versions, so seeded 
+                   results change
+    '''
+    rng_type = RngType.LEGACY
+    
+    # Data type of the uniforms drawn by the DENSE fading method. float32
+    # is faster, but its resolution of 2**-24 biases very low values of p
+    uniform_dtype = np.float64
+    
     # Confidence range: used if self.simulation_type = SimType.FIXED_CONF
     # Confidence interval  = (mean - h, mean + h)
     # h = conf_range * mean
     conf_range = 0.01
     
+    '''
+    Tolerance type: used if self.simulation_type = SimType.FIXED_CONF
+        RELATIVE -- h <= conf_range * mean, for either PER or Throughput
+        ABSOLUTE -- h <= conf_abs, for PER
+    '''
+    tol_type = TolType.RELATIVE
+    conf_abs = 1e-4
+    
+    # Replication batches: used if self.simulation_type = SimType.FIXED_CONF
+    # Tolerance is checked after first_rep_batch replications, and then after
+    # batches rep_batch_growth times larger than the previous one
+    first_rep_batch = 2
+    rep_batch_growth = 1.5
+    
+    # Budgets: used if self.simulation_type = SimType.FIXED_CONF
+    # Points stop without converging when a budget is exhausted. Packet 
+    # budgets count transmitted packets, time budgets are in seconds. 
+    # None for no budget
+    max_pcks_point = None
+    max_time_point = None
+    max_pcks_sweep = None
+    max_time_sweep = None
+    
     # Confidence
     conf = 0.95
     
@@ -56,11 +141,37 @@ class Parameters(object):
     # Warm-up: number of discarted packets at the beginning of iteration
     n_warm_up_pcks = 10
     
+    '''
+    Packet engine:
+        PER_PACKET -- generates, fades and checks one packet at a time
+        BATCH      -- generates, fades and checks all the n_pcks packets of
+                      an iteration as a single (n_pcks x n_bits) block. 
+                      Yields the same results as PER_PACKET for the same seed,
+                      except for the Markov channel, whose results are only
+                      statistically equivalent
+        ERROR_COUNT -- draws the number of bit errors of each packet directly
+                       from the channel, without generating any packet
+        FUSED -- counts the bit errors of all packets in one compiled loop
+                 over packets and bits, with no temporary blocks. Needs
+                 Numba, and falls back to BATCH when it is not installed.
+                 Results with and without Numba are statistically 
+                 equivalent, but not the same
+    '''
+    engine = EngineType.BATCH
+    
+    # Number of worker processes among which the points of p are split.
+    # If 1, points are simulated serially
+    n_workers = 1
+    
     # TRANSMISSION PARAMETERS
     
     # Number of bits per packet
     n_bits = 1000
     
+    # Bit-packed packets: 8 bits per uint8 word, errors are applied with XOR
+    # and counted with popcount. Allows for very long packets
+    packed_bits = False
+    
     # Transmission rate [Mbps]
     tx_rate = 50
     
@@ -76,6 +187,24 @@ class Parameters(object):
     '''
     p = np.logspace(-6,-4, num = 20)
     
+    '''
+    Constant channel fading method:
+        DENSE  -- draws one uniform random number per bit
+        SPARSE -- draws the positions of the bit errors directly, with 
+                  geometric gaps between errors. Cost scales with the 
+                  number of errors instead of the number of bits
+        AUTO   -- SPARSE if p <= sparse_max_p, DENSE otherwise
+    SPARSE and AUTO are faster at low BER, but draw other numbers than
+    DENSE, so seeded results change
+    '''
+    fade_mode = FadeMode.DENSE
+    sparse_max_p = 5e-2
+    
+    # Importance sampling: the constant channel fades with a biased BER, 
+    # chosen to minimize the variance of PER, and packets are weighted by
+    # their likelihood ratio. Requires far fewer packets at low p
+    importance_sampling = False
+    
     # Markov Channel Transition Matrix
     '''
     If chan_mod != ChannelModel.MARKOV, these parameters are not considered.
@@ -107,4 +236,63 @@ class Parameters(object):
     
     transition_mtx = np.matrix([[P00, P01, P02], [P10, P11, P12],[P20, P21, P22]])
     
-    
\ No newline at end of file
+        
+    # OUTPUT PARAMETERS
+    
+    # Directory of the columnar result store. Each point is appended, with
+    # its replications, as soon as it is finished. None to keep results in
+    # memory only
+    results_dir = None
+    
+    '''
+    Plot mode:
+        NONE       -- results are not plotted
+        SHOW       -- figures are saved and shown, blocking until closed
+        SAVE       -- figures are saved, with a non-interactive backend
+        BACKGROUND -- as SAVE, but figures are rendered by a background 
+                      thread, while simulation goes on
+    '''
+    plot_mode = PlotMode.BACKGROUND
+    
+    # Checkpoint file: the simulation state is saved after each point, and
+    # after replications, at most every checkpoint_interval seconds. A 
+    # simulation resumed from it continues bit-identically. None for no 
+    # checkpoints
+    checkpoint_file = None
+    checkpoint_interval = 60.0
+    
+    # Directory of the replication cache. Replications already simulated
+    # with the same parameters, p and seed are read from it instead of run
+    # again, so that extending a sweep only simulates the new points. The
+    # least recently used replications are evicted beyond cache_max_bytes.
+    # None for no cache
+    cache_dir = None
+    cache_max_bytes = 2**28
+    
+    '''
+    Metrics: time spent in each stage of the simulation (packet generation,
+    fading, error checking, statistics, plotting) and packet, bit and 
+    replication counters. A snapshot is written to metrics_file at most 
+    every metrics_interval seconds, and at the end of each point, in
+    metrics_format:
+        JSON       -- JSON object
+        PROMETHEUS -- Prometheus text exposition format
+    None for no metrics, at almost no cost
+    '''
+    metrics_file = None
+    metrics_format = MetricsFormat.JSON
+    metrics_interval = 10.0
+    
+    # Progress file: events of the sweep (points started and finished, 
+    # replications, confidence, packets/sec and ETA) are appended to it as 
+    # JSON lines, by a background thread. '-' for standard output, None for
+    # no progress events
+    progress_file = None
+    
+    # Work queue: if set, points are split in units of queue_block 
+    # replications, and queued in queue_dir for workers on any host that 
+    # mounts it (python main.py --worker DIR). Units of workers that do not
+    # renew their lease for lease_time seconds are queued again
+    queue_dir = None
+    queue_block = 10
+    lease_time = 60.0
@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+"""
+Progress class: streams the progress of a sweep as JSON lines, one event per
+line, e.g. for a job scheduler that kills or rebalances runs that do not
+converge.
+
+Events are built by the simulation and queued, and a background thread
+writes them, so the simulation never waits for the sink. Each event has the
+event name and time, and:
+    sweep_started   -- n_points
+    point_started   -- point, p
+    replication     -- point, p, n_reps, conf_ratio (confidence delta over
+                       tolerance, None before two replications),
+                       pcks_per_sec, eta
+    point_finished  -- point, p, per, per_conf, thrpt, thrpt_conf,
+                       converged, n_reps, pcks_per_sec, eta
+    sweep_finished  -- elapsed, n_reps, n_pcks
+
+When progress is off, NullProgress takes its place, and nothing is built.
+
+Created on Mon Oct 19 00:12:45 2026
+
+@author: Calil
+"""
+
+import sys
+import json
+import time
+import queue
+import threading
+import numpy as np
+
+from src.support.enumerations import SimType
+
+def make_progress(param):
+    """
+    Returns the progress of a simulation: Progress if param.progress_file
+    is set, NullProgress otherwise.
+
+    Keyword parameters:
+        param -- parameters object
+    """
+    if param.progress_file is None:
+        return NullProgress()
+    return Progress(param.progress_file,param)
+
+class Progress(object):
+
+    def __init__(self,file_name,param):
+        """
+        Class constructor.
+
+        Keyword parameters:
+            file_name -- JSON lines file, events are appended to it. '-'
+                         for standard output
+            param -- parameters object
+        """
+        self.__file_name = file_name
+        self.__sim_type = param.simulation_type
+        self.__n_seeds = len(param.seeds)
+        self.__n_pcks = param.n_pcks
+        self.__queue = None
+        self.__thread = None
+
+    def get_file_name(self):
+        """Returns the JSON lines file."""
+        return self.__file_name
+
+    def is_active(self):
+        """
+        Returns True if events are being published. Only the simulate()
+        loop publishes, never worker processes.
+        """
+        return self.__thread is not None
+
+    def start(self,n_points):
+        """
+        Starts the writer thread and publishes the beginning of a sweep.
+
+        Keyword parameters:
+            n_points -- number of points of p
+        """
+        self.__queue = queue.Queue()
+        self.__thread = threading.Thread(target = self.__write,daemon = True)
+        self.__thread.start()
+
+        self.__start = time.time()
+        self.__n_points = n_points
+        self.__points_done = 0
+        self.__reps_done = 0
+        self.__point_reps = []
+        self.publish('sweep_started',n_points = n_points)
+
+    def sweep_finished(self):
+        """Publishes the end of the sweep."""
+        self.publish('sweep_finished',elapsed = time.time() - self.__start,\
+                     n_reps = self.__reps_done,\
+                     n_pcks = self.__reps_done*self.__n_pcks)
+
+    def close(self):
+        """
+        Waits for the writer thread to write all events, also when the 
+        simulation stops with an error.
+        """
+        if not self.is_active():
+            return
+        self.__queue.put(None)
+        self.__thread.join()
+        self.__thread = None
+
+    def publish(self,event,**fields):
+        """
+        Queues an event for the writer thread. Nothing is published before
+        start(), e.g. by worker processes.
+
+        Keyword parameters:
+            event -- event name
+            fields -- event fields, by name
+        """
+        if not self.is_active():
+            return
+        fields.update(event = event,time = time.time())
+        self.__queue.put(fields)
+
+    def point_started(self,point,p_val):
+        """
+        Publishes the beginning of a point.
+
+        Keyword parameters:
+            point -- index of point
+            p_val -- BER of point
+        """
+        self.__point = point
+        self.__p_val = float(p_val)
+        self.publish('point_started',point = point,p = self.__p_val)
+
+    def replication_done(self,n_reps,conf_ratio):
+        """
+        Publishes the end of a replication of the current point.
+
+        Keyword parameters:
+            n_reps -- number of replications of point
+            conf_ratio -- confidence delta over tolerance, None if unknown
+        """
+        # Infinite ratios, of zero means, are not valid JSON
+        if conf_ratio is not None and not np.isfinite(conf_ratio):
+            conf_ratio = None
+        self.__reps_done = self.__reps_done + 1
+        self.publish('replication',point = self.__point,p = self.__p_val,\
+                     n_reps = n_reps,conf_ratio = conf_ratio,\
+                     pcks_per_sec = self.pcks_per_sec(),\
+                     eta = self.eta(n_reps,conf_ratio))
+
+    def point_finished(self,point,p_val,per_tpl,thrpt_tpl,converged,n_reps,\
+                       counted = False):
+        """
+        Publishes the end of a point.
+
+        Keyword parameters:
+            point -- index of point
+            p_val -- BER of point
+            per_tpl -- tuple containg PER mean value and confidence delta
+            thrpt_tpl -- tuple containing Tput mean value and confidence delta
+            converged -- False if point stopped before reaching tolerance
+            n_reps -- number of replications of point
+            counted -- True if its replications were already published
+        """
+        if not counted:
+            self.__reps_done = self.__reps_done + n_reps
+        self.__points_done = self.__points_done + 1
+        self.__point_reps.append(n_reps)
+        self.publish('point_finished',point = point,p = float(p_val),\
+                     per = float(per_tpl[0]),per_conf = float(per_tpl[1]),\
+                     thrpt = float(thrpt_tpl[0]),\
+                     thrpt_conf = float(thrpt_tpl[1]),\
+                     converged = bool(converged),n_reps = n_reps,\
+                     pcks_per_sec = self.pcks_per_sec(),\
+                     eta = self.eta())
+
+    def pcks_per_sec(self):
+        """Returns the packets simulated per second since the sweep start."""
+        elapsed = time.time() - self.__start
+        if elapsed <= 0:
+            return None
+        return self.__reps_done*self.__n_pcks/elapsed
+
+    def eta(self,n_reps = 0,conf_ratio = None):
+        """
+        Estimates the time left in the sweep, from the mean time of the
+        replications done. FIXED_CONF points need about n*conf_ratio^2
+        replications, since confidence deltas shrink as 1/sqrt(n), and the
+        points not started are expected to need as many replications as
+        the finished ones.
+
+        Keyword parameters:
+            n_reps -- number of replications of current point, 0 if none
+            conf_ratio -- confidence delta over tolerance of current point,
+                          None if unknown
+
+        Returns:
+            eta -- time left in seconds, None if it can not be estimated
+        """
+        if self.__reps_done == 0:
+            return None
+        rep_time = (time.time() - self.__start)/self.__reps_done
+
+        if self.__sim_type is SimType.FIXED_SEEDS:
+            point_left = self.__n_seeds - n_reps if n_reps > 0 else 0
+            point_reps = self.__n_seeds
+        elif self.__sim_type is SimType.FIXED_CONF:
+            if n_reps > 0 and conf_ratio is None:
+                return None
+            point_left = 0
+            if n_reps > 0:
+                point_left = max(0,int(np.ceil(n_reps*conf_ratio**2)) - \
+                                   n_reps)
+            if self.__point_reps:
+                point_reps = np.mean(self.__point_reps)
+            elif n_reps > 0:
+                point_reps = n_reps + point_left
+            else:
+                return None
+        else:
+            raise NameError('Unknown simulation type!')
+
+        points_left = self.__n_points - self.__points_done - \
+                      (1 if n_reps > 0 else 0)
+        return float(rep_time*(point_left + points_left*point_reps))
+
+    def __write(self):
+        """Writer thread: writes queued events until None is queued."""
+        if self.get_file_name() == '-':
+            f = sys.stdout
+        else:
+            f = open(self.get_file_name(),'a')
+        try:
+            while True:
+                event = self.__queue.get()
+                if event is None:
+                    break
+                f.write(json.dumps(event) + '\n')
+
+                # Write at once when the queue is empty
+                if self.__queue.empty():
+                    f.flush()
+        finally:
+            if f is not sys.stdout:
+                f.close()
+            else:
+                f.flush()
+
+class NullProgress(object):
+    """
+    Progress switched off: no event is built or written.
+    """
+
+    def is_active(self):
+        return False
+
+    def start(self,n_points):
+        pass
+
+    def sweep_finished(self):
+        pass
+
+    def close(self):
+        pass
+
+    def point_started(self,point,p_val):
+        pass
+
+    def replication_done(self,n_reps,conf_ratio):
+        pass
+
+    def point_finished(self,point,p_val,per_tpl,thrpt_tpl,converged,n_reps,\
+                       counted = False):
+        pass
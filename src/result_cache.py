@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+ResultCache class: on-disk cache of replication results.
+
+Entries are small JSON files, named by a stable hash of everything that
+determines a replication: the configuration, the value of p, the seed and
+the Markov state at its beginning. The cache is bounded in size, and the
+least recently used entries are evicted first.
+
+Created on Sun Oct 18 21:36:14 2026
+
+@author: Calil
+"""
+
+import os
+import json
+import hashlib
+
+from src.parameters.config import SimConfig
+from src.support.enumerations import EngineType
+from src.support import fused
+
+# Parameters that do not change the results of a replication: execution,
+# output and stopping parameters, and the swept values of p and seeds,
+# which are keyed one by one
+IGNORED = ['p', 'seeds', 'seeds_flt', 'simulation_type', 'conf', 'conf_range',
+           'conf_abs', 'tol_type', 'first_rep_batch', 'rep_batch_growth',
+           'max_pcks_point', 'max_time_point', 'max_pcks_sweep',
+           'max_time_sweep', 'n_workers', 'n_rep_workers', 'rep_executor',
+           'plot_mode', 'results_dir', 'checkpoint_file',
+           'checkpoint_interval', 'cache_dir', 'cache_max_bytes',
+           'metrics_file', 'metrics_format', 'metrics_interval',
+           'progress_file', 'queue_dir', 'queue_block', 'lease_time']
+
+def config_key(param):
+    """
+    Returns the digest of the parameters that change replication results.
+    The FUSED engine draws other random numbers when it falls back to the
+    numpy engine, so its backend is part of the digest.
+
+    Keyword parameters:
+        param -- SimConfig or Parameters object
+    """
+    if not isinstance(param,SimConfig):
+        param = SimConfig.from_parameters(param)
+    changes = {name: value for name, value in param.changes().items() \
+               if name not in IGNORED}
+    digest = SimConfig(**changes).digest()
+    if param.engine is EngineType.FUSED:
+        backend = 'numba' if fused.is_available() else 'numpy'
+        digest = hashlib.sha256((digest + ':' + backend).encode()).hexdigest()
+    return digest
+
+def replication_key(conf_key,p_val,seed_key,markov_state):
+    """
+    Returns the cache key of a replication.
+
+    Keyword parameters:
+        conf_key -- digest returned by config_key()
+        p_val -- BER of channel
+        seed_key -- seed, or (root seed, replication) of spawned streams
+        markov_state -- Markov state at beginning of replication
+    """
+    key = repr((conf_key, float(p_val), seed_key, int(markov_state)))
+    return hashlib.sha256(key.encode()).hexdigest()
+
+class ResultCache(object):
+
+    def __init__(self,cache_dir,max_bytes):
+        """
+        Class constructor.
+
+        Keyword parameters:
+            cache_dir -- directory of cache
+            max_bytes -- maximum size of entries, in bytes
+        """
+        self.__cache_dir = cache_dir
+        self.__max_bytes = max_bytes
+        self.__hits = 0
+        self.__misses = 0
+        os.makedirs(cache_dir,exist_ok = True)
+        self.__size = sum(size for entry, size, atime in self.__entries())
+
+    def get_cache_dir(self):
+        """Returns directory of cache."""
+        return self.__cache_dir
+
+    def get_size(self):
+        """Returns size of entries, in bytes."""
+        return self.__size
+
+    def get_hits(self):
+        """Returns number of entries found."""
+        return self.__hits
+
+    def get_misses(self):
+        """Returns number of entries not found."""
+        return self.__misses
+
+    def get(self,key):
+        """
+        Looks an entry up, marking it as recently used.
+
+        Keyword parameters:
+            key -- entry key
+
+        Returns:
+            value -- stored dictionary, None if not found
+        """
+        file_name = self.__file(key)
+        try:
+            with open(file_name) as f:
+                value = json.load(f)
+            os.utime(file_name)
+        except (OSError, ValueError):
+            self.__misses = self.__misses + 1
+            return None
+        self.__hits = self.__hits + 1
+        return value
+
+    def put(self,key,value):
+        """
+        Stores an entry, evicting the least recently used entries if the
+        cache gets too large.
+
+        Keyword parameters:
+            key -- entry key
+            value -- JSON serializable dictionary
+        """
+        file_name = self.__file(key)
+        tmp_name = file_name + '.' + str(os.getpid()) + '.tmp'
+        with open(tmp_name,'w') as f:
+            json.dump(value,f)
+        self.__size = self.__size + os.path.getsize(tmp_name)
+        os.replace(tmp_name,file_name)
+        if self.__size > self.__max_bytes:
+            self.evict()
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the cache is within
+        its maximum size. Sizes are recounted, since several processes may
+        share the cache.
+        """
+        entries = sorted(self.__entries(),key = lambda entry: entry[2])
+        self.__size = sum(size for entry, size, atime in entries)
+        for entry, size, atime in entries:
+            if self.__size <= self.__max_bytes:
+                break
+            try:
+                os.remove(entry)
+            except OSError:
+                pass
+            self.__size = self.__size - size
+
+    def __file(self,key):
+        """Returns the file of an entry."""
+        return os.path.join(self.__cache_dir,key + '.json')
+
+    def __entries(self):
+        """Returns (file, size, access time) of all entries."""
+        entries = []
+        for name in os.listdir(self.__cache_dir):
+            if not name.endswith('.json'):
+                continue
+            file_name = os.path.join(self.__cache_dir,name)
+            try:
+                stat = os.stat(file_name)
+            except OSError:
+                continue
+            entries.append((file_name, stat.st_size, stat.st_mtime_ns))
+        return entries
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+ResultStore class: appends the results of a sweep to a columnar store on
+disk, as soon as each point is finished.
+
+A store is a directory with one sub-directory per table, and one raw binary
+file per column. Columns are appended one chunk (point) at a time, and are
+read back as numpy memmaps, so that many sweeps can be analyzed without
+loading them. The column dtypes are kept in meta.json.
+
+Each sweep written to a store gets a new sweep number, stored with its
+points and replications, so that the rows of a sweep can be read apart.
+
+Created on Sun Oct 18 17:05:48 2026
+
+@author: Calil
+"""
+
+import os
+import json
+import numpy as np
+
+# Columns of points table, one row per point of p
+POINT_COLUMNS = [('sweep', np.int64),
+                 ('p', np.float64),
+                 ('per', np.float64),
+                 ('per_conf', np.float64),
+                 ('thrpt', np.float64),
+                 ('thrpt_conf', np.float64),
+                 ('converged', np.bool_),
+                 ('n_reps', np.int64),
+                 ('n_pcks', np.int64),
+                 ('elapsed', np.float64),
+                 ('first_rep', np.int64)]
+
+# Columns of replications table, one row per replication of each point
+REP_COLUMNS = [('sweep', np.int64),
+               ('point', np.int64),
+               ('rep', np.int64),
+               ('seed', np.int64),
+               ('per', np.float64),
+               ('thrpt', np.float64),
+               ('n_pcks', np.int64),
+               ('elapsed', np.float64)]
+
+TABLES = [('points', POINT_COLUMNS), ('reps', REP_COLUMNS)]
+
+class ResultStore(object):
+
+    def __init__(self,store_dir):
+        """
+        Class constructor. Creates the store, or opens an existing one to
+        append the points of a new sweep. Rows of a point that was not 
+        completely written, e.g. because of a crash, are discarded.
+
+        Keyword parameters:
+            store_dir -- directory of store
+        """
+        self.__store_dir = store_dir
+        for table, columns in TABLES:
+            os.makedirs(os.path.join(store_dir,table),exist_ok = True)
+
+        meta = {table: [[name, np.dtype(dtype).str] \
+                        for name, dtype in columns] \
+                for table, columns in TABLES}
+        meta_file = os.path.join(store_dir,'meta.json')
+        if not os.path.exists(meta_file):
+            with open(meta_file,'w') as f:
+                json.dump(meta,f,indent = 1)
+        else:
+            # Opening a store with other columns would truncate it
+            with open(meta_file) as f:
+                if json.load(f) != meta:
+                    raise NameError('Incompatible result store!')
+
+        self.truncate(self.__n_rows('points'))
+        self.new_sweep()
+
+    def get_store_dir(self):
+        """Returns directory of store."""
+        return self.__store_dir
+
+    def get_sweep(self):
+        """Returns the number of the sweep being written."""
+        return self.__sweep
+
+    def set_sweep(self,sweep):
+        """
+        Sets the number of the sweep being written, e.g. to continue a
+        resumed sweep.
+        """
+        self.__sweep = sweep
+
+    def new_sweep(self):
+        """
+        Starts a new sweep, numbered after the last sweep in store.
+
+        Returns:
+            sweep -- number of new sweep
+        """
+        self.__sweep = 0
+        if self.__n_points > 0:
+            self.__sweep = int(self.read('points')['sweep'][-1]) + 1
+        return self.__sweep
+
+    def get_n_points(self):
+        """Returns number of points in store."""
+        return self.__n_points
+
+    def get_n_reps(self):
+        """Returns number of replications in store."""
+        return self.__n_reps
+
+    def append_point(self,p_val,per,thrpt,converged,reps):
+        """
+        Appends a point and its replications to the store. Replications are
+        written first, so a point is only complete once its own row exists.
+
+        Keyword parameters:
+            p_val -- BER of point
+            per -- tuple containg PER mean value and confidence delta
+            thrpt -- tuple containing Tput mean value and confidence delta
+            converged -- False if point stopped before reaching tolerance
+            reps -- list of (rep, seed, per, thrpt, n_pcks, elapsed) tuples,
+                    one per replication
+        """
+        n_reps = len(reps)
+        rep_cols = list(zip(*reps)) if n_reps > 0 else [[]]*6
+        self.__append('reps',REP_COLUMNS,\
+                      [[self.__sweep]*n_reps, [self.__n_points]*n_reps] + \
+                      rep_cols)
+
+        point_row = [self.__sweep, p_val, per[0], per[1], thrpt[0],\
+                     thrpt[1], converged, n_reps, sum(rep_cols[4]),\
+                     sum(rep_cols[5]), self.__n_reps]
+        self.__append('points',POINT_COLUMNS,[[val] for val in point_row])
+
+        self.__n_reps = self.__n_reps + n_reps
+        self.__n_points = self.__n_points + 1
+
+    def read(self,table = 'points',sweep = None):
+        """
+        Maps the columns of a table, without loading them. The rows of a
+        sweep are contiguous, so they are mapped as slices.
+
+        Keyword parameters:
+            table -- 'points' or 'reps'
+            sweep -- number of sweep whose rows are read, None for all
+
+        Returns:
+            cols -- dictionary of read-only numpy memmaps, one per column
+        """
+        n_rows = self.__n_points if table == 'points' else self.__n_reps
+        cols = {name: self.__map(table,name,dtype,n_rows) \
+                for name, dtype in self.__columns(table)}
+        if sweep is None:
+            return cols
+        first, last = np.searchsorted(cols['sweep'],[sweep, sweep + 1])
+        return {name: col[first:last] for name, col in cols.items()}
+
+    def point_reps(self,point_idx):
+        """
+        Returns the replications of a point.
+
+        Keyword parameters:
+            point_idx -- index of point
+
+        Returns:
+            cols -- dictionary of replication columns of point
+        """
+        points = self.read('points')
+        first = int(points['first_rep'][point_idx])
+        last = first + int(points['n_reps'][point_idx])
+        return {name: col[first:last] for name, col in self.read('reps').items()}
+
+    def __columns(self,table):
+        """Returns the (name, dtype) list of the columns of a table."""
+        for name, columns in TABLES:
+            if name == table:
+                return columns
+        raise NameError('Unknown table!')
+
+    def __file(self,table,name):
+        """Returns the file of a column."""
+        return os.path.join(self.get_store_dir(),table,name + '.bin')
+
+    def __n_rows(self,table):
+        """Returns the number of complete rows of a table."""
+        n_rows = []
+        for name, dtype in self.__columns(table):
+            col_file = self.__file(table,name)
+            size = os.path.getsize(col_file) if os.path.exists(col_file) \
+                   else 0
+            n_rows.append(size // np.dtype(dtype).itemsize)
+        return min(n_rows)
+
+    def truncate(self,n_points):
+        """
+        Truncates the store to its first n_points points, and their 
+        replications. Also discards rows of incomplete points.
+
+        Keyword parameters:
+            n_points -- number of points kept
+        """
+        self.__n_points = min(n_points,self.__n_rows('points'))
+        self.__n_reps = 0
+        if self.__n_points > 0:
+            points = self.read('points')
+            self.__n_reps = int(points['first_rep'][-1] + \
+                                points['n_reps'][-1])
+            del points
+
+        for table, n_rows in [('points', self.__n_points),\
+                              ('reps', self.__n_reps)]:
+            for name, dtype in self.__columns(table):
+                col_file = self.__file(table,name)
+                size = n_rows*np.dtype(dtype).itemsize
+                if os.path.exists(col_file) and \
+                   os.path.getsize(col_file) > size:
+                    os.truncate(col_file,size)
+
+    def __append(self,table,columns,values):
+        """
+        Appends a chunk of rows to the columns of a table.
+
+        Keyword parameters:
+            table -- table name
+            columns -- (name, dtype) list of columns of table
+            values -- list of column values, in the order of columns
+        """
+        for (name, dtype), vals in zip(columns,values):
+            with open(self.__file(table,name),'ab') as f:
+                f.write(np.asarray(vals,dtype = dtype).tobytes())
+
+    def __map(self,table,name,dtype,n_rows):
+        """Maps the first n_rows of a column."""
+        if n_rows == 0:
+            return np.empty(0,dtype = dtype)
+        return np.memmap(self.__file(table,name),dtype = dtype,mode = 'r',\
+                         shape = (n_rows,))
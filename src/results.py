@@ -8,7 +8,13 @@ Created on Thu Mar 30 16:41:59 2017
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
+from concurrent.futures import ThreadPoolExecutor
+
+from src.result_store import ResultStore
+from src.support.enumerations import PlotMode
+
+# Worker thread of BACKGROUND plot mode, created on first use
+plot_pool = None
 
 class Results(object):
     
@@ -21,6 +27,9 @@ class Results(object):
             self.__per_conf_list -- list of PER confidences
             self.__thrpt_list -- list of Throughput mean values
             self.__thrpt_conf_list -- list of Throughput confidences
+            self.__converged_list -- list of convergence flags
+            self.__store -- columnar result store, opened on first point
+            self.__plot_future -- future of figures rendered in background
             
         Keyword parameters:
             param -- Parameters class
@@ -32,6 +41,9 @@ class Results(object):
         self.__per_conf_list = []
         self.__thrpt_list = []
         self.__thrpt_conf_list = []
+        self.__converged_list = []
+        self.__store = None
+        self.__plot_future = None
         pass
     
     def get_param(self):
@@ -58,66 +70,179 @@ class Results(object):
         """Getter form Throughput confidence delta list."""
         return self.__thrpt_conf_list
     
-    def store_res(self,per,thrpt):
+    def get_converged(self):
+        """Getter for list of convergence flags."""
+        return self.__converged_list
+    
+    def get_state(self):
+        """
+        Returns a picklable copy of the stored results, and the number of
+        points and sweep of the result store.
+        """
+        return {'per_list': list(self.__per_list),
+                'per_conf_list': list(self.__per_conf_list),
+                'thrpt_list': list(self.__thrpt_list),
+                'thrpt_conf_list': list(self.__thrpt_conf_list),
+                'converged_list': list(self.__converged_list),
+                'n_store_points': 0 if self.get_store() is None else \
+                                  self.get_store().get_n_points(),
+                'store_sweep': None if self.get_store() is None else \
+                               self.get_store().get_sweep()}
+    
+    def set_state(self,state):
+        """
+        Restores a state returned by get_state(). Points stored after the
+        state was taken are discarded from the result store, and the sweep
+        of the state is continued.
+        """
+        self.__per_list = list(state['per_list'])
+        self.__per_conf_list = list(state['per_conf_list'])
+        self.__thrpt_list = list(state['thrpt_list'])
+        self.__thrpt_conf_list = list(state['thrpt_conf_list'])
+        self.__converged_list = list(state['converged_list'])
+        if self.get_store() is not None:
+            self.get_store().truncate(state['n_store_points'])
+            if state['store_sweep'] is not None:
+                self.get_store().set_sweep(state['store_sweep'])
+    
+    def get_store(self):
+        """
+        Getter for result store, None if param.results_dir is None. The 
+        store is only opened when needed, so that worker processes do not
+        touch it.
+        """
+        if self.__store is None and self.get_param().results_dir is not None:
+            self.__store = ResultStore(self.get_param().results_dir)
+        return self.__store
+    
+    def store_res(self,per,thrpt,converged = True,reps = None):
         """
-        Stores PER and Throughput for future ploting.
+        Stores PER and Throughput for future ploting, and appends them to
+        the result store, if any.
         
         Keyword parameters:
             per -- tuple containg PER mean value and confidence delta
             thrpt -- tuple containing Tput mean value and confidence delta
+            converged -- False if point stopped before reaching tolerance
+            reps -- list of (rep, seed, per, thrpt, n_pcks, elapsed) tuples
+                    of the replications of point
         """
+        p_idx = len(self.get_per_list())
         self.get_per_list().append(per[0])
         self.get_per_conf().append(per[1])
         self.get_thrpt_list().append(thrpt[0])
         self.get_thrpt_conf().append(thrpt[1])
+        self.get_converged().append(converged)
+        
+        if self.get_store() is not None:
+            self.get_store().append_point(self.get_param().p[p_idx],per,\
+                                          thrpt,converged,\
+                                          [] if reps is None else reps)
+    
+    def get_plot_future(self):
+        """
+        Getter for the future of the figures rendered in background, None
+        if no figure was rendered in background.
+        """
+        return self.__plot_future
     
     def plot(self,theo_per,theo_thrpt):
         """
-        Plots PER vs p and Throughput vs p simulation results.
+        Plots PER vs p and Throughput vs p simulation results, according to
+        param.plot_mode. In BACKGROUND mode, figures are rendered by a 
+        worker thread from a copy of the results, so the caller can go on.
+        Errors of the previous background rendering are raised here, if
+        wait_plot() was not called.
         
         Keyword parameters:
             theo_per -- theoretical PER numpy array
             theo_thrpt -- theoretical Throughput numpy array
+            
+        Returns:
+            future -- future of background rendering, None in other modes
         """
-        # PLOT PER
-        fig = plt.figure(figsize=(10,10))
-        ax1 = fig.add_subplot(111)
-        
-        np_per = np.array(self.get_per_list())
-        np_per_conf = np.array(self.get_per_conf())
-        
-        ax1.set_xscale('log')
-        ax1.errorbar(self.get_param().p,np_per,yerr = np_per_conf,fmt = 'o')
-        ax1.plot(self.get_param().p,theo_per,'r',linewidth = 0.5)
-        
-        ax1.grid()
+        self.wait_plot()
+        plot_mode = self.get_param().plot_mode
+        if plot_mode is PlotMode.NONE:
+            return None
         
-        ax1.set_xlabel("Bit Error Rate")
-        ax1.set_ylabel("Packet Error Rate")
+        p = np.array(self.get_param().p)
+        figures = [(self.get_figs_dir() + "per.png", p,\
+                    np.array(self.get_per_list()),\
+                    np.array(self.get_per_conf()),\
+                    np.array(theo_per),"Packet Error Rate"),
+                   (self.get_figs_dir() + "thrpt.png", p,\
+                    np.array(self.get_thrpt_list()),\
+                    np.array(self.get_thrpt_conf()),\
+                    np.array(theo_thrpt),"Throughput [Mbps]")]
         
-        #Save and show
-        file_name = self.get_figs_dir() + "per.png"
-        plt.savefig(file_name)
-        plt.show()
+        if plot_mode is PlotMode.SHOW:
+            render_figures(figures,True)
+        elif plot_mode is PlotMode.SAVE:
+            render_figures(figures)
+        elif plot_mode is PlotMode.BACKGROUND:
+            self.__plot_future = get_plot_pool().submit(render_figures,\
+                                                        figures)
+            return self.__plot_future
+        else:
+            raise NameError('Unknown plot mode!')
+        return None
         
-        # PLOT THROUGHPUT
-        fig = plt.figure(figsize=(10,10))
+    def wait_plot(self):
+        """
+        Waits for the figures rendered in background, if any, raising the
+        errors of their rendering.
+        """
+        future = self.__plot_future
+        self.__plot_future = None
+        if future is not None:
+            future.result()
+
+def get_plot_pool():
+    """
+    Returns the worker thread that renders figures in BACKGROUND mode, 
+    shared by all Results objects. Figures are rendered one at a time.
+    """
+    global plot_pool
+    if plot_pool is None:
+        plot_pool = ThreadPoolExecutor(max_workers = 1)
+    return plot_pool
+
+def render_figures(figures,show = False):
+    """
+    Plots simulation results vs p, with confidence intervals, against their
+    theoretical values. Figures are drawn with the non-interactive Agg 
+    backend, unless they are shown. matplotlib is only imported here.
+    
+    Keyword parameters:
+        figures -- list of (file_name, p, mean, conf, theo, y_label) tuples,
+                   one per figure
+        show -- if True, figures are drawn and shown with pyplot
+    """
+    if show:
+        import matplotlib.pyplot as plt
+    else:
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+    
+    for file_name, p, mean_val, conf_int, theo, y_label in figures:
+        if show:
+            fig = plt.figure(figsize=(10,10))
+        else:
+            fig = Figure(figsize=(10,10))
+            FigureCanvasAgg(fig)
         ax1 = fig.add_subplot(111)
         
-        np_thrpt = np.array(self.get_thrpt_list())
-        np_thrpt_conf = np.array(self.get_thrpt_conf())
-        
         ax1.set_xscale('log')
-        ax1.errorbar(self.get_param().p,np_thrpt,yerr = np_thrpt_conf\
-                     ,fmt = 'o')
-        ax1.plot(self.get_param().p,theo_thrpt,'r',linewidth = 0.5)
+        ax1.errorbar(p,mean_val,yerr = conf_int,fmt = 'o')
+        ax1.plot(p,theo,'r',linewidth = 0.5)
         
         ax1.grid()
         
         ax1.set_xlabel("Bit Error Rate")
-        ax1.set_ylabel("Throughput [Mbps]")
+        ax1.set_ylabel(y_label)
         
         #Save and show
-        file_name = self.get_figs_dir() + "thrpt.png"
-        plt.savefig(file_name)
-        plt.show()
\ No newline at end of file
+        fig.savefig(file_name)
+        if show:
+            plt.show()
@@ -7,12 +7,36 @@ Created on Sun Apr  2 11:04:28 2017
 @author: Calil
 """
 
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+
 from source import Source
 from channel import Channel
 from statistics import Statistics
 from results import Results
 from theoretical import Theoretical
+from stopping import StoppingRule
+from result_cache import ResultCache
+from result_cache import config_key
+from result_cache import replication_key
+from metrics import make_metrics
+from progress import make_progress
+from work_queue import WorkQueue
+from work_queue import LeaseKeeper
+from work_queue import POLL_INTERVAL
+from src.parameters.config import SimConfig
 from src.support.enumerations import SimType
+from src.support.enumerations import EngineType
+from src.support.enumerations import SeedMode
+from src.support.enumerations import ExecutorType
+from src.support.enumerations import ChannelModel
+from src.support.enumerations import PlotMode
+from src.support import rng
+from src.support import fused
+from src.support.checkpoint import save_checkpoint
+from src.support.checkpoint import load_checkpoint
 
 class SimulationThread(object):
     def __init__(self,param,figs_dir):
@@ -21,17 +45,39 @@ class SimulationThread(object):
         objects.
         
         Keyword parameters:
-            param -- parameters object
+            param -- SimConfig or Parameters object. An immutable SimConfig
+                     lets many configurations share a process, and is 
+                     cheap to send to worker processes
         """
         self.param = param
-        self.station = Source(param.n_bits,param.seeds[0])
-        self.chann = Channel(param.chan_mod,param.seeds[0],param.p[0])
+        self.station = Source(param.n_bits,param.seeds[0],param.packed_bits,\
+                              param.rng_type)
+        self.chann = Channel(param.chan_mod,param.seeds[0],param.p[0],\
+                             param.fade_mode,param.sparse_max_p,\
+                             param.packed_bits,param.n_bits,\
+                             param.rng_type,param.uniform_dtype,\
+                             param.transition_mtx,\
+                             param.importance_sampling)
         self.stat = Statistics(param.n_bits,param.tx_rate,param.conf)
         self.res = Results(param,figs_dir)
         self.theo = Theoretical(param)
+        self.stopper = StoppingRule(param)
+        self.metrics = make_metrics(param)
+        self.progress = make_progress(param)
+        self.cache = None
+        if param.cache_dir is not None:
+            self.cache = ResultCache(param.cache_dir,param.cache_max_bytes)
+            self.__conf_key = config_key(param)
         
         self.__seed_count = 0
         self.__ber_count = 0
+        self.__reps = []
+        self.__in_point = False
+        self.__checkpointing = False
+        self.__last_checkpoint = time.time()
+        
+        if param.seed_mode is SeedMode.SPAWNED:
+            self.spawn_seed()
         
     def get_seed_count(self):
         """Returns the seed count."""
@@ -41,27 +87,228 @@ class SimulationThread(object):
         """Returns the BER count."""
         return self.__ber_count
     
-    def simulate(self):
+    def get_reps(self):
+        """
+        Returns the (rep, seed, per, thrpt, n_pcks, elapsed) tuples of the
+        replications of current point.
         """
-        Performs simulation loop and generates results.
+        return self.__reps
+    
+    def simulate(self,resume = False):
         """
+        Performs simulation loop and generates results. In BACKGROUND plot
+        mode, figures may still be rendering when it returns: 
+        res.wait_plot() waits for them and raises their errors.
         
-        # PER loop
-        for p_idx in range(0,len(self.param.p)):
-            # Seed loop
-            self.seed_loop()
+        Keyword parameters:
+            resume -- if True, continues from param.checkpoint_file, if it
+                      exists
+        """
+        self.__checkpointing = self.param.checkpoint_file is not None
+        self.metrics.start()
+        self.progress.start(len(self.param.p))
+        try:
+            resumed = resume and self.resume()
+            if not resumed:
+                self.stopper.start_sweep()
             
-            # Calculate mean and confidence
-            per_tpl, thrpt_tpl = self.stat.wrap_up()
-            self.res.store_res(per_tpl,thrpt_tpl)
+            if self.param.queue_dir is not None:
+                # Split PER loop among workers of a work queue
+                self.distributed_ber_loop()
+            elif self.param.n_workers > 1:
+                # Split PER loop among worker processes
+                self.parallel_ber_loop()
+            else:
+                # PER loop
+                while self.get_ber_count() < len(self.param.p):
+                    # Seed loop, continuing a resumed point
+                    self.metrics.timed('seed_loop',self.seed_loop,\
+                                       resumed and self.__in_point)
+                    resumed = False
+                    
+                    # Calculate mean and confidence
+                    converged = self.point_converged()
+                    per_tpl, thrpt_tpl = self.metrics.timed('wrap_up',\
+                                                            self.stat.wrap_up)
+                    self.res.store_res(per_tpl,thrpt_tpl,converged,\
+                                       self.get_reps())
+                    p_val = self.param.p[self.get_ber_count()]
+                    self.metrics.point_done(p_val,self.get_reps())
+                    self.progress.point_finished(self.get_ber_count(),p_val,\
+                                                 per_tpl,thrpt_tpl,converged,\
+                                                 len(self.get_reps()),True)
+                    
+                    # Reset seed counter and set new BER
+                    self.__in_point = False
+                    self.reset_seed()
+                    self.new_ber()
+                    self.checkpoint(True)
+                    self.metrics.export(True)
+                
+            # Validate and plot
+            ber_theo, per_theo, thrpt_theo = self.theo.validate()
+            self.metrics.timed('plot',self.res.plot,per_theo,thrpt_theo)
+            self.metrics.export(True)
+            self.progress.sweep_finished()
+        finally:
+            self.progress.close()
             
-            # Reset seed counter and set new BER
-            self.reset_seed()
-            self.new_ber()
+    def parallel_ber_loop(self):
+        """
+        Simulates the points of p in a pool of param.n_workers processes, 
+        and stores their results in p order. Results are the same of the 
+        serial loop. The sweep packet budget is split evenly among points.
+        """
+        first = self.get_ber_count()
+        n_points = len(self.param.p) - first
+        start_time = [self.stopper.get_sweep_start()]*n_points
+        with ProcessPoolExecutor(max_workers=self.param.n_workers) as pool:
+            point_res = pool.map(simulate_point,[self.param]*n_points,\
+                                 range(first,len(self.param.p)),start_time)
+            for per_tpl, thrpt_tpl, converged, reps in point_res:
+                self.res.store_res(per_tpl,thrpt_tpl,converged,reps)
+                self.metrics.point_done(self.param.p[self.get_ber_count()],\
+                                        reps)
+                self.progress.point_finished(self.get_ber_count(),\
+                                        self.param.p[self.get_ber_count()],\
+                                        per_tpl,thrpt_tpl,converged,\
+                                        len(reps))
+                self.__ber_count = self.__ber_count + 1
+                self.checkpoint(True)
+                self.metrics.export(True)
+        
+    def distributed_ber_loop(self):
+        """
+        Simulates the points of p on the workers of the queue in 
+        param.queue_dir, which run queue_worker() on any host mounting it.
+        Points are split in units of param.queue_block replications, and 
+        units of dead workers are queued again after param.lease_time. 
+        Workers return each replication, and points are merged in 
+        replication order, as in the serial loop, so results are the same.
+        Points are stored in p order.
+        """
+        work_queue = WorkQueue(self.param.queue_dir)
+        work_queue.reset()
+        config = self.unit_config()
+        start_time = self.stopper.get_sweep_start()
+        points = {p_idx: {'reps': {}, 'queued': 0, 'markov_state': 0,\
+                          'busy': False, 'start': None} \
+                  for p_idx in range(self.get_ber_count(),len(self.param.p))}
+        received = set()
+        try:
+            while self.get_ber_count() < len(self.param.p):
+                # Collect replications, ignoring units done twice
+                for unit_id, result in work_queue.results():
+                    if unit_id in received or result['p_idx'] not in points:
+                        continue
+                    received.add(unit_id)
+                    point = points[result['p_idx']]
+                    for rep in result['reps']:
+                        point['reps'][rep[0]] = rep
+                    point['markov_state'] = result['markov_state']
+                    point['busy'] = False
+                work_queue.requeue_expired(self.param.lease_time)
+                
+                # Store finished points in p order, queue units of others
+                for p_idx in sorted(points):
+                    point = points[p_idx]
+                    reps = contiguous_reps(point['reps'])
+                    done, n_reps, per_tpl, thrpt_tpl, converged = \
+                        merge_point(config,reps,start_time,point['start'])
+                    if not done:
+                        self.queue_units(work_queue,config,p_idx,point,n_reps)
+                    elif p_idx == self.get_ber_count():
+                        reps = reps[:n_reps]
+                        self.res.store_res(per_tpl,thrpt_tpl,converged,reps)
+                        self.metrics.point_done(self.param.p[p_idx],reps)
+                        self.progress.point_finished(p_idx,\
+                                                     self.param.p[p_idx],\
+                                                     per_tpl,thrpt_tpl,\
+                                                     converged,n_reps)
+                        del points[p_idx]
+                        self.__ber_count = self.__ber_count + 1
+                        self.checkpoint(True)
+                        self.metrics.export(True)
+                time.sleep(POLL_INTERVAL)
+        finally:
+            work_queue.stop()
+            
+    def unit_config(self):
+        """
+        Returns the SimConfig sent to workers: param without outputs and 
+        with everything run in the worker process itself.
+        """
+        config = self.param
+        if not isinstance(config,SimConfig):
+            config = SimConfig.from_parameters(config)
+        return config.replace(queue_dir = None,n_workers = 1,\
+                              n_rep_workers = 1,plot_mode = PlotMode.NONE,\
+                              results_dir = None,checkpoint_file = None,\
+                              metrics_file = None,progress_file = None)
+    
+    def queue_units(self,work_queue,config,p_idx,point,n_reps):
+        """
+        Queues the units of a point up to n_reps replications, in blocks of
+        param.queue_block. In LEGACY seed mode, the Markov chain goes from a
+        replication to the next, so units of a Markov channel are queued 
+        one at a time, each starting from the last state of the previous.
+        
+        Keyword parameters:
+            work_queue -- WorkQueue object
+            config -- SimConfig sent to workers
+            p_idx -- index of point in param.p
+            point -- dictionary with the replications received, by index,
+                     the number of replications queued, the last Markov 
+                     state received, whether a unit is in progress, and
+                     the time its first unit was queued
+            n_reps -- number of replications needed
+        """
+        chained = self.param.seed_mode is SeedMode.LEGACY and \
+                  self.param.chan_mod is ChannelModel.MARKOV
+        block = max(1,self.param.queue_block)
+        if point['start'] is None:
+            point['start'] = time.time()
+        while point['queued'] < n_reps and not point['busy']:
+            first_rep = point['queued']
+            n_block = min(block,n_reps - first_rep) \
+                      if self.param.simulation_type is SimType.FIXED_SEEDS \
+                      else block
+            unit = {'param': config,
+                    'p_idx': p_idx,
+                    'first_rep': first_rep,
+                    'n_reps': n_block,
+                    'markov_state': point['markov_state'] if chained else 0}
+            work_queue.put('{:06d}-{:09d}'.format(p_idx,first_rep),unit)
+            point['queued'] = first_rep + n_block
+            point['busy'] = chained
+        
+    def simulate_ber(self,p_idx):
+        """
+        Simulates a single point of p, starting from the same state as the
+        serial loop.
+        
+        Keyword parameters:
+            p_idx -- index of point in param.p
             
-        # Validate and plot
-        ber_theo, per_theo, thrpt_theo = self.theo.validate()
-        self.res.plot(per_theo, thrpt_theo)
+        Returns:
+            per_tpl -- tuple containg PER mean value and confidence delta
+            thrpt_tpl -- tuple containing Tput mean value and confidence delta
+            converged -- False if point stopped before reaching tolerance
+            reps -- list of replication tuples of point, as get_reps()
+        """
+        # Points after the first one start from a reset seed
+        if p_idx > 0:
+            self.reset_seed()
+        self.__ber_count = p_idx
+        self.chann.set_p_val(self.param.p[p_idx])
+        
+        # Seed loop
+        self.metrics.timed('seed_loop',self.seed_loop)
+        
+        # Calculate mean and confidence
+        converged = self.point_converged()
+        per_tpl, thrpt_tpl = self.metrics.timed('wrap_up',self.stat.wrap_up)
+        return per_tpl, thrpt_tpl, converged, self.get_reps()
         
     def send_pck(self):
         """
@@ -71,66 +318,341 @@ class SimulationThread(object):
             n_errors -- number of bir errors in received packet
             pck_error -- boolean, True if packet has errors
         """
-        pck_tx = self.station.generate_packet()
-        pck_rx = self.chann.fade(pck_tx)
-        n_errors, pck_error = self.station.calculate_error(pck_rx)
+        pck_tx = self.metrics.timed('generate',self.station.generate_packet)
+        pck_rx = self.metrics.timed('fade',self.chann.fade,pck_tx)
+        n_errors, pck_error = self.metrics.timed('error',\
+                                    self.station.calculate_error,pck_rx)
         
         return n_errors, pck_error
     
+    def send_batch(self,n_pcks):
+        """
+        Generates, sends and calculates error for a block of packets.
+        
+        Keyword parameters:
+            n_pcks -- number of packets in block
+        
+        Returns:
+            n_errors -- array with number of bit errors in each packet
+            pck_error -- boolean array, True for packets with errors
+        """
+        pcks_tx = self.metrics.timed('generate',self.station.generate_batch,\
+                                     n_pcks)
+        pcks_rx = self.metrics.timed('fade',self.chann.fade,pcks_tx)
+        n_errors, pck_error = self.metrics.timed('error',\
+                                    self.station.calculate_error,pcks_rx)
+        
+        return n_errors, pck_error
+    
+    def send_counts(self,n_pcks):
+        """
+        Draws the number of bit errors of a block of packets, without
+        generating them.
+        
+        Keyword parameters:
+            n_pcks -- number of packets in block
+        
+        Returns:
+            n_errors -- array with number of bit errors in each packet
+            pck_error -- boolean array, True for packets with errors
+        """
+        n_errors = self.metrics.timed('fade',self.chann.sample_errors,\
+                                      n_pcks,self.param.n_bits)
+        pck_error = (n_errors != 0)
+        
+        return n_errors, pck_error
+    
+    def send_fused(self,n_pcks):
+        """
+        Counts the bit errors of a block of packets with the compiled fused
+        kernel. The kernel is seeded from the channel stream, so that runs
+        are reproducible. Falls back to send_batch() when Numba is not 
+        installed, with statistically equivalent, but different, results.
+        
+        Keyword parameters:
+            n_pcks -- number of packets in block
+        
+        Returns:
+            n_errors -- array with number of bit errors in each packet
+            pck_error -- boolean array, True for packets with errors
+        """
+        kernel = fused.get_kernel()
+        if kernel is None:
+            return self.send_batch(n_pcks)
+        
+        pck_bers = self.chann.packet_bers(n_pcks)
+        seed = int(self.chann.get_rnd_state().words(1)[0])
+        n_errors = self.metrics.timed('fused',kernel,pck_bers,\
+                                      self.param.n_bits,\
+                                      self.param.sparse_max_p,seed)
+        pck_error = (n_errors != 0)
+        
+        return n_errors, pck_error
+    
+    def batch_received(self,n_errors,pck_error):
+        """
+        Passes the packets of a block to the statistics, discarding the 
+        warm-up packets and weighting the others if the channel is biased.
+        
+        Keyword parameters:
+            n_errors -- array with number of bit errors in each packet
+            pck_error -- boolean array, True for packets with errors
+        """
+        n_warm_up = self.param.n_warm_up_pcks
+        weights = self.chann.likelihood_ratio(n_errors[n_warm_up:])
+        self.metrics.timed('statistics',self.stat.batch_received,\
+                           pck_error[n_warm_up:],weights)
+    
     def pck_loop(self):
         """
         Loops throug all the necessary packet transmissions.
         """
-        for pck in range(0,self.param.n_pcks):
-            # Send packet
-            n_errors, pck_error = self.send_pck()
+        if self.param.engine is EngineType.PER_PACKET:
+            for pck in range(0,self.param.n_pcks):
+                # Send packet
+                n_errors, pck_error = self.send_pck()
+                
+                # Save results only if warm-up is over
+                if pck > self.param.n_warm_up_pcks - 1:
+                    self.metrics.timed('statistics',self.stat.pck_received,\
+                                    pck_error,\
+                                    self.chann.likelihood_ratio(n_errors))
+                    
+        elif self.param.engine is EngineType.BATCH:
+            # Send all packets at once
+            n_errors, pck_error = self.send_batch(self.param.n_pcks)
+            
+            # Discard warm-up packets
+            self.batch_received(n_errors,pck_error)
             
-            # Save results only if warm-up is over
-            if pck > self.param.n_warm_up_pcks - 1:
-                self.stat.pck_received(pck_error)
+        elif self.param.engine is EngineType.ERROR_COUNT:
+            # Draw the errors of all packets at once
+            n_errors, pck_error = self.send_counts(self.param.n_pcks)
+            
+            # Discard warm-up packets
+            self.batch_received(n_errors,pck_error)
+            
+        elif self.param.engine is EngineType.FUSED:
+            # Count the errors of all packets in one compiled loop
+            n_errors, pck_error = self.send_fused(self.param.n_pcks)
+            
+            # Discard warm-up packets
+            self.batch_received(n_errors,pck_error)
+            
+        else:
+            raise NameError('Unknown packet engine!')
                 
-    def seed_loop(self):
+    def seed_loop(self,resume = False):
         """
         Loops through all the seeds.
+        
+        Keyword parameters:
+            resume -- if True, continues a point restored from a checkpoint
         """
-        if self.param.simulation_type is SimType.FIXED_SEEDS:
+        if not resume:
+            self.stopper.start_point()
+            self.__reps = []
+            self.__in_point = True
+        self.progress.point_started(self.get_ber_count(),\
+                                    self.chann.get_p_val())
+        
+        if self.param.seed_mode is SeedMode.SPAWNED:
+            # Replications with independent streams, possibly concurrent
+            self.replication_loop()
+            
+        elif self.param.simulation_type is SimType.FIXED_SEEDS:
             while(self.get_seed_count() < len(self.param.seeds)):
-                # Packet loop, send all packets
-                self.pck_loop()    
-
-                # After all packets have been sent calculate iteration results
-                self.stat.calc_iteration_results()
+                # Send all packets and calculate iteration results
+                self.replication()
                 
                 # Set new seed
                 self.new_seed()
+                self.checkpoint()
                 
         elif self.param.simulation_type is SimType.FIXED_CONF:
-            # Minimum confidence range between PER and Throughput
-            conf_min = 1
-            while(conf_min > self.param.conf_range):
-                # Packet loop, send all packets
-                self.pck_loop()    
-
-                # After all packets have been sent calculate iteration results
-                self.stat.calc_iteration_results()
-
-                # After all packets have been sent calculate iteration results
-                # Condition necessary for confidence interval can not be
-                # compyted with only one sample
-                if self.get_seed_count() > 0:
-                    per, per_conf = \
-                        self.stat.conf_interval(self.stat.get_per_list())
-                    thrpt, thrpt_conf = \
-                        self.stat.conf_interval(self.stat.get_thrpt_list())
+            while not self.seeds_done():
+                # Send all packets and calculate iteration results
+                self.replication()
+                
+                # Set new seed
+                self.new_seed()
+                self.checkpoint()
+        else:
+            raise NameError('Unknown simulation type!')
+        
+        self.stopper.end_point(self.stat.get_per_stats().get_n())
+        
+    def replication(self):
+        """
+        Runs the current replication: sends all packets, calculates the
+        iteration results and records them. If the replication is in the
+        cache, its results are read instead, and the Markov chain is left
+        in the same state as if it had run.
+        
+        Returns:
+            per -- packet error rate
+            thrpt -- throughput
+            elapsed -- wall time of replication, in seconds
+        """
+        start = time.time()
+        key = self.cache_key()
+        cached = None if key is None else self.cache.get(key)
+        
+        if cached is None:
+            # Packet loop, send all packets
+            self.pck_loop()
+            
+            # After all packets have been sent calculate iteration results
+            per, thrpt = self.stat.calc_iteration_results()
+            if key is not None:
+                self.cache.put(key,{'per': float(per),\
+                               'thrpt': float(thrpt),\
+                               'markov_state': \
+                                   int(self.chann.get_markov_state())})
+        else:
+            per, thrpt = cached['per'], cached['thrpt']
+            self.stat.store_iteration(per,thrpt)
+            self.chann.set_markov_state(cached['markov_state'])
+        elapsed = time.time() - start
+        
+        self.record_rep(per,thrpt,elapsed)
+        return per, thrpt, elapsed
+    
+    def cache_key(self):
+        """
+        Returns the cache key of the current replication, or None if there 
+        is no cache. Replications are keyed by parameters, p, seed and the
+        Markov state they start from, which LEGACY seed mode carries from 
+        one replication to the next.
+        """
+        if self.cache is None:
+            return None
+        if self.param.seed_mode is SeedMode.SPAWNED:
+            seed_key = ('spawned', self.get_seed_count())
+        else:
+            seed_key = ('seed', int(self.station.get_seed()))
+        return replication_key(self.__conf_key,self.chann.get_p_val(),\
+                               seed_key,self.chann.get_markov_state())
+    
+    def record_rep(self,per,thrpt,elapsed):
+        """
+        Records the results of the current replication for the result 
+        store. The seed is param.root_seed in SPAWNED seed mode, where the
+        replication index identifies the stream.
+        
+        Keyword parameters:
+            per -- packet error rate
+            thrpt -- throughput
+            elapsed -- wall time of replication, in seconds
+        """
+        if self.param.seed_mode is SeedMode.SPAWNED:
+            seed = self.param.root_seed
+        else:
+            seed = self.station.get_seed()
+        self.__reps.append((self.get_seed_count(),seed,per,thrpt,\
+                            self.param.n_pcks,elapsed))
+        self.metrics.export()
+        if self.progress.is_active():
+            self.progress.replication_done(self.stat.get_per_stats().get_n(),\
+                                           self.conf_ratio())
+    
+    def conf_ratio(self):
+        """
+        Returns the confidence delta of the current point over the 
+        tolerance, None before two replications.
+        """
+        n_reps = self.stat.get_per_stats().get_n()
+        if n_reps < 2:
+            return None
+        return self.stopper.conf_ratio(*self.stopper.checked_conf(n_reps,\
+                                       *self.stat.iteration_conf()))
+    
+    def replication_loop(self):
+        """
+        Loops through the replications of SPAWNED seed mode. If 
+        param.n_rep_workers > 1, replications run concurrently in a pool of 
+        workers. Finished replications are consumed in replication order,
+        so the same replications are used whatever the number of workers.
+        """
+        n_workers = self.param.n_rep_workers
+        pool = self.__rep_pool()
+        futures = {}
+        next_rep = self.get_seed_count()
+        try:
+            while not self.seeds_done():
+                if pool is None:
+                    # Send all packets and calculate iteration results
+                    self.replication()
+                else:
+                    # Keep the workers busy with the following replications
+                    while next_rep < self.get_seed_count() + 2*n_workers and\
+                          not self.__last_rep(next_rep):
+                        futures[next_rep] = pool.submit(simulate_replication,\
+                                                self.param,\
+                                                self.chann.get_p_val(),\
+                                                next_rep)
+                        next_rep = next_rep + 1
                     
-                    # Redefine minimum confidence
-                    conf_min = min([per_conf/per , thrpt_conf/thrpt])
+                    # Wait for the current replication
+                    per, thrpt, elapsed = \
+                        futures.pop(self.get_seed_count()).result()
+                    self.stat.store_iteration(per,thrpt)
+                    self.record_rep(per,thrpt,elapsed)
                 
                 # Set new seed
                 self.new_seed()
+                self.checkpoint()
+        finally:
+            if pool is not None:
+                pool.shutdown(wait = True,cancel_futures = True)
+                
+    def __rep_pool(self):
+        """
+        Returns the pool of replication workers, or None if replications
+        are run serially.
+        """
+        if self.param.n_rep_workers < 2:
+            return None
+        elif self.param.rep_executor is ExecutorType.PROCESS:
+            return ProcessPoolExecutor(max_workers=self.param.n_rep_workers)
+        elif self.param.rep_executor is ExecutorType.THREAD:
+            return ThreadPoolExecutor(max_workers=self.param.n_rep_workers)
+        else:
+            raise NameError('Unknown executor type!')
+            
+    def __last_rep(self,rep_idx):
+        """
+        Returns True if replication rep_idx is past the last replication 
+        known to be necessary.
+        """
+        return self.param.simulation_type is SimType.FIXED_SEEDS and \
+               rep_idx >= len(self.param.seeds)
+    
+    def seeds_done(self):
+        """
+        Returns True if enough seeds were simulated for the current p.
+        """
+        if self.param.simulation_type is SimType.FIXED_SEEDS:
+            return self.get_seed_count() >= len(self.param.seeds)
+        elif self.param.simulation_type is SimType.FIXED_CONF:
+            # Confidence interval can not be computed with only one sample
+            n_reps = self.stat.get_per_stats().get_n()
+            if n_reps < 2:
+                return False
+            
+            per_tpl, thrpt_tpl = self.stat.iteration_conf()
+            return self.stopper.point_done(n_reps,per_tpl,thrpt_tpl)
         else:
             raise NameError('Unknown simulation type!')
         
+    def point_converged(self):
+        """
+        Returns False if the current point stopped because of a budget, 
+        before reaching the tolerance.
+        """
+        if self.param.simulation_type is SimType.FIXED_CONF:
+            return self.stopper.is_converged()
+        return True
     
     def new_seed(self):
         """
@@ -139,8 +661,12 @@ class SimulationThread(object):
         # Increment seed counter
         self.__seed_count = self.__seed_count + 1
         
+        # If seeds are spawned for each replication
+        if self.param.seed_mode is SeedMode.SPAWNED:
+            self.spawn_seed()
+        
         # If simulation type is fixed seeds
-        if self.param.simulation_type is SimType.FIXED_SEEDS:
+        elif self.param.simulation_type is SimType.FIXED_SEEDS:
             
             # If the previous was not the last seed
             if self.get_seed_count() < len(self.param.seeds):
@@ -164,8 +690,12 @@ class SimulationThread(object):
         # Set seed counter to zero
         self.__seed_count = 0
         
+        # If seeds are spawned for each replication
+        if self.param.seed_mode is SeedMode.SPAWNED:
+            self.spawn_seed()
+        
         # If simulation type is fixed seeds
-        if self.param.simulation_type is SimType.FIXED_SEEDS:
+        elif self.param.simulation_type is SimType.FIXED_SEEDS:
             # New seed is taken from param.seeds
             self.station.set_seed(self.param.seeds[self.get_seed_count()])
             self.chann.set_seed(self.param.seeds[self.get_seed_count()])
@@ -179,10 +709,295 @@ class SimulationThread(object):
         else:
             raise NameError('Unknown simulation type!')
     
+    def set_replication(self,rep_idx):
+        """
+        Sets the seed counter to a given replication, and seeds all objects
+        accordingly. In LEGACY seed mode, objects are seeded as new_seed()
+        would, and replication 0 keeps the seeds the point starts with.
+        
+        Keyword parameters:
+            rep_idx -- replication index
+        """
+        if self.param.seed_mode is SeedMode.SPAWNED:
+            self.__seed_count = rep_idx
+            self.spawn_seed()
+        elif rep_idx > 0:
+            self.__seed_count = rep_idx - 1
+            self.new_seed()
+        
+    def spawn_seed(self):
+        """
+        Seeds all objects with the independent streams of the current 
+        replication, spawned from param.root_seed. The Markov chain also
+        restarts, so that replications do not depend on each other.
+        """
+        station_seed, chann_seed = \
+            rng.spawn_seeds(self.param.root_seed,self.get_seed_count(),2)
+        self.station.set_seed(station_seed)
+        self.chann.set_seed(chann_seed)
+        self.chann.reset_markov_state()
+    
+    def get_state(self):
+        """
+        Returns a picklable copy of the simulation state: counters, 
+        statistics, results, budgets and random generator states.
+        """
+        return {'ber_count': self.__ber_count,
+                'seed_count': self.__seed_count,
+                'reps': list(self.__reps),
+                'in_point': self.__in_point,
+                'station': self.station.get_state(),
+                'chann': self.chann.get_state(),
+                'stat': self.stat.get_state(),
+                'stopper': self.stopper.get_state(),
+                'res': self.res.get_state()}
+    
+    def set_state(self,state):
+        """Restores a state returned by get_state()."""
+        self.__ber_count = state['ber_count']
+        self.__seed_count = state['seed_count']
+        self.__reps = list(state['reps'])
+        self.__in_point = state['in_point']
+        self.station.set_state(state['station'])
+        self.chann.set_state(state['chann'])
+        self.stat.set_state(state['stat'])
+        self.stopper.set_state(state['stopper'])
+        self.res.set_state(state['res'])
+        
+    def checkpoint(self,force = False):
+        """
+        Saves the simulation state to param.checkpoint_file, if at least
+        param.checkpoint_interval seconds passed since the last checkpoint.
+        Only the simulate() loop saves checkpoints, never worker processes.
+        
+        Keyword parameters:
+            force -- if True, saves even before the interval
+        """
+        if not self.__checkpointing:
+            return
+        now = time.time()
+        if not force and \
+           now - self.__last_checkpoint < self.param.checkpoint_interval:
+            return
+        save_checkpoint(self.param.checkpoint_file,self.get_state())
+        self.__last_checkpoint = now
+        
+    def resume(self):
+        """
+        Restores the simulation state from param.checkpoint_file.
+        
+        Returns:
+            resumed -- False if there is no checkpoint
+        """
+        state = load_checkpoint(self.param.checkpoint_file)
+        if state is None:
+            return False
+        self.set_state(state)
+        return True
+    
     def new_ber(self):
         """
         Resets the channel's BER.
         """
         self.__ber_count = self.__ber_count + 1
         if self.get_ber_count() < len(self.param.p):
-            self.chann.set_p_val(self.param.p[self.get_ber_count()])
\ No newline at end of file
+            self.chann.set_p_val(self.param.p[self.get_ber_count()])
+            
+def simulate_point(param,p_idx,start_time):
+    """
+    Worker function of parallel_ber_loop: simulates a single point of p in a
+    new SimulationThread.
+    
+    Keyword parameters:
+        param -- parameters object
+        p_idx -- index of point in param.p
+        start_time -- time.time() at the beginning of sweep
+        
+    Returns:
+        per_tpl -- tuple containg PER mean value and confidence delta
+        thrpt_tpl -- tuple containing Tput mean value and confidence delta
+        converged -- False if point stopped before reaching tolerance
+        reps -- list of replication tuples of point, as get_reps()
+    """
+    sim = SimulationThread(param,"")
+    sim.stopper.start_sweep(start_time,1.0/len(param.p))
+    return sim.simulate_ber(p_idx)
+    
+def simulate_replication(param,p_val,rep_idx):
+    """
+    Worker function of replication_loop: simulates a single replication in
+    a new SimulationThread.
+    
+    Keyword parameters:
+        param -- parameters object
+        p_val -- BER of channel
+        rep_idx -- replication index
+        
+    Returns:
+        per -- packet error rate
+        thrpt -- throughput
+        elapsed -- wall time of replication, in seconds
+    """
+    sim = SimulationThread(param,"")
+    sim.chann.set_p_val(p_val)
+    sim.set_replication(rep_idx)
+    return sim.replication()
+    
+def simulate_block(param,p_idx,first_rep,n_reps,markov_state = 0):
+    """
+    Worker function of distributed_ber_loop: simulates a block of 
+    replications of a point in a new SimulationThread, starting from the 
+    same state as the serial loop.
+    
+    Keyword parameters:
+        param -- parameters object
+        p_idx -- index of point in param.p
+        first_rep -- index of first replication
+        n_reps -- number of replications
+        markov_state -- Markov state at beginning of first replication
+        
+    Returns:
+        reps -- list of replication tuples, as get_reps()
+        markov_state -- Markov state at end of last replication
+    """
+    sim = SimulationThread(param,"")
+    
+    # Points after the first one start from a reset seed
+    if p_idx > 0:
+        sim.reset_seed()
+    sim.chann.set_p_val(param.p[p_idx])
+    sim.set_replication(first_rep)
+    sim.chann.set_markov_state(markov_state)
+    for rep in range(0,n_reps):
+        sim.replication()
+        sim.new_seed()
+    return sim.get_reps(), sim.chann.get_markov_state()
+
+def contiguous_reps(reps):
+    """
+    Returns the replications received from the first one up to the first
+    missing one, in order.
+    
+    Keyword parameters:
+        reps -- dictionary of replication tuples, by index
+    """
+    rep_list = []
+    while len(rep_list) in reps:
+        rep_list.append(reps[len(rep_list)])
+    return rep_list
+
+def merge_point(param,reps,start_time,point_start = None):
+    """
+    Replays the replications of a point, in order, through the statistics 
+    and stopping rule of the serial loop, until the point is done. The 
+    results are those of the serial loop, whatever the order in which 
+    replications were simulated.
+    
+    Keyword parameters:
+        param -- parameters object
+        reps -- list of replication tuples of point, in order
+        start_time -- time.time() at the beginning of sweep
+        point_start -- time.time() at the beginning of point, now if None
+        
+    Returns:
+        done -- True if no more replications are needed
+        n_reps -- number of replications used if done, otherwise an 
+                  estimate of the number needed
+        per_tpl -- tuple containg PER mean value and confidence delta, None
+                   if not done
+        thrpt_tpl -- tuple containing Tput mean value and confidence delta,
+                     None if not done
+        converged -- False if point stopped before reaching tolerance, None
+                     if not done
+    """
+    stat = Statistics(param.n_bits,param.tx_rate,param.conf)
+    stopper = StoppingRule(param)
+    stopper.start_sweep(start_time,1.0/len(param.p))
+    stopper.start_point(point_start)
+    
+    n_reps = 0
+    while True:
+        if param.simulation_type is SimType.FIXED_SEEDS:
+            if n_reps >= len(param.seeds):
+                break
+        elif param.simulation_type is SimType.FIXED_CONF:
+            if n_reps >= 2 and \
+               stopper.point_done(n_reps,*stat.iteration_conf()):
+                break
+        else:
+            raise NameError('Unknown simulation type!')
+        
+        if n_reps == len(reps):
+            return False, needed_reps(param,stat,stopper,n_reps), \
+                   None, None, None
+        stat.store_iteration(reps[n_reps][2],reps[n_reps][3])
+        n_reps = n_reps + 1
+        
+    converged = stopper.is_converged() \
+                if param.simulation_type is SimType.FIXED_CONF else True
+    per_tpl, thrpt_tpl = stat.wrap_up()
+    return True, n_reps, per_tpl, thrpt_tpl, converged
+
+def needed_reps(param,stat,stopper,n_reps):
+    """
+    Estimates the number of replications a point needs. FIXED_CONF points
+    need about n*conf_ratio^2 replications, since confidence deltas shrink 
+    as 1/sqrt(n). The estimate at most doubles the replications, as batches
+    of the stopping rule grow, and is limited by the packet budget.
+    
+    Keyword parameters:
+        param -- parameters object
+        stat -- Statistics object with the replications of point
+        stopper -- StoppingRule object of point
+        n_reps -- number of replications of point
+    """
+    if param.simulation_type is SimType.FIXED_SEEDS:
+        return len(param.seeds)
+    
+    needed = max(2,param.first_rep_batch,n_reps + 1)
+    if n_reps >= 2:
+        ratio = stopper.conf_ratio(*stat.iteration_conf())
+        if np.isfinite(ratio):
+            needed = max(needed,int(np.ceil(n_reps*ratio**2)))
+        needed = min(needed,2*n_reps + param.queue_block)
+    if param.max_pcks_point is not None:
+        needed = min(needed,\
+                     max(n_reps + 1,\
+                         int(np.ceil(param.max_pcks_point/param.n_pcks))))
+    return needed
+
+def queue_worker(queue_dir,max_units = None):
+    """
+    Worker loop of distributed_ber_loop: claims units from the queue in
+    queue_dir, simulates them and writes their replications, until the 
+    coordinator stops the queue. The lease of a unit is renewed while it is
+    simulated.
+    
+    Keyword parameters:
+        queue_dir -- directory of work queue, shared with the coordinator
+        max_units -- number of units after which the worker exits, None for 
+                     no limit
+        
+    Returns:
+        n_units -- number of units simulated
+    """
+    work_queue = WorkQueue(queue_dir)
+    stale = work_queue.get_stop_time()
+    n_units = 0
+    while not work_queue.is_stopped(stale) and \
+          (max_units is None or n_units < max_units):
+        unit_id, unit = work_queue.claim()
+        if unit_id is None:
+            time.sleep(POLL_INTERVAL)
+            continue
+        with LeaseKeeper(work_queue,unit_id,unit['param'].lease_time/4):
+            reps, markov_state = simulate_block(unit['param'],unit['p_idx'],\
+                                                unit['first_rep'],\
+                                                unit['n_reps'],\
+                                                unit['markov_state'])
+        work_queue.complete(unit_id,{'p_idx': unit['p_idx'],
+                                     'reps': reps,
+                                     'markov_state': markov_state})
+        n_units = n_units + 1
+    return n_units
+
@@ -9,30 +9,42 @@ Created on Sun Mar 26 10:00:08 2017
 
 import numpy as np
 
+from src.support import bits
+from src.support import rng
+from src.support.enumerations import RngType
+
 class Source(object):
-    def __init__(self,n_bits,seed):
+    def __init__(self,n_bits,seed,packed = False,rng_type = RngType.LEGACY):
         """
         Class constructor.
         
         Keyword arguments:
             n_bits -- number of bits per packet
-            seed -- seed for random number generator
+            seed -- seed for random number generator, integer or numpy
+                    SeedSequence
+            packed -- if True, packets are bit-packed in uint8 words
+            rng_type -- random number generator type
         """
         self.__n_bits = n_bits
         self.__seed = seed
+        self.__packed = packed
         self.__last_pck = np.zeros([1,n_bits]) # last transmitted packet
-        self.__rnd_state = np.random.RandomState(seed)
+        self.__rnd_state = rng.RandomStream(rng_type,seed)
     
     def get_n_bits(self):
         """Returns the number of bits per packet."""
         return self.__n_bits
     
+    def is_packed(self):
+        """Returns True if packets are bit-packed."""
+        return self.__packed
+    
     def get_seed(self):
         """Returnt the random number generator seed."""
         return self.__seed
     
     def set_seed(self,seed):
-        """Set new seed."""
+        """Set new seed, integer or numpy SeedSequence."""
         self.__seed = seed
         self.__rnd_state.seed(seed)
     
@@ -41,9 +53,20 @@ class Source(object):
         return self.__last_pck
     
     def get_rnd_state(self):
-        """Returns the random state object."""
+        """Returns the random stream object."""
         return self.__rnd_state
     
+    def get_state(self):
+        """Returns a picklable copy of the seed and generator state."""
+        return {'seed': self.__seed,
+                'rnd_state': self.__rnd_state.get_state()}
+    
+    def set_state(self,state):
+        """Restores a state returned by get_state()."""
+        self.__seed = state['seed']
+        self.__rnd_state.seed(self.__seed)
+        self.__rnd_state.set_state(state['rnd_state'])
+    
     def generate_packet(self):
         """
         Returns a new, random generated, 0s and 1s packet.
@@ -52,25 +75,72 @@ class Source(object):
         Returns:
             pck -- generated packet
         """
-        pck = self.get_rnd_state().randint(2,\
-                                            size=self.get_n_bits())
+        if self.is_packed():
+            pck = self.__generate_packed(())
+        else:
+            pck = self.get_rnd_state().bits(self.get_n_bits())
         # Last packet is a copy of sent packet, for further comparison
         self.__last_pck = np.array(pck,copy = True)
 
         return pck
     
+    def generate_batch(self,n_pcks):
+        """
+        Returns a block of n_pcks random generated packets, one per row.
+        The same random numbers of n_pcks calls to generate_packet() are 
+        drawn. Also updates the last transmitted packet to the new block.
+        
+        Keyword arguments:
+            n_pcks -- number of packets in block
+        
+        Returns:
+            pcks -- (n_pcks x n_bits) array of generated packets
+        """
+        if self.is_packed():
+            pcks = self.__generate_packed((n_pcks,))
+        else:
+            pcks = self.get_rnd_state().bits((n_pcks,self.get_n_bits()))
+        # Last packet is a copy of sent block, for further comparison
+        self.__last_pck = np.array(pcks,copy = True)
+        
+        return pcks
+    
+    def __generate_packed(self,shape):
+        """
+        Returns random bit-packed packets, with zeroed padding bits. Whole
+        32 bit words are drawn for each packet, so that blocks of packets
+        are the same as sequences of packets.
+        
+        Keyword arguments:
+            shape -- shape of block of packets, () for a single packet
+        
+        Returns:
+            pcks -- uint8 array of packed packets
+        """
+        n_bits = self.get_n_bits()
+        n_words = bits.n_words(n_bits)
+        words = self.get_rnd_state().words(shape + ((n_words + 3) // 4,))
+        pcks = np.ascontiguousarray(words.view(np.uint8)[...,:n_words])
+        pcks[...,-1] &= bits.pad_mask(n_bits)
+        return pcks
+    
     def calculate_error(self,pck):
         """
-        Calculates bit and packet error.
+        Calculates bit and packet error. If a block of packets is received,
+        errors are calculated for each one of its rows.
         
         Keyword arguments:
-            pck --  received packet, to be compared with last packet
+            pck --  received packet (or block), to be compared with last 
+                    packet (or block)
             
         Returns:
             n_errors -- number of bit errors in received packet
             pck_error -- boolean, true if packet contains errors
         """
-        n_errors = np.sum(pck != self.get_last_pck())
+        if self.is_packed():
+            n_errors = bits.popcount(np.bitwise_xor(pck,self.get_last_pck()))
+        else:
+            n_errors = np.sum(pck != self.get_last_pck(), axis = -1)
         pck_error = (n_errors != 0)
         
         return n_errors, pck_error
\ No newline at end of file
@@ -7,8 +7,98 @@ Created on Tue Mar 28 10:29:08 2017
 @author: Calil
 """
 
+import copy
 import numpy as np
-import scipy.stats as sp
+from functools import lru_cache
+
+@lru_cache(maxsize = 1024)
+def t_quantile(conf,dof):
+    """
+    Returns the two-sided quantile of Student's t distribution. Values are 
+    cached, since the same quantiles are needed after every replication.
+    scipy.stats is only imported here, since it takes most of the startup 
+    time of the simulator.
+    
+    Keyword parameters:
+        conf -- confidence
+        dof -- degrees of freedom
+    """
+    import scipy.stats as sp
+    return sp.t.ppf((1+conf)/2.,dof)
+
+class RunningStats(object):
+    
+    def __init__(self):
+        """
+        Class constructor. Accumulates the number of samples, their mean and
+        the sum of squared deviations from the mean (Welford's algorithm),
+        so that each new sample is added in O(1) time and memory.
+        """
+        self.__n = 0
+        self.__mean = 0.0
+        self.__m2 = 0.0
+        
+    def get_n(self):
+        """Returns the number of samples."""
+        return self.__n
+    
+    def get_mean(self):
+        """Returns the sample mean."""
+        return np.float64(self.__mean)
+    
+    def get_var(self):
+        """Returns the unbiased sample variance."""
+        if self.__n < 2:
+            return np.float64(np.nan)
+        return np.float64(self.__m2/(self.__n - 1))
+    
+    def get_m2(self):
+        """Returns the sum of squared deviations from the mean."""
+        return self.__m2
+    
+    def add(self,x):
+        """
+        Adds a new sample.
+        
+        Keyword parameters:
+            x -- sample value
+        """
+        self.__n = self.__n + 1
+        delta = x - self.__mean
+        self.__mean = self.__mean + delta/self.__n
+        self.__m2 = self.__m2 + delta*(x - self.__mean)
+        
+    def merge(self,other):
+        """
+        Adds all samples of another accumulator (Chan et al.), e.g. one
+        filled by a parallel worker.
+        
+        Keyword parameters:
+            other -- RunningStats object
+        """
+        n_other = other.get_n()
+        if n_other == 0:
+            return
+        n = self.__n + n_other
+        delta = other.get_mean() - self.__mean
+        self.__mean = self.__mean + delta*n_other/n
+        self.__m2 = self.__m2 + other.get_m2() + \
+                    delta*delta*self.__n*n_other/n
+        self.__n = n
+        
+    def conf_interval(self,conf):
+        """
+        Calculates the confidence interval of the mean of samples.
+        
+        Keyword parameters:
+            conf -- confidence
+            
+        Returns:
+            mean_val -- mean value of samples
+            conf_int -- distance from mean of confidence interval
+        """
+        se = np.sqrt(self.get_var()/self.__n)
+        return self.get_mean(), se*t_quantile(conf,self.__n - 1)
 
 class Statistics(object):
     
@@ -21,8 +111,8 @@ class Statistics(object):
         self.__n_pcks = 0
         self.__n_pck_errors = 0
         
-        self.__per_list = []
-        self.__thrpt_list = []
+        self.__per_stats = RunningStats()
+        self.__thrpt_stats = RunningStats()
         
     def get_conf(self):
         return self.__conf
@@ -39,11 +129,25 @@ class Statistics(object):
     def get_n_pck_errors(self):
         return self.__n_pck_errors
     
-    def get_per_list(self):
-        return self.__per_list
+    def get_per_stats(self):
+        return self.__per_stats
     
-    def get_thrpt_list(self):
-        return self.__thrpt_list
+    def get_thrpt_stats(self):
+        return self.__thrpt_stats
+    
+    def get_state(self):
+        """Returns a picklable copy of the accumulated statistics."""
+        return {'n_pcks': self.__n_pcks,
+                'n_pck_errors': self.__n_pck_errors,
+                'per_stats': copy.deepcopy(self.__per_stats),
+                'thrpt_stats': copy.deepcopy(self.__thrpt_stats)}
+    
+    def set_state(self,state):
+        """Restores a state returned by get_state()."""
+        self.__n_pcks = state['n_pcks']
+        self.__n_pck_errors = state['n_pck_errors']
+        self.__per_stats = copy.deepcopy(state['per_stats'])
+        self.__thrpt_stats = copy.deepcopy(state['thrpt_stats'])
     
     def __reset(self):
         """
@@ -53,21 +157,43 @@ class Statistics(object):
         self.__n_pcks = 0
         self.__n_pck_errors = 0
     
-    def pck_received(self,pck_error):
+    def pck_received(self,pck_error,weight = None):
         """
         Increments number of transmitted packets and packet errors.
         
         Inputs:
             pck_error -- boolan indicating if there was a packet error
+            weight -- importance sampling weight of packet, None if not 
+                      weighted
         """
         self.__n_pcks = self.__n_pcks + 1
         if pck_error:
-            self.__n_pck_errors = self.__n_pck_errors + 1
+            self.__n_pck_errors = self.__n_pck_errors + \
+                                  (1 if weight is None else float(weight))
+            
+    def batch_received(self,pck_errors,weights = None):
+        """
+        Increments number of transmitted packets and packet errors for a
+        whole batch of packets. With importance sampling, packet errors are
+        counted with their weights, so that PER is an unbiased estimate.
+        
+        Inputs:
+            pck_errors -- boolean array indicating packets with errors
+            weights -- importance sampling weight of each packet, None if
+                       not weighted
+        """
+        self.__n_pcks = self.__n_pcks + len(pck_errors)
+        if weights is None:
+            self.__n_pck_errors = self.__n_pck_errors + \
+                                  int(np.count_nonzero(pck_errors))
+        else:
+            self.__n_pck_errors = self.__n_pck_errors + \
+                                  float(np.sum(weights[pck_errors]))
             
     def calc_iteration_results(self):
         """
         Calculates PER and throughput during a given iteration.
-        Also saves PER and throughput in their respective lists and
+        Also adds PER and throughput to their respective accumulators and
         finishes an iteration.
         
         Returns:
@@ -80,13 +206,36 @@ class Statistics(object):
         thrpt = (self.get_n_pcks() - self.get_n_pck_errors()) * \
         self.get_n_bits()/time
                                 
-        self.get_per_list().append(per)
-        self.get_thrpt_list().append(thrpt)
+        self.store_iteration(per,thrpt)
         
         self.__reset()
                                 
         return per, thrpt
     
+    def store_iteration(self,per,thrpt):
+        """
+        Adds PER and throughput of an iteration to their respective 
+        accumulators. Used directly for iterations run elsewhere, e.g. in 
+        worker processes.
+        
+        Keyword parameters:
+            per -- packet error rate
+            thrpt -- throughput      
+        """
+        self.get_per_stats().add(per)
+        self.get_thrpt_stats().add(thrpt)
+        
+    def merge(self,other):
+        """
+        Adds the iterations accumulated by another Statistics object, e.g. 
+        one filled by a parallel worker.
+        
+        Keyword parameters:
+            other -- Statistics object
+        """
+        self.get_per_stats().merge(other.get_per_stats())
+        self.get_thrpt_stats().merge(other.get_thrpt_stats())
+    
     def conf_interval(self,data_in):
         """
         Calculates the confidence interval of the mean of input data.
@@ -102,11 +251,25 @@ class Statistics(object):
         data = np.asarray(data_in)
         N_samples = len(data)
         mean_val = np.mean(data)
-        se = sp.sem(data)
-        conf_int = se*sp.t.ppf((1+self.get_conf())/2., N_samples-1)
+        se = np.std(data,ddof = 1)/np.sqrt(N_samples)
+        conf_int = se*t_quantile(self.get_conf(),N_samples-1)
         
         return mean_val, conf_int
     
+    def iteration_conf(self):
+        """
+        Calculates the confidence intervals of the iterations accumulated so
+        far, in O(1) time.
+        
+        Returns:
+            per_tpl -- tuple containg PER mean value and confidence delta
+            thrpt_tpl -- tuple containing Tput mean value and confidence delta
+        """
+        per_tpl = self.get_per_stats().conf_interval(self.get_conf())
+        thrpt_tpl = self.get_thrpt_stats().conf_interval(self.get_conf())
+        
+        return per_tpl, thrpt_tpl
+    
     def wrap_up(self):
         """
         Finishes a group of iterations, and calculates mean PER and Throughput.
@@ -118,14 +281,10 @@ class Statistics(object):
             thrpt_conf -- confidence increment for thrpt
         """
         
-        per, per_conf = self.conf_interval(self.get_per_list())
-        thrpt, thrpt_conf = self.conf_interval(self.get_thrpt_list())
-        
-        per_tpl = (per, per_conf)
-        thrpt_tpl = (thrpt, thrpt_conf)
+        per_tpl, thrpt_tpl = self.iteration_conf()
         
-        self.__per_list = []
-        self.__thrpt_list = []
+        self.__per_stats = RunningStats()
+        self.__thrpt_stats = RunningStats()
         self.__reset()
         
         return per_tpl, thrpt_tpl
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+StoppingRule class: decides when a FIXED_CONF point has enough replications.
+
+Created on Sun Oct 18 16:20:37 2026
+
+@author: Calil
+"""
+
+import time
+import numpy as np
+
+from src.support.enumerations import TolType
+
+def rel_conf(mean_val,conf_int):
+    """
+    Returns the confidence delta relative to the mean. The relative delta
+    of a zero mean is infinite, even if the delta is zero, so that a PER 
+    of 0 +- 0 never reaches a relative tolerance.
+    """
+    if mean_val == 0:
+        return np.inf
+    return abs(conf_int/mean_val)
+
+def zero_error_conf(n_pcks,conf):
+    """
+    Returns the upper confidence bound of a PER when no packet errors were
+    observed: the PER whose probability of no errors in n_pcks packets is
+    1 - conf. About 3/n_pcks for a confidence of 95%.
+    
+    Keyword parameters:
+        n_pcks -- number of packets without errors
+        conf -- confidence
+    """
+    return 1.0 - (1.0 - conf)**(1.0/n_pcks)
+
+class StoppingRule(object):
+
+    def __init__(self,param):
+        """
+        Class constructor. Replications are checked in growing batches: the
+        tolerance is checked after param.first_rep_batch replications, and
+        each following batch is param.rep_batch_growth times larger. A point
+        also stops, without converging, when one of the packet or wall time
+        budgets is exhausted.
+
+        Keyword parameters:
+            param -- parameters object
+        """
+        self.__tol_type = param.tol_type
+        self.__conf_range = param.conf_range
+        self.__conf_abs = param.conf_abs
+        self.__first_batch = max(2,param.first_rep_batch)
+        self.__growth = max(1.0,param.rep_batch_growth)
+        self.__n_pcks = param.n_pcks
+        self.__n_counted = max(1,param.n_pcks - param.n_warm_up_pcks)
+        self.__conf = param.conf
+        self.__max_pcks_point = param.max_pcks_point
+        self.__max_time_point = param.max_time_point
+        self.__max_pcks_sweep = param.max_pcks_sweep
+        self.__max_time_sweep = param.max_time_sweep
+
+        self.start_sweep()
+
+    def get_tol_type(self):
+        """Returns tolerance type."""
+        return self.__tol_type
+
+    def get_sweep_start(self):
+        """Returns time.time() at the beginning of sweep."""
+        return self.__sweep_start
+
+    def get_sweep_pcks(self):
+        """Returns number of packets sent in finished points of sweep."""
+        return self.__sweep_pcks
+
+    def is_converged(self):
+        """Returns True if the last point reached the tolerance."""
+        return self.__converged
+
+    def get_state(self):
+        """
+        Returns a picklable copy of the budgets and batches. Start times are
+        kept as elapsed times, so that time budgets continue after restore.
+        """
+        now = time.time()
+        return {'sweep_elapsed': now - self.__sweep_start,
+                'point_elapsed': now - self.__point_start,
+                'sweep_pcks': self.__sweep_pcks,
+                'pcks_share': self.__pcks_share,
+                'batch': self.__batch,
+                'next_check': self.__next_check,
+                'converged': self.__converged}
+    
+    def set_state(self,state):
+        """Restores a state returned by get_state()."""
+        now = time.time()
+        self.__sweep_start = now - state['sweep_elapsed']
+        self.__point_start = now - state['point_elapsed']
+        self.__sweep_pcks = state['sweep_pcks']
+        self.__pcks_share = state['pcks_share']
+        self.__batch = state['batch']
+        self.__next_check = state['next_check']
+        self.__converged = state['converged']
+
+    def start_sweep(self,start_time = None,pcks_share = 1.0):
+        """
+        Starts the budgets of a sweep.
+
+        Keyword parameters:
+            start_time -- time.time() at the beginning of sweep, now if None
+            pcks_share -- share of the sweep packet budget available, for 
+                          points simulated in separate processes
+        """
+        self.__sweep_start = time.time() if start_time is None else start_time
+        self.__sweep_pcks = 0
+        self.__pcks_share = pcks_share
+        self.start_point()
+
+    def start_point(self,start_time = None):
+        """
+        Starts the budgets and batches of a point.
+
+        Keyword parameters:
+            start_time -- time.time() at the beginning of point, now if None
+        """
+        self.__point_start = time.time() if start_time is None else start_time
+        self.__batch = self.__first_batch
+        self.__next_check = self.__first_batch
+        self.__converged = False
+
+    def end_point(self,n_reps):
+        """
+        Adds the packets of a finished point to the sweep budget.
+
+        Keyword parameters:
+            n_reps -- number of replications of point
+        """
+        self.__sweep_pcks = self.__sweep_pcks + n_reps*self.__n_pcks
+
+    def tol_reached(self,per_tpl,thrpt_tpl):
+        """
+        Checks the confidence intervals against the tolerance. RELATIVE
+        tolerance requires the smallest relative confidence delta of PER
+        and Throughput to be within conf_range. ABSOLUTE tolerance requires
+        the PER confidence delta to be within conf_abs.
+
+        Keyword parameters:
+            per_tpl -- tuple containg PER mean value and confidence delta
+            thrpt_tpl -- tuple containing Tput mean value and confidence delta
+        """
+        if self.get_tol_type() is TolType.RELATIVE:
+            conf_min = min([rel_conf(*per_tpl), rel_conf(*thrpt_tpl)])
+            return conf_min <= self.__conf_range
+        elif self.get_tol_type() is TolType.ABSOLUTE:
+            return per_tpl[1] <= self.__conf_abs
+        else:
+            raise NameError('Unknown tolerance type!')
+
+    def conf_ratio(self,per_tpl,thrpt_tpl):
+        """
+        Returns the confidence delta over the tolerance, as checked by 
+        tol_reached(): the tolerance is reached when it is at most 1.
+        
+        Keyword parameters:
+            per_tpl -- tuple containg PER mean value and confidence delta
+            thrpt_tpl -- tuple containing Tput mean value and confidence delta
+        """
+        if self.get_tol_type() is TolType.RELATIVE:
+            conf_min = min([rel_conf(*per_tpl), rel_conf(*thrpt_tpl)])
+            return conf_min/self.__conf_range
+        elif self.get_tol_type() is TolType.ABSOLUTE:
+            return per_tpl[1]/self.__conf_abs
+        else:
+            raise NameError('Unknown tolerance type!')
+        
+    def checked_conf(self,n_reps,per_tpl,thrpt_tpl):
+        """
+        Returns the confidence intervals checked against the tolerance. A
+        point without packet errors has a zero PER mean and delta, so its
+        deltas are replaced by the zero-error bound of the packets counted,
+        and the point only converges once that bound is within tolerance.
+        
+        Keyword parameters:
+            n_reps -- number of replications of current point
+            per_tpl -- tuple containg PER mean value and confidence delta
+            thrpt_tpl -- tuple containing Tput mean value and confidence delta
+        
+        Returns:
+            per_tpl -- checked PER mean value and confidence delta
+            thrpt_tpl -- checked Tput mean value and confidence delta
+        """
+        if per_tpl[0] != 0 or n_reps < 1:
+            return per_tpl, thrpt_tpl
+        bound = zero_error_conf(n_reps*self.__n_counted,self.__conf)
+        return (per_tpl[0], max(per_tpl[1],bound)), \
+               (thrpt_tpl[0], max(thrpt_tpl[1],bound*thrpt_tpl[0]))
+        
+    def budget_exhausted(self,n_reps):
+        """
+        Returns True if a packet or time budget is exhausted.
+
+        Keyword parameters:
+            n_reps -- number of replications of current point
+        """
+        point_pcks = n_reps*self.__n_pcks
+        now = time.time()
+        return (self.__max_pcks_point is not None and \
+                point_pcks >= self.__max_pcks_point) or \
+               (self.__max_time_point is not None and \
+                now - self.__point_start >= self.__max_time_point) or \
+               (self.__max_pcks_sweep is not None and \
+                self.__sweep_pcks + point_pcks >= \
+                self.__pcks_share*self.__max_pcks_sweep) or \
+               (self.__max_time_sweep is not None and \
+                now - self.__sweep_start >= self.__max_time_sweep)
+
+    def point_done(self,n_reps,per_tpl,thrpt_tpl):
+        """
+        Decides whether the current point has enough replications. The
+        tolerance is only checked at the end of each batch, or when a budget
+        is exhausted.
+
+        Keyword parameters:
+            n_reps -- number of replications of current point
+            per_tpl -- tuple containg PER mean value and confidence delta
+            thrpt_tpl -- tuple containing Tput mean value and confidence delta
+
+        Returns:
+            done -- True if no more replications are needed
+        """
+        # Confidence interval can not be computed with only one sample
+        if n_reps < 2:
+            return False
+
+        exhausted = self.budget_exhausted(n_reps)
+        if n_reps < self.__next_check and not exhausted:
+            return False
+
+        self.__converged = self.tol_reached(*self.checked_conf(n_reps,\
+                                                               per_tpl,\
+                                                               thrpt_tpl))
+        if self.__converged or exhausted:
+            return True
+
+        # Next batch
+        self.__batch = int(np.ceil(self.__batch*self.__growth))
+        self.__next_check = n_reps + self.__batch
+        return False
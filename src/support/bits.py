@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+Bit-packing helpers: packets are stored with 8 bits per uint8 word, most
+significant bit first (as in numpy.packbits).
+
+Created on Sun Oct 18 10:12:40 2026
+
+@author: Calil
+"""
+
+import numpy as np
+
+# Number of set bits of each byte value, used if numpy has no bitwise_count
+POPCOUNT_TABLE = np.array([bin(k).count('1') for k in range(256)],\
+                          dtype = np.uint8)
+
+def n_words(n_bits):
+    """Returns the number of uint8 words needed to store n_bits."""
+    return (n_bits + 7) // 8
+
+def pad_mask(n_bits):
+    """
+    Returns the mask of the valid bits of the last word of a packet. Padding
+    bits are always zero.
+    """
+    n_pad = 8*n_words(n_bits) - n_bits
+    return np.uint8((0xFF << n_pad) & 0xFF)
+
+def popcount(words,axis = -1):
+    """
+    Counts the set bits of packed words along given axis.
+
+    Keyword arguments:
+        words -- uint8 array of packed words
+        axis -- axis along which bits are counted
+
+    Returns:
+        n_ones -- number of set bits
+    """
+    if hasattr(np,'bitwise_count'):
+        return np.sum(np.bitwise_count(words),axis = axis,dtype = np.int64)
+    return np.sum(POPCOUNT_TABLE[words],axis = axis,dtype = np.int64)
+
+def flip_bits(words,n_bits,pos):
+    """
+    Flips bits of a (block of) packed packet(s), in place.
+
+    Keyword arguments:
+        words -- uint8 array of packed packets, one packet per row
+        n_bits -- number of bits per packet
+        pos -- positions of the flipped bits, counted across rows as if
+               the packets were unpacked and flattened
+    """
+    rows = words.reshape(-1,n_words(n_bits))
+    bit = pos % n_bits
+    masks = np.right_shift(np.uint8(0x80),(bit & 7).astype(np.uint8))
+    np.bitwise_xor.at(rows,(pos // n_bits,bit >> 3),masks)
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+Checkpoint files: the simulation state is pickled to a temporary file that
+atomically replaces the previous checkpoint, so that a checkpoint is never
+left half written.
+
+Created on Sun Oct 18 18:02:27 2026
+
+@author: Calil
+"""
+
+import os
+import pickle
+
+def save_checkpoint(file_name,state):
+    """
+    Saves a checkpoint.
+
+    Keyword arguments:
+        file_name -- checkpoint file
+        state -- picklable simulation state
+    """
+    tmp_name = file_name + '.tmp'
+    with open(tmp_name,'wb') as f:
+        pickle.dump(state,f,protocol = pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_name,file_name)
+
+def load_checkpoint(file_name):
+    """
+    Loads a checkpoint.
+
+    Keyword arguments:
+        file_name -- checkpoint file
+
+    Returns:
+        state -- simulation state, None if there is no checkpoint
+    """
+    if not os.path.exists(file_name):
+        return None
+    with open(file_name,'rb') as f:
+        return pickle.load(f)
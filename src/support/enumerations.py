@@ -32,4 +32,110 @@ class SimType(Enum):
     def __eq__(self,other):
         if self.__class__ is other.__class__:
             return self.value == other.value
-        return NotImplemented
\ No newline at end of file
+        return NotImplemented
+    
+class EngineType(Enum):
+    """
+    Packet engines used to run the packet loop.
+    """
+    PER_PACKET = 0
+    BATCH = 1
+    ERROR_COUNT = 2
+    FUSED = 3
+    
+    def __eq__(self,other):
+        if self.__class__ is other.__class__:
+            return self.value == other.value
+        return NotImplemented
+    
+class FadeMode(Enum):
+    """
+    Fading methods of the constant channel.
+    """
+    DENSE = 0
+    SPARSE = 1
+    AUTO = 2
+    
+    def __eq__(self,other):
+        if self.__class__ is other.__class__:
+            return self.value == other.value
+        return NotImplemented
+    
+class SeedMode(Enum):
+    """
+    Seeding of the replications of a simulation.
+    """
+    LEGACY = 0
+    SPAWNED = 1
+    
+    def __eq__(self,other):
+        if self.__class__ is other.__class__:
+            return self.value == other.value
+        return NotImplemented
+    
+class ExecutorType(Enum):
+    """
+    Types of parallel executor.
+    """
+    PROCESS = 0
+    THREAD = 1
+    
+    def __eq__(self,other):
+        if self.__class__ is other.__class__:
+            return self.value == other.value
+        return NotImplemented
+    
+class RngType(Enum):
+    """
+    Random number generators. LEGACY reproduces the numbers of numpy's
+    legacy RandomState (MT19937), the others are numpy Generators with the
+    respective bit generators.
+    """
+    LEGACY = 0
+    MT19937 = 1
+    PCG64 = 2
+    PHILOX = 3
+    SFC64 = 4
+    
+    def __eq__(self,other):
+        if self.__class__ is other.__class__:
+            return self.value == other.value
+        return NotImplemented
+    
+class TolType(Enum):
+    """
+    Types of tolerance of FIXED_CONF simulations.
+    """
+    RELATIVE = 0
+    ABSOLUTE = 1
+    
+    def __eq__(self,other):
+        if self.__class__ is other.__class__:
+            return self.value == other.value
+        return NotImplemented
+    
+class PlotMode(Enum):
+    """
+    Result plotting modes.
+    """
+    NONE = 0
+    SHOW = 1
+    SAVE = 2
+    BACKGROUND = 3
+    
+    def __eq__(self,other):
+        if self.__class__ is other.__class__:
+            return self.value == other.value
+        return NotImplemented
+    
+class MetricsFormat(Enum):
+    """
+    Formats of metrics snapshots.
+    """
+    JSON = 0
+    PROMETHEUS = 1
+    
+    def __eq__(self,other):
+        if self.__class__ is other.__class__:
+            return self.value == other.value
+        return NotImplemented
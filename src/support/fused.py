@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Fused packet kernel: counts the bit errors of a block of packets in a single
+loop over packets and bits, without the (n_pcks x n_bits) blocks of packets,
+uniforms and errors of the BATCH engine.
+
+The kernel is compiled with Numba, an optional dependency, only imported
+the first time the kernel is needed. When Numba is not installed,
+get_kernel() returns None and the simulator falls back to the numpy BATCH
+engine. The kernel draws other random numbers than the BATCH engine, so
+results with and without Numba are statistically equivalent, but not the
+same.
+
+Packets are not drawn: a bit is received in error when it is flipped by the
+channel, whatever its value, so XORing the received packet with the
+transmitted one only leaves the flips, and counting them is enough.
+
+Created on Mon Oct 19 01:47:22 2026
+
+@author: Calil
+"""
+
+import numpy as np
+
+# Compiled kernel, created on first use. False if Numba is not installed
+kernel = None
+
+def count_errors(pck_bers,n_bits,sparse_max_p,seed):
+    """
+    Counts the bit errors of a block of packets. Packets whose BER is at
+    most sparse_max_p jump from error to error by geometric gaps, as the
+    SPARSE fading method, and the others draw one uniform per bit, as the
+    DENSE method.
+
+    This is the plain Python version of the kernel, with a random state of
+    its own. It is as slow as it looks, and is kept as the reference of
+    kernel_source().
+
+    Keyword arguments:
+        pck_bers -- float64 array with the BER of each packet
+        n_bits -- number of bits per packet
+        sparse_max_p -- highest BER drawn by geometric gaps
+        seed -- uint32 seed of the kernel random state
+
+    Returns:
+        n_errors -- int64 array with number of bit errors in each packet
+    """
+    rnd_state = np.random.RandomState(seed)
+    n_pcks = pck_bers.shape[0]
+    n_errors = np.zeros(n_pcks,np.int64)
+    for i in range(n_pcks):
+        ber = pck_bers[i]
+        count = 0
+        if ber <= 0.0:
+            pass
+        elif ber <= sparse_max_p:
+            pos = rnd_state.geometric(ber) - 1
+            while pos < n_bits:
+                count += 1
+                pos += rnd_state.geometric(ber)
+        else:
+            for b in range(n_bits):
+                if rnd_state.random_sample() < ber:
+                    count += 1
+        n_errors[i] = count
+    return n_errors
+
+def kernel_source(pck_bers,n_bits,sparse_max_p,seed):
+    """
+    Source of the compiled kernel: count_errors() with the random state of
+    Numba, which is separate from numpy's global random state, since Numba
+    does not support RandomState objects. Only run compiled.
+
+    Keyword arguments:
+        pck_bers -- float64 array with the BER of each packet
+        n_bits -- number of bits per packet
+        sparse_max_p -- highest BER drawn by geometric gaps
+        seed -- uint32 seed of the kernel random state
+
+    Returns:
+        n_errors -- int64 array with number of bit errors in each packet
+    """
+    np.random.seed(seed)
+    n_pcks = pck_bers.shape[0]
+    n_errors = np.zeros(n_pcks,np.int64)
+    for i in range(n_pcks):
+        ber = pck_bers[i]
+        count = 0
+        if ber <= 0.0:
+            pass
+        elif ber <= sparse_max_p:
+            pos = np.random.geometric(ber) - 1
+            while pos < n_bits:
+                count += 1
+                pos += np.random.geometric(ber)
+        else:
+            for b in range(n_bits):
+                if np.random.random() < ber:
+                    count += 1
+        n_errors[i] = count
+    return n_errors
+
+def get_kernel():
+    """
+    Returns the compiled kernel, compiling it on first use, or None if
+    Numba is not installed.
+    """
+    global kernel
+    if kernel is None:
+        try:
+            import numba
+        except ImportError:
+            kernel = False
+        else:
+            kernel = numba.njit(nogil = True,cache = True)(kernel_source)
+    return kernel or None
+
+def is_available():
+    """Returns True if the compiled kernel can be used."""
+    return get_kernel() is not None
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+Profiling: runs a simulation under cProfile, and writes the pstats file, the
+collapsed stacks read by flamegraph tools (flamegraph.pl, speedscope,
+inferno) and the time spent in each simulator component.
+
+cProfile only records caller-callee pairs, not whole stacks, so stacks are
+sampled from a background thread while the profile runs.
+
+Created on Sun Oct 18 23:26:40 2026
+
+@author: Calil
+"""
+
+import os
+import sys
+import json
+import time
+import pstats
+import cProfile
+import threading
+
+# Source directory of the simulator
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Simulator components, by source file
+COMPONENTS = {'source.py': 'Source',
+              'channel.py': 'Channel',
+              'statistics.py': 'Statistics',
+              'theoretical.py': 'Theoretical',
+              'results.py': 'Results'}
+
+def component_of(func):
+    """
+    Returns the simulator component of a function key, None if it is not
+    a simulator component.
+
+    Keyword arguments:
+        func -- (file name, line, function name) tuple
+    """
+    file_name = os.path.abspath(func[0])
+    if os.path.dirname(file_name) != SRC_DIR:
+        return None
+    return COMPONENTS.get(os.path.basename(file_name))
+
+def frame_name(func):
+    """
+    Returns the name of a function key in collapsed stacks, e.g.
+    channel.py:fade. Semicolons separate frames and are replaced.
+
+    Keyword arguments:
+        func -- (file name, line, function name) tuple
+    """
+    file_name, line, name = func
+    return (os.path.basename(file_name) + ':' + name).replace(';',',')
+
+class StackSampler(object):
+
+    def __init__(self,interval = 1e-3):
+        """
+        Class constructor.
+
+        Keyword arguments:
+            interval -- time between samples, in seconds
+        """
+        self.__interval = interval
+        self.__stacks = {}
+        self.__stop = threading.Event()
+        self.__thread = None
+
+    def get_stacks(self):
+        """
+        Returns the sampled stacks: dictionary of time in seconds, by stack,
+        a tuple of (file name, line, function name) keys from root to leaf.
+        """
+        return self.__stacks
+
+    def start(self,thread_id = None):
+        """
+        Starts sampling a thread in background.
+
+        Keyword arguments:
+            thread_id -- identifier of sampled thread, current if None
+        """
+        if thread_id is None:
+            thread_id = threading.get_ident()
+        self.__stop.clear()
+        self.__thread = threading.Thread(target = self.__run,\
+                                         args = (thread_id,),daemon = True)
+        self.__thread.start()
+
+    def stop(self):
+        """Stops sampling."""
+        self.__stop.set()
+        self.__thread.join()
+
+    def __run(self,thread_id):
+        """
+        Sampling loop. Each sample is weighted by the time since the last
+        one, since the sampler may wait longer than the interval for the
+        interpreter lock.
+        """
+        last = time.perf_counter()
+        while not self.__stop.wait(self.__interval):
+            frame = sys._current_frames().get(thread_id)
+            now = time.perf_counter()
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_firstlineno, \
+                              code.co_name))
+                frame = frame.f_back
+            if stack:
+                stack = tuple(reversed(stack))
+                self.__stacks[stack] = self.__stacks.get(stack,0.0) + \
+                                       now - last
+            last = now
+
+def write_collapsed(file_name,stacks):
+    """
+    Writes stacks in collapsed format: one line per stack, with frames
+    separated by semicolons and the sampled time in microseconds.
+
+    Keyword arguments:
+        file_name -- output file
+        stacks -- dictionary returned by StackSampler.get_stacks()
+    """
+    with open(file_name,'w') as f:
+        for stack, elapsed in sorted(stacks.items()):
+            usecs = int(round(1e6*elapsed))
+            if usecs > 0:
+                f.write(';'.join(frame_name(func) for func in stack) + \
+                        ' ' + str(usecs) + '\n')
+
+def attribute(stacks):
+    """
+    Splits the profiled time among the simulator components. Time is
+    attributed to the innermost component of each stack, so that the numpy
+    calls of a component count as its own, and to 'other' if there is none.
+
+    Keyword arguments:
+        stacks -- dictionary returned by StackSampler.get_stacks()
+
+    Returns:
+        times -- dictionary of time in seconds, by component
+    """
+    times = {name: 0.0 for name in COMPONENTS.values()}
+    times['other'] = 0.0
+    for stack, elapsed in stacks.items():
+        name = 'other'
+        for func in reversed(stack):
+            if component_of(func) is not None:
+                name = component_of(func)
+                break
+        times[name] = times[name] + elapsed
+    return times
+
+def run_profile(func,args,profile_dir,tag,interval = 1e-3):
+    """
+    Profiles a function call, writing <tag>.pstats, <tag>.collapsed and
+    <tag>.json, with the time of each component, to profile_dir.
+
+    Keyword arguments:
+        func -- profiled function
+        args -- tuple of arguments of function
+        profile_dir -- output directory
+        tag -- name of profile files, e.g. a configuration digest
+        interval -- time between stack samples, in seconds
+
+    Returns:
+        out -- return value of function
+        times -- dictionary of time in seconds, by component
+    """
+    os.makedirs(profile_dir,exist_ok = True)
+    prefix = os.path.join(profile_dir,tag)
+
+    profiler = cProfile.Profile()
+    sampler = StackSampler(interval)
+    sampler.start()
+    try:
+        out = profiler.runcall(func,*args)
+    finally:
+        sampler.stop()
+    profiler.dump_stats(prefix + '.pstats')
+
+    stats = pstats.Stats(profiler)
+    stacks = sampler.get_stacks()
+    write_collapsed(prefix + '.collapsed',stacks)
+    times = attribute(stacks)
+    with open(prefix + '.json','w') as f:
+        json.dump({'tag': tag,
+                   'total_seconds': stats.total_tt,
+                   'components': times},f,indent = 1)
+    return out, times
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Random number generation layer: wraps numpy's legacy RandomState and the
+numpy Generators behind a single interface, selected by RngType.
+
+Created on Sun Oct 18 14:02:11 2026
+
+@author: Calil
+"""
+
+import numpy as np
+
+from src.support.enumerations import RngType
+
+# Bit generators of numpy Generators
+BIT_GENERATORS = [(RngType.MT19937, np.random.MT19937),
+                  (RngType.PCG64, np.random.PCG64),
+                  (RngType.PHILOX, np.random.Philox),
+                  (RngType.SFC64, np.random.SFC64)]
+
+def random_state(seed):
+    """
+    Creates a random state object from a seed.
+
+    Keyword arguments:
+        seed -- integer seed, or numpy SeedSequence of an independent stream
+
+    Returns:
+        rnd_state -- numpy RandomState object
+    """
+    if isinstance(seed,np.random.SeedSequence):
+        return np.random.RandomState(np.random.MT19937(seed))
+    return np.random.RandomState(seed)
+
+def spawn_seeds(root_seed,rep_idx,n_streams):
+    """
+    Derives the seeds of the independent streams of a replication from a
+    root seed. Replication rep_idx gets the same streams as the child rep_idx
+    of SeedSequence(root_seed).spawn(), whatever the number of replications.
+
+    Keyword arguments:
+        root_seed -- root seed of simulation
+        rep_idx -- replication index
+        n_streams -- number of streams of the replication
+
+    Returns:
+        seeds -- list of n_streams numpy SeedSequence objects
+    """
+    rep_seed = np.random.SeedSequence(root_seed,spawn_key = (rep_idx,))
+    return rep_seed.spawn(n_streams)
+
+class RandomStream(object):
+
+    def __init__(self,rng_type,seed):
+        """
+        Class constructor.
+
+        Keyword arguments:
+            rng_type -- random number generator type
+            seed -- integer seed, or numpy SeedSequence
+        """
+        self.__rng_type = rng_type
+        self.seed(seed)
+
+    def get_rng_type(self):
+        """Returns random number generator type."""
+        return self.__rng_type
+
+    def is_legacy(self):
+        """Returns True if numbers come from a legacy RandomState."""
+        return self.__rng_type is RngType.LEGACY
+
+    def seed(self,seed):
+        """
+        Restarts the stream from a new seed.
+
+        Keyword arguments:
+            seed -- integer seed, or numpy SeedSequence
+        """
+        if self.is_legacy():
+            self.__gen = random_state(seed)
+            return
+        for rng_type, bit_gen in BIT_GENERATORS:
+            if self.__rng_type is rng_type:
+                self.__gen = np.random.Generator(bit_gen(seed))
+                return
+        raise NameError('Unknown random number generator!')
+
+    def get_state(self):
+        """Returns a picklable copy of the generator state."""
+        if self.is_legacy():
+            return self.__gen.get_state()
+        return self.__gen.bit_generator.state
+
+    def set_state(self,state):
+        """Restores a state returned by get_state()."""
+        if self.is_legacy():
+            self.__gen.set_state(state)
+        else:
+            self.__gen.bit_generator.state = state
+
+    def random(self,size,dtype = np.float64):
+        """
+        Draws uniform numbers in [0, 1).
+
+        Keyword arguments:
+            size -- shape of output
+            dtype -- float64 or float32. float32 uniforms are faster, but
+                     have a resolution of 2**-24 only
+
+        Returns:
+            u -- array of uniform numbers
+        """
+        if self.is_legacy():
+            return self.__gen.random_sample(size).astype(dtype,copy = False)
+        return self.__gen.random(size,dtype = dtype)
+
+    def bits(self,size):
+        """
+        Draws random 0s and 1s, int64 for LEGACY (as RandomState.randint)
+        and uint8 otherwise. Generator bits are unpacked from whole 32 bit
+        words for each row, since Generator buffers bits within a call 
+        only, so that blocks of bits are the same as the sequence of their
+        rows, as for LEGACY.
+
+        Keyword arguments:
+            size -- shape of output
+
+        Returns:
+            bits -- array of random bits
+        """
+        if self.is_legacy():
+            return self.__gen.randint(2,size = size)
+        shape = tuple(np.atleast_1d(size))
+        words = self.words(shape[:-1] + ((shape[-1] + 31) // 32,))
+        return np.unpackbits(words.view(np.uint8),axis = -1,\
+                             count = shape[-1])
+
+    def words(self,size):
+        """
+        Draws random uint32 words, one 32 bit draw each, so that blocks of
+        words are the same as the sequence of their rows.
+
+        Keyword arguments:
+            size -- shape of output
+
+        Returns:
+            words -- uint32 array of random words
+        """
+        if self.is_legacy():
+            return self.__gen.randint(2**32,size = size,dtype = np.uint32)
+        return self.__gen.integers(0,2**32,size = size,dtype = np.uint32)
+
+    def geometric(self,p,size):
+        """Draws geometric numbers of trials until first success."""
+        return self.__gen.geometric(p,size = size)
+
+    def binomial(self,n,p,size):
+        """Draws binomial numbers of successes in n trials."""
+        return self.__gen.binomial(n,p,size = size)
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+Sweep class: simulates a multi-dimensional grid of parameters.
+
+Each point of the grid is an independent job, a single value of p with a
+SimConfig of its own. Jobs run on a pool of worker processes, the costly
+ones first, and their results are collected into arrays indexed by grid
+position.
+
+Created on Sun Oct 18 20:41:05 2026
+
+@author: Calil
+"""
+
+import itertools
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+
+from simulation_thread import SimulationThread
+from theoretical import Theoretical
+from src.support.enumerations import SimType
+from src.support.enumerations import PlotMode
+
+class Sweep(object):
+
+    def __init__(self,config,axes,n_workers = None):
+        """
+        Class constructor.
+
+        Keyword parameters:
+            config -- SimConfig with the values of parameters not swept
+            axes -- list of (name, values) pairs, one per swept parameter.
+                    Any SimConfig parameter can be swept, e.g. n_bits,
+                    tx_rate, chan_mod, P00 ... P21 (transition matrix rows),
+                    transition_mtx or p. If p is not an axis, config.p is
+                    the last axis
+            n_workers -- number of worker processes, config.n_workers if
+                         None. If 1, jobs run serially
+        """
+        axes = [(name, list(values)) for name, values in axes]
+        if 'p' not in [name for name, values in axes]:
+            axes.append(('p', list(config.p)))
+        self.__config = config
+        self.__axes = axes
+        self.__n_workers = config.n_workers if n_workers is None \
+                           else n_workers
+
+    def get_config(self):
+        """Returns configuration of values not swept."""
+        return self.__config
+
+    def get_axes(self):
+        """Returns list of (name, values) pairs of swept parameters."""
+        return self.__axes
+
+    def get_shape(self):
+        """Returns shape of grid."""
+        return tuple(len(values) for name, values in self.get_axes())
+
+    def jobs(self):
+        """
+        Expands the grid into jobs.
+
+        Returns:
+            jobs -- list of (index, config) pairs: grid index tuple and
+                    SimConfig of a single point of p
+        """
+        jobs = []
+        for index in itertools.product(*[range(n) for n in self.get_shape()]):
+            changes = {name: values[idx] for (name, values), idx \
+                       in zip(self.get_axes(),index)}
+            changes['p'] = [changes['p']]
+            changes.update(n_workers = 1,plot_mode = PlotMode.NONE,\
+                           checkpoint_file = None,results_dir = None)
+            jobs.append((index, self.get_config().replace(**changes)))
+        return jobs
+
+    def ordered_jobs(self):
+        """
+        Returns the jobs sorted by decreasing cost, so that the longest
+        jobs start first and do not delay the end of the sweep.
+        """
+        jobs = self.jobs()
+        costs = [job_cost(config) for index, config in jobs]
+        order = sorted(range(len(jobs)),key = lambda k: -costs[k])
+        return [jobs[k] for k in order]
+
+    def run(self):
+        """
+        Simulates all jobs and collects their results.
+
+        Returns:
+            result -- SweepResult object
+        """
+        result = SweepResult(self.get_axes())
+        jobs = self.ordered_jobs()
+        if self.__n_workers < 2:
+            for index, config in jobs:
+                result.store(index,*simulate_job(config))
+            return result
+
+        with ProcessPoolExecutor(max_workers = self.__n_workers) as pool:
+            futures = {pool.submit(simulate_job,config): index \
+                       for index, config in jobs}
+            for future in as_completed(futures):
+                result.store(futures[future],*future.result())
+        return result
+
+class SweepResult(object):
+
+    def __init__(self,axes):
+        """
+        Class constructor. Results are numpy arrays with one dimension per
+        swept parameter, NaN until their job is stored.
+
+        Keyword parameters:
+            axes -- list of (name, values) pairs of swept parameters
+        """
+        self.__axes = axes
+        shape = tuple(len(values) for name, values in axes)
+        self.__per = np.full(shape,np.nan)
+        self.__per_conf = np.full(shape,np.nan)
+        self.__thrpt = np.full(shape,np.nan)
+        self.__thrpt_conf = np.full(shape,np.nan)
+        self.__per_theo = np.full(shape,np.nan)
+        self.__thrpt_theo = np.full(shape,np.nan)
+        self.__converged = np.zeros(shape,dtype = bool)
+        self.__reps = {}
+
+    def get_axes(self):
+        """Returns list of (name, values) pairs of swept parameters."""
+        return self.__axes
+
+    def get_per(self):
+        """Returns array of PER mean values."""
+        return self.__per
+
+    def get_per_conf(self):
+        """Returns array of PER confidence deltas."""
+        return self.__per_conf
+
+    def get_thrpt(self):
+        """Returns array of Throughput mean values."""
+        return self.__thrpt
+
+    def get_thrpt_conf(self):
+        """Returns array of Throughput confidence deltas."""
+        return self.__thrpt_conf
+
+    def get_per_theo(self):
+        """Returns array of theoretical PER."""
+        return self.__per_theo
+
+    def get_thrpt_theo(self):
+        """Returns array of theoretical Throughput."""
+        return self.__thrpt_theo
+
+    def get_converged(self):
+        """Returns array of convergence flags."""
+        return self.__converged
+
+    def get_reps(self,index):
+        """Returns the replication tuples of a grid index."""
+        return self.__reps[tuple(index)]
+
+    def store(self,index,per_tpl,thrpt_tpl,converged,reps,theo):
+        """
+        Stores the results of a job.
+
+        Keyword parameters:
+            index -- grid index tuple of job
+            per_tpl -- tuple containg PER mean value and confidence delta
+            thrpt_tpl -- tuple containing Tput mean value and confidence delta
+            converged -- False if point stopped before reaching tolerance
+            reps -- list of replication tuples of point
+            theo -- tuple of theoretical PER and Throughput
+        """
+        index = tuple(index)
+        self.__per[index], self.__per_conf[index] = per_tpl
+        self.__thrpt[index], self.__thrpt_conf[index] = thrpt_tpl
+        self.__per_theo[index], self.__thrpt_theo[index] = theo
+        self.__converged[index] = converged
+        self.__reps[index] = reps
+
+def job_cost(config):
+    """
+    Estimates the cost of a job, proportional to the number of simulated
+    bits. FIXED_CONF replications grow as 1/PER, so low p and long packets
+    are the costly points.
+
+    Keyword parameters:
+        config -- SimConfig of a single point of p
+
+    Returns:
+        cost -- estimated cost
+    """
+    pck_bits = config.n_bits*config.n_pcks
+    if config.simulation_type is SimType.FIXED_SEEDS:
+        return pck_bits*len(config.seeds)
+    ber_theo, per_theo, thrpt_theo = Theoretical(config).validate()
+    return pck_bits/max(per_theo[0],1.0/config.n_pcks)
+
+def simulate_job(config):
+    """
+    Worker function of Sweep: simulates a single point of p in a new
+    SimulationThread.
+
+    Keyword parameters:
+        config -- SimConfig of a single point of p
+
+    Returns:
+        per_tpl -- tuple containg PER mean value and confidence delta
+        thrpt_tpl -- tuple containing Tput mean value and confidence delta
+        converged -- False if point stopped before reaching tolerance
+        reps -- list of replication tuples of point
+        theo -- tuple of theoretical PER and Throughput
+    """
+    sim = SimulationThread(config,"")
+    per_tpl, thrpt_tpl, converged, reps = sim.simulate_ber(0)
+    ber_theo, per_theo, thrpt_theo = sim.theo.validate()
+    return per_tpl, thrpt_tpl, converged, reps, (per_theo[0], thrpt_theo[0])
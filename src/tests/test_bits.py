@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for bit-packing helpers.
+
+Created on Sun Oct 18 10:40:02 2026
+
+@author: Calil
+"""
+
+import unittest
+import numpy as np
+
+from src.support import bits
+
+class BitsTest(unittest.TestCase):
+    
+    def test_n_words(self):
+        self.assertEqual(125,bits.n_words(1000))
+        self.assertEqual(126,bits.n_words(1001))
+        
+    def test_pad_mask(self):
+        self.assertEqual(0xFF,bits.pad_mask(1000))
+        self.assertEqual(0x80,bits.pad_mask(1001))
+        self.assertEqual(0xF0,bits.pad_mask(12))
+        
+    def test_popcount(self):
+        words = np.array([[0, 1, 255], [3, 128, 0]],dtype = np.uint8)
+        self.assertTrue(np.all(np.array([9, 3]) == bits.popcount(words)))
+        
+        # Table lookup should give the same result
+        all_bytes = np.arange(256,dtype = np.uint8)
+        self.assertEqual(np.sum(np.unpackbits(all_bytes)),\
+                         np.sum(bits.POPCOUNT_TABLE))
+        
+    def test_flip_bits(self):
+        n_bits = 12
+        words = np.zeros([3,bits.n_words(n_bits)],dtype = np.uint8)
+        pos = np.array([0, 9, 11, 12, 35])
+        bits.flip_bits(words,n_bits,pos)
+        
+        # Unpacked bits should be set at the flipped positions
+        unpacked = np.unpackbits(words,axis = -1)[:,:n_bits].reshape(-1)
+        self.assertTrue(np.all(pos == np.flatnonzero(unpacked)))
+        
+        # Flipping the same bits again should undo it
+        bits.flip_bits(words,n_bits,pos)
+        self.assertEqual(0,np.sum(words))
+        
+if __name__ == '__main__':
+    unittest.main()
@@ -11,6 +11,8 @@ import unittest
 import numpy as np
 
 from src.support.enumerations import ChannelModel
+from src.support.enumerations import FadeMode
+from src.support.enumerations import RngType
 from src.channel import Channel
 
 class ChannelTest(unittest.TestCase):
@@ -20,8 +22,16 @@ class ChannelTest(unittest.TestCase):
         p_val = 1e-5
         self.channel1 = Channel(ChannelModel.IDEAL,seed,p_val)
         self.channel2 = Channel(ChannelModel.CONSTANT,seed,p_val)
-        self.channel3 = Channel(ChannelModel.MARKOV,seed,p_val)
+        self.mtx = np.array([[0.8, 0.1, 0.1],
+                             [0.8, 0.1, 0.1],
+                             [0.8, 0.1, 0.1]])
+        self.channel3 = Channel(ChannelModel.MARKOV,seed,p_val,\
+                                transition_mtx = self.mtx)
         self.channel4 = Channel(3,seed,p_val)
+        self.channel5 = Channel(ChannelModel.CONSTANT,seed,p_val,\
+                                FadeMode.SPARSE)
+        self.channel6 = Channel(ChannelModel.CONSTANT,seed,p_val,\
+                                FadeMode.AUTO,1e-2)
         
     def test_get_model(self):
         self.assertEqual(ChannelModel.IDEAL,\
@@ -41,10 +51,268 @@ class ChannelTest(unittest.TestCase):
         self.channel1.set_p_val(2e-5)
         self.assertEqual(2e-5,self.channel1.get_p_val())
         
+    def test_get_fade_mode(self):
+        self.assertEqual(FadeMode.DENSE,self.channel2.get_fade_mode())
+        self.assertEqual(FadeMode.SPARSE,self.channel5.get_fade_mode())
+        self.assertEqual(1e-2,self.channel6.get_sparse_max_p())
+        
+    def test_is_sparse(self):
+        self.assertFalse(self.channel2.is_sparse())
+        self.assertTrue(self.channel5.is_sparse())
+        
+        # AUTO mode switches to DENSE method at high BER
+        self.assertTrue(self.channel6.is_sparse())
+        self.channel6.set_p_val(0.1)
+        self.assertFalse(self.channel6.is_sparse())
+        
+    def test_fade_sparse(self):
+        # Sparse channel should introduce errors with the same rate
+        self.channel5.set_p_val(0.01)
+        pcks_Rx = self.channel5.fade(np.zeros([100,self.n_bits]))
+        self.assertTrue(np.all((pcks_Rx == 0) | (pcks_Rx == 1)))
+        self.assertAlmostEqual(1000.0,np.sum(pcks_Rx),delta = 100)
+        
+        # Fading packet by packet should yield the same errors as blocks
+        self.channel5.set_seed(20)
+        pcks_Rx = self.channel5.fade(np.zeros([10,self.n_bits],dtype = int))
+        self.channel5.set_seed(20)
+        for k in range(0,10):
+            pck_Rx = self.channel5.fade(np.zeros(self.n_bits,dtype = int))
+            self.assertTrue(np.all(pcks_Rx[k] == pck_Rx))
+            
+        # Bits are flipped in place
+        pck_Tx = np.ones(self.n_bits,dtype = int)
+        self.channel5.set_p_val(1.0)
+        pck_Rx = self.channel5.fade(pck_Tx)
+        self.assertEqual(0,np.sum(pck_Tx))
+        self.assertEqual(0,np.sum(pck_Rx))
+        
+    def test_sample_errors(self):
+        # Ideal channel should cause no bit errors
+        n_errors = self.channel1.sample_errors(100,self.n_bits)
+        self.assertEqual(100,len(n_errors))
+        self.assertEqual(0,np.sum(n_errors))
+        
+        # Constant channel errors should match BER
+        self.channel2.set_p_val(0.01)
+        n_errors = self.channel2.sample_errors(100,self.n_bits)
+        self.assertEqual(100,len(n_errors))
+        self.assertAlmostEqual(1000.0,np.sum(n_errors),delta = 100)
+        
+        # Markov channel errors should match the BER of each state
+        self.channel3.set_p_val(0.01)
+        n_errors = self.channel3.sample_errors(1000,self.n_bits)
+        self.assertEqual(1000,len(n_errors))
+        self.assertAlmostEqual(0.1*0.5*1e6 + 0.1*0.01*1e6,np.sum(n_errors),\
+                               delta = 5000)
+        
+        # Invalid Channel Model should raise exception
+        with self.assertRaises(NameError):
+            self.channel4.sample_errors(100,self.n_bits)
+        
+    def test_packet_bers(self):
+        # Ideal channel packets have no errors
+        self.assertTrue(np.all(self.channel1.packet_bers(10) == 0.0))
+        
+        # Constant channel packets have the channel BER
+        self.channel2.set_p_val(0.01)
+        pck_bers = self.channel2.packet_bers(10)
+        self.assertEqual(10,len(pck_bers))
+        self.assertTrue(np.all(pck_bers == 0.01))
+        
+        # Markov channel packets have the BER of their state, and the chain
+        # moves as in sample_errors()
+        self.channel3.set_p_val(0.01)
+        state = self.channel3.get_state()
+        pck_bers = self.channel3.packet_bers(1000)
+        self.assertTrue(set(pck_bers) <= {0.0, 0.5, 0.01})
+        self.channel3.set_state(state)
+        states = self.channel3.markov_states(1000)
+        self.assertTrue(np.all(self.channel3.get_state_bers()[states] == \
+                               pck_bers))
+        
+        # Invalid Channel Model should raise exception
+        with self.assertRaises(NameError):
+            self.channel4.packet_bers(10)
+        
+    def test_fade_packed(self):
+        n_bits = 1001
+        pcks_Tx = np.zeros([20,n_bits],dtype = int)
+        packed_Tx = np.packbits(pcks_Tx,axis = -1)
+        
+        # Packed channels should flip the same bits as unpacked channels
+        for mode in [FadeMode.DENSE, FadeMode.SPARSE]:
+            chann = Channel(ChannelModel.CONSTANT,10,0.01,mode)
+            chann_packed = Channel(ChannelModel.CONSTANT,10,0.01,mode,\
+                                   packed = True,n_bits = n_bits)
+            self.assertTrue(chann_packed.is_packed())
+            self.assertEqual(n_bits,chann_packed.get_n_bits())
+            
+            pcks_Rx = chann.fade(np.array(pcks_Tx,copy = True))
+            packed_Rx = chann_packed.fade(np.array(packed_Tx,copy = True))
+            self.assertEqual(np.uint8,packed_Rx.dtype)
+            self.assertTrue(np.all(np.packbits(pcks_Rx.astype(int),\
+                                               axis = -1) == packed_Rx))
+            
+    def test_importance_sampling(self):
+        chann = Channel(ChannelModel.CONSTANT,10,1e-6,n_bits = self.n_bits,\
+                        importance_sampling = True)
+        self.assertTrue(chann.is_biased())
+        self.assertTrue(chann.get_bias() > 1e-4)
+        self.assertIsNone(self.channel2.likelihood_ratio(np.array([0, 1])))
+        with self.assertRaises(ValueError):
+            Channel(ChannelModel.CONSTANT,10,1e-6,importance_sampling = True)
+        
+        # Likelihood ratio of packets without errors
+        weights = chann.likelihood_ratio(np.array([0, 2]))
+        q_val = chann.get_bias()
+        self.assertAlmostEqual(((1 - 1e-6)/(1 - q_val))**self.n_bits,\
+                               weights[0])
+        self.assertTrue(weights[1] < weights[0])
+        
+        # Weighted packet errors estimate PER without bias
+        n_errors = chann.sample_errors(100000,self.n_bits)
+        self.assertTrue(np.mean(n_errors > 0) > 0.1)
+        weights = chann.likelihood_ratio(n_errors)
+        per_theo = 1 - (1 - 1e-6)**self.n_bits
+        self.assertAlmostEqual(per_theo,np.mean(weights*(n_errors > 0)),\
+                               delta = 0.05*per_theo)
+        
+        # Packets are faded with biased BER
+        pck_Rx = chann.fade(np.zeros([100,self.n_bits]))
+        self.assertTrue(np.sum(pck_Rx) > 10)
+        
+        # Markov channel is not biased
+        chann = Channel(ChannelModel.MARKOV,10,1e-6,n_bits = self.n_bits,\
+                        transition_mtx = self.mtx,importance_sampling = True)
+        self.assertFalse(chann.is_biased())
+        
+    def test_get_state(self):
+        # Restored channel should continue the same error stream
+        chann = Channel(ChannelModel.CONSTANT,10,0.01,FadeMode.SPARSE)
+        chann.fade(np.zeros(500))
+        state = chann.get_state()
+        pck_Rx = chann.fade(np.zeros(self.n_bits))
+        
+        chann = Channel(ChannelModel.CONSTANT,0,1e-5,FadeMode.SPARSE)
+        chann.set_state(state)
+        self.assertEqual(10,chann.get_seed())
+        self.assertEqual(0.01,chann.get_p_val())
+        self.assertTrue(np.all(pck_Rx == chann.fade(np.zeros(self.n_bits))))
+        
+        # Markov state is restored
+        self.channel3.set_markov_state(2)
+        state = self.channel3.get_state()
+        self.channel3.reset_markov_state()
+        self.channel3.set_state(state)
+        self.assertEqual(2,self.channel3.get_markov_state())
+        
+    def test_rng_type(self):
+        chann = Channel(ChannelModel.CONSTANT,10,0.01,\
+                        rng_type = RngType.PHILOX,uniform_dtype = np.float32)
+        rnd_state = chann.get_rnd_state()
+        self.assertEqual(RngType.PHILOX,rnd_state.get_rng_type())
+        
+        # Same errors are drawn from the same state
+        state = rnd_state.get_state()
+        pck_Rx = chann.fade(np.zeros(self.n_bits))
+        self.assertAlmostEqual(10.0,np.sum(pck_Rx),delta = 10)
+        rnd_state.set_state(state)
+        self.assertTrue(np.all(pck_Rx == chann.fade(np.zeros(self.n_bits))))
+        
+    def test_markov_states(self):
+        # Missing transition matrix should raise exception
+        with self.assertRaises(ValueError):
+            Channel(ChannelModel.MARKOV,10,1e-5)
+        self.assertTrue(np.all(self.mtx == self.channel3.get_transition_mtx()))
+        self.assertTrue(np.all(np.array([0.0, 0.5, 1e-5]) == \
+                               self.channel3.get_state_bers()))
+        
+        # Chain starts at Good state and keeps its last state
+        self.assertEqual(0,self.channel3.get_markov_state())
+        states = self.channel3.markov_states(10000)
+        self.assertEqual(states[-1],self.channel3.get_markov_state())
+        for state, prob in enumerate([0.8, 0.1, 0.1]):
+            self.assertAlmostEqual(prob,np.mean(states == state),delta = 0.02)
+            
+        # Vectorized chain should follow the transitions one by one
+        mtx = np.array([[0.0, 1.0, 0.0],
+                        [0.0, 0.0, 1.0],
+                        [0.5, 0.0, 0.5]])
+        chann = Channel(ChannelModel.MARKOV,10,1e-5,transition_mtx = mtx)
+        states = chann.markov_states(1000)
+        prev = np.concatenate(([0],states[:-1]))
+        self.assertTrue(np.all(mtx[prev,states] > 0))
+        
+        # Blocks of states should be the same as states drawn one by one
+        chann.set_seed(3)
+        chann.set_markov_state(2)
+        states = chann.markov_states(100)
+        chann.set_seed(3)
+        chann.set_markov_state(2)
+        self.assertTrue(np.all(states == \
+                   np.concatenate([chann.markov_states(1) for k in range(100)])))
+        
+        # State persists across seeds, and restarts with new p
+        chann.set_seed(4)
+        self.assertEqual(states[-1],chann.get_markov_state())
+        chann.set_p_val(1e-4)
+        self.assertEqual(0,chann.get_markov_state())
+        
+    def test_fade_markov(self):
+        n_bits = 1001
+        pcks_Tx = np.zeros([200,n_bits],dtype = int)
+        chann = Channel(ChannelModel.MARKOV,10,0.01,transition_mtx = self.mtx)
+        chann_packed = Channel(ChannelModel.MARKOV,10,0.01,packed = True,\
+                               n_bits = n_bits,transition_mtx = self.mtx)
+        
+        # Errors of each packet should match the BER of its state
+        chann.set_markov_state(1)
+        pcks_Rx = chann.fade(pcks_Tx)
+        chann.set_seed(10)
+        chann.set_markov_state(1)
+        states = chann.markov_states(len(pcks_Tx))
+        n_errors = np.sum(pcks_Rx,axis = 1)
+        self.assertTrue(np.all(n_errors[states == 0] == 0))
+        self.assertAlmostEqual(0.5*n_bits,np.mean(n_errors[states == 1]),\
+                               delta = 50)
+        self.assertTrue(np.all(n_errors[states == 2] < 0.1*n_bits))
+        
+        # Packed channel should flip the same bits
+        chann.set_seed(10)
+        chann.set_markov_state(1)
+        chann_packed.set_markov_state(1)
+        pcks_Rx = chann.fade(pcks_Tx)
+        packed_Rx = chann_packed.fade(np.packbits(pcks_Tx,axis = -1))
+        self.assertTrue(np.all(np.packbits(pcks_Rx,axis = -1) == packed_Rx))
+        
+        # Single packets can be faded
+        pck_Rx = chann.fade(np.zeros(n_bits))
+        self.assertEqual((n_bits,),pck_Rx.shape)
+        
+    def test_fade_markov_batch(self):
+        # Blocks and single packets draw other errors for the same seed, 
+        # but with the same distribution: states are Good, Bad or Ugly with
+        # probabilities 0.8, 0.1 and 0.1
+        n_bits = 100
+        n_pcks = 2000
+        pcks_Tx = np.zeros([n_pcks,n_bits],dtype = int)
+        p_err = 0.1*(1 - 0.5**n_bits) + 0.1*(1 - 0.99**n_bits)
+        mean_errors = 0.1*0.5*n_bits + 0.1*0.01*n_bits
+        for batch in [True, False]:
+            chann = Channel(ChannelModel.MARKOV,10,0.01,\
+                            transition_mtx = self.mtx)
+            if batch:
+                pcks_Rx = chann.fade(pcks_Tx)
+            else:
+                pcks_Rx = np.array([chann.fade(pck) for pck in pcks_Tx])
+            n_errors = np.sum(pcks_Rx,axis = 1)
+            self.assertAlmostEqual(p_err,np.mean(n_errors > 0),delta = 0.03)
+            self.assertAlmostEqual(mean_errors,np.mean(n_errors),delta = 1.2)
+            self.assertAlmostEqual(0.1,np.mean(n_errors > 0.25*n_bits),\
+                                   delta = 0.025)
+        
     def test_fade(self):
-        """
-        TODO Implement unit test for Markov channel
-        """
         pck_Tx = np.zeros(self.n_bits)
         self.assertEqual(self.n_bits,len(pck_Tx))
         
@@ -59,10 +327,17 @@ class ChannelTest(unittest.TestCase):
         pck_Rx = self.channel2.fade(pck_Tx)
         self.assertTrue(np.all((pck_Rx == 0) | (pck_Rx == 1)))
         self.assertAlmostEqual(500.0,np.sum(pck_Rx),delta = 50)
+        
+        # A block of packets can be faded at once
+        pcks_Tx = np.zeros([5,self.n_bits])
+        pcks_Rx = self.channel2.fade(pcks_Tx)
+        self.assertEqual((5,self.n_bits),pcks_Rx.shape)
+        self.assertAlmostEqual(2500.0,np.sum(pcks_Rx),delta = 150)
             
-        # For now, Markov channel sould raise exception
-        with self.assertRaises(NotImplementedError):
-            pck_Rx = self.channel3.fade(pck_Tx)
+        # Markov channel should return a packet of same shape
+        pck_Rx = self.channel3.fade(pck_Tx)
+        self.assertEqual(pck_Tx.shape,pck_Rx.shape)
+        self.assertTrue(np.all((pck_Rx == 0) | (pck_Rx == 1)))
         
         # Invalid Channel Model should raise exception
         with self.assertRaises(NameError):
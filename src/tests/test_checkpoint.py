@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+Checkpoint file unit tests.
+
+Created on Sun Oct 18 18:40:16 2026
+
+@author: Calil
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+from src.support.checkpoint import save_checkpoint
+from src.support.checkpoint import load_checkpoint
+
+class CheckpointTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.ckpt_dir = tempfile.mkdtemp()
+        self.file_name = os.path.join(self.ckpt_dir,'ckpt.pkl')
+        
+    def tearDown(self):
+        shutil.rmtree(self.ckpt_dir)
+        
+    def test_save_load(self):
+        self.assertIsNone(load_checkpoint(self.file_name))
+        
+        state = {'seed_count': 3, 'rnd_state': np.random.RandomState(1)\
+                 .get_state()}
+        save_checkpoint(self.file_name,state)
+        save_checkpoint(self.file_name,state)
+        loaded = load_checkpoint(self.file_name)
+        self.assertEqual(3,loaded['seed_count'])
+        self.assertTrue(np.all(state['rnd_state'][1] == \
+                               loaded['rnd_state'][1]))
+        
+        # No temporary file is left
+        self.assertEqual(['ckpt.pkl'],os.listdir(self.ckpt_dir))
+        
+if __name__ == '__main__':
+    unittest.main()
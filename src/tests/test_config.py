@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+SimConfig class unit tests.
+
+Created on Sun Oct 18 20:17:40 2026
+
+@author: Calil
+"""
+
+import os
+import json
+import pickle
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+from src.parameters.config import SimConfig
+from src.parameters.parameters import Parameters
+from src.support.enumerations import ChannelModel
+from src.support.enumerations import SimType
+
+class SimConfigTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.config = SimConfig(p = [1e-5, 1e-4],n_bits = 100)
+        
+    def test_values(self):
+        # Values not given keep the Parameters defaults
+        self.assertEqual(100,self.config.n_bits)
+        self.assertEqual(Parameters.tx_rate,self.config.tx_rate)
+        self.assertEqual(ChannelModel.CONSTANT,self.config.chan_mod)
+        self.assertTrue(np.all(np.array([1e-5, 1e-4]) == self.config.p))
+        self.assertTrue(np.all(np.asarray(Parameters.transition_mtx) == \
+                               self.config.transition_mtx))
+        with self.assertRaises(AttributeError):
+            self.config.other
+        with self.assertRaises(NameError):
+            SimConfig(other = 1)
+            
+    def test_immutable(self):
+        with self.assertRaises(AttributeError):
+            self.config.n_bits = 10
+        with self.assertRaises(ValueError):
+            self.config.p[0] = 1.0
+        
+        # Changes make a new configuration
+        config = self.config.replace(n_bits = 10)
+        self.assertEqual(10,config.n_bits)
+        self.assertEqual(100,self.config.n_bits)
+        self.assertEqual({'n_bits': 10, 'p': (1e-5, 1e-4)},config.changes())
+        
+        # Transition matrix is built from its probabilities
+        config = self.config.replace(P00 = 0.5)
+        self.assertTrue(np.allclose([0.5, 0.1, 0.4],\
+                                    config.transition_mtx[0]))
+        
+    def test_hash(self):
+        same = SimConfig(n_bits = 100,p = np.array([1e-5, 1e-4]))
+        self.assertEqual(self.config,same)
+        self.assertEqual(hash(self.config),hash(same))
+        self.assertEqual(self.config.digest(),same.digest())
+        self.assertNotEqual(self.config,self.config.replace(n_bits = 10))
+        self.assertNotEqual(self.config.digest(),\
+                            self.config.replace(n_bits = 10).digest())
+        self.assertEqual(2,len({self.config, same, SimConfig()}))
+        
+    def test_pickle(self):
+        data = pickle.dumps(self.config)
+        self.assertEqual(self.config,pickle.loads(data))
+        
+        # Only changed values are pickled
+        self.assertTrue(len(data) < 300)
+        
+    def test_from_parameters(self):
+        param = Parameters(1)
+        param.n_bits = 200
+        config = SimConfig.from_parameters(param)
+        param.n_bits = Parameters.n_bits
+        self.assertEqual(200,config.n_bits)
+        
+    def test_from_file_args(self):
+        conf_dir = tempfile.mkdtemp()
+        file_name = os.path.join(conf_dir,'config.json')
+        with open(file_name,'w') as f:
+            json.dump({'chan_mod': 'MARKOV', 'p': [1e-3], \
+                       'uniform_dtype': 'float32'},f)
+        config = SimConfig.from_file(file_name)
+        shutil.rmtree(conf_dir)
+        self.assertEqual(ChannelModel.MARKOV,config.chan_mod)
+        self.assertEqual(np.float32,config.uniform_dtype)
+        
+        config = SimConfig.from_args(['simulation_type=FIXED_CONF',\
+                                      'n_pcks=500'],config)
+        self.assertEqual(SimType.FIXED_CONF,config.simulation_type)
+        self.assertEqual(500,config.n_pcks)
+        self.assertTrue(np.all(np.array([1e-3]) == config.p))
+        with self.assertRaises(ValueError):
+            SimConfig.from_args(['n_pcks'])
+            
+if __name__ == '__main__':
+    unittest.main()
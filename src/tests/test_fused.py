@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the fused packet kernel.
+
+Created on Mon Oct 19 01:58:10 2026
+
+@author: Calil
+"""
+
+import unittest
+import numpy as np
+
+from src.support import fused
+
+class FusedTest(unittest.TestCase):
+
+    def test_count_errors(self):
+        n_bits = 1000
+
+        # No errors in error-free packets
+        n_errors = fused.count_errors(np.zeros(10),n_bits,5e-2,1)
+        self.assertEqual(10,len(n_errors))
+        self.assertEqual(np.int64,n_errors.dtype)
+        self.assertEqual(0,np.sum(n_errors))
+
+        # Errors should match BER, both for geometric gaps and bit by bit
+        for ber in [1e-3, 0.5]:
+            n_errors = fused.count_errors(np.full(200,ber),n_bits,5e-2,1)
+            self.assertTrue(np.all(n_errors <= n_bits))
+            self.assertAlmostEqual(200*n_bits*ber,np.sum(n_errors),\
+                                   delta = 0.1*200*n_bits*ber)
+
+        # Every bit is in error for a BER of 1
+        n_errors = fused.count_errors(np.ones(3),n_bits,5e-2,1)
+        self.assertTrue(np.all(n_errors == n_bits))
+
+        # Same seed, same errors
+        pck_bers = np.array([0.0, 1e-2, 0.5, 1e-2])
+        self.assertTrue(np.all(fused.count_errors(pck_bers,n_bits,5e-2,7) == \
+                               fused.count_errors(pck_bers,n_bits,5e-2,7)))
+        
+        # numpy's global random state is left alone
+        np_state = np.random.get_state()
+        fused.count_errors(pck_bers,n_bits,5e-2,7)
+        self.assertTrue(np.all(np_state[1] == np.random.get_state()[1]))
+        self.assertEqual(np_state[2],np.random.get_state()[2])
+
+    def test_get_kernel(self):
+        kernel = fused.kernel
+        try:
+            # Missing Numba is remembered, and the kernel is not available
+            fused.kernel = False
+            self.assertIsNone(fused.get_kernel())
+            self.assertFalse(fused.is_available())
+
+            fused.kernel = fused.count_errors
+            self.assertIs(fused.count_errors,fused.get_kernel())
+            self.assertTrue(fused.is_available())
+        finally:
+            fused.kernel = kernel
+
+if __name__ == '__main__':
+    unittest.main()
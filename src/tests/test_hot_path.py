@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+Hot path benchmark unit tests.
+
+Created on Sun Oct 18 22:31:50 2026
+
+@author: Calil
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.benchmarks.hot_path import run_benchmarks
+from src.benchmarks.hot_path import save_results
+from src.benchmarks.hot_path import load_results
+from src.benchmarks.hot_path import compare
+
+class HotPathTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.names = ['generate_packet', 'fade_markov', 'conf_interval']
+        self.results = run_benchmarks([100],[1e-3, 1e-2],1,1e-3,self.names)
+        
+    def test_run_benchmarks(self):
+        self.assertEqual(6,len(self.results))
+        for res in self.results:
+            self.assertTrue(res['name'] in self.names)
+            self.assertTrue(res['sec_per_call'] > 0)
+            if res['name'] == 'conf_interval':
+                self.assertIsNone(res['pcks_per_sec'])
+            else:
+                self.assertAlmostEqual(1.0,res['pcks_per_sec']*\
+                                       res['sec_per_call'])
+                
+    def test_save_results(self):
+        res_dir = tempfile.mkdtemp()
+        file_name = os.path.join(res_dir,'bench.json')
+        save_results(file_name,self.results)
+        self.assertEqual(self.results,load_results(file_name))
+        shutil.rmtree(res_dir)
+        
+    def test_compare(self):
+        baseline = [dict(res) for res in self.results]
+        baseline[0]['sec_per_call'] = 0.5*baseline[0]['sec_per_call']
+        baseline[1]['sec_per_call'] = 2.0*baseline[1]['sec_per_call']
+        baseline[2]['n_bits'] = 10
+        rows = compare(self.results,baseline,0.1)
+        
+        # Cases missing from baseline are ignored
+        self.assertEqual(5,len(rows))
+        self.assertAlmostEqual(0.5,rows[0][3])
+        self.assertTrue(rows[0][4])
+        self.assertAlmostEqual(2.0,rows[1][3])
+        self.assertFalse(rows[1][4])
+        
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Metrics class unit tests.
+
+Created on Sun Oct 18 23:07:36 2026
+
+@author: Calil
+"""
+
+import os
+import json
+import shutil
+import tempfile
+import time
+import unittest
+
+from src.metrics import Metrics
+from src.metrics import NullMetrics
+from src.metrics import to_prometheus
+from src.support.enumerations import MetricsFormat
+
+class MetricsTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.metrics_dir = tempfile.mkdtemp()
+        self.file_name = os.path.join(self.metrics_dir,'metrics')
+        self.metrics = Metrics(self.file_name,MetricsFormat.JSON,60.0,100)
+        self.reps = [(0, 1, 1e-3, 49.9, 1000, 0.5),
+                     (1, 2, 3e-3, 49.8, 1000, 0.25)]
+        
+    def tearDown(self):
+        shutil.rmtree(self.metrics_dir)
+        
+    def test_timed(self):
+        self.assertEqual(3,self.metrics.timed('fade',max,1,3))
+        self.assertEqual(2,self.metrics.timed('fade',abs,-2))
+        stages = self.metrics.snapshot()['stages']
+        self.assertEqual(2,stages['fade']['calls'])
+        self.assertTrue(stages['fade']['seconds'] >= 0)
+        
+    def test_point_done(self):
+        self.metrics.point_done(1e-4,self.reps)
+        self.metrics.point_done(1e-3,self.reps[:1])
+        snapshot = self.metrics.snapshot()
+        self.assertEqual(3,snapshot['replications_total'])
+        self.assertEqual(3000,snapshot['packets_total'])
+        self.assertEqual(300000,snapshot['bits_total'])
+        self.assertEqual(2,snapshot['points_total'])
+        self.assertEqual([(1e-4, 2), (1e-3, 1)],\
+                         snapshot['point_replications'])
+        self.assertTrue(snapshot['packets_per_second'] > 0)
+        
+        self.metrics.reset()
+        self.assertEqual(0,self.metrics.snapshot()['packets_total'])
+        
+    def test_start(self):
+        # Time before start() is not counted in elapsed time or rates
+        time.sleep(0.2)
+        self.metrics.start()
+        self.metrics.point_done(1e-4,self.reps)
+        snapshot = self.metrics.snapshot()
+        self.assertTrue(snapshot['elapsed_seconds'] < 0.2)
+        self.assertAlmostEqual(snapshot['packets_per_second'],\
+                               2000/snapshot['elapsed_seconds'])
+        
+    def test_export(self):
+        # Only started metrics are exported
+        self.metrics.export(True)
+        self.assertFalse(os.path.exists(self.file_name))
+        
+        self.metrics.start()
+        self.metrics.point_done(1e-4,self.reps)
+        self.metrics.export(True)
+        with open(self.file_name) as f:
+            self.assertEqual(2,json.load(f)['replications_total'])
+            
+        # Not exported again before interval
+        self.metrics.point_done(1e-3,self.reps)
+        self.metrics.export()
+        with open(self.file_name) as f:
+            self.assertEqual(2,json.load(f)['replications_total'])
+            
+    def test_to_prometheus(self):
+        self.metrics.timed('generate',abs,-1)
+        self.metrics.point_done(1e-4,self.reps)
+        text = to_prometheus(self.metrics.snapshot())
+        lines = text.splitlines()
+        self.assertTrue('linklevel_packets_total 2000' in lines)
+        self.assertTrue('linklevel_stage_calls_total{stage="generate"} 1' \
+                        in lines)
+        self.assertTrue('linklevel_point_replications{p="0.0001"} 2' \
+                        in lines)
+        self.assertTrue('# TYPE linklevel_bits_per_second gauge' in lines)
+        
+        metrics = Metrics(self.file_name,MetricsFormat.PROMETHEUS,0.0,100)
+        metrics.start()
+        metrics.export()
+        with open(self.file_name) as f:
+            self.assertTrue(f.read().startswith('# TYPE'))
+        
+    def test_null_metrics(self):
+        metrics = NullMetrics()
+        self.assertFalse(metrics.is_enabled())
+        self.assertTrue(self.metrics.is_enabled())
+        self.assertEqual(3,metrics.timed('fade',max,1,3))
+        metrics.start()
+        metrics.point_done(1e-4,self.reps)
+        metrics.export(True)
+        
+if __name__ == '__main__':
+    unittest.main()
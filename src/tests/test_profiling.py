@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Profiling unit tests.
+
+Created on Sun Oct 18 23:52:14 2026
+
+@author: Calil
+"""
+
+import os
+import json
+import time
+import pstats
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+from src.channel import Channel
+from src.support.enumerations import ChannelModel
+from src.support.profiling import StackSampler
+from src.support.profiling import component_of
+from src.support.profiling import frame_name
+from src.support.profiling import attribute
+from src.support.profiling import run_profile
+
+def busy(duration):
+    """Keeps the interpreter busy for a while."""
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        pass
+    return duration
+
+class ProfilingTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.profile_dir = tempfile.mkdtemp()
+        self.chann = Channel(ChannelModel.CONSTANT,1,1e-2,n_bits = 100)
+        self.fade_key = (self.chann.fade.__code__.co_filename,\
+                         self.chann.fade.__code__.co_firstlineno,'fade')
+        
+    def tearDown(self):
+        shutil.rmtree(self.profile_dir)
+        
+    def test_component_of(self):
+        self.assertEqual('Channel',component_of(self.fade_key))
+        self.assertIsNone(component_of((json.__file__, 1, 'dumps')))
+        self.assertEqual('channel.py:fade',frame_name(self.fade_key))
+        
+    def test_stack_sampler(self):
+        sampler = StackSampler(1e-3)
+        sampler.start()
+        busy(0.1)
+        sampler.stop()
+        stacks = sampler.get_stacks()
+        self.assertTrue(len(stacks) > 0)
+        busy_time = sum(elapsed for stack, elapsed in stacks.items() \
+                        if stack[-1][2] == 'busy')
+        self.assertTrue(busy_time > 0.05)
+        
+    def test_attribute(self):
+        other_key = (json.__file__, 1, 'dumps')
+        stacks = {(other_key,): 1.0,
+                  (other_key, self.fade_key): 2.0,
+                  (self.fade_key, other_key): 0.5}
+        times = attribute(stacks)
+        self.assertEqual(2.5,times['Channel'])
+        self.assertEqual(1.0,times['other'])
+        self.assertEqual(0.0,times['Source'])
+        
+    def test_run_profile(self):
+        pck = np.zeros(100,dtype = int)
+        def fade_loop():
+            end = time.perf_counter() + 0.1
+            while time.perf_counter() < end:
+                self.chann.fade(pck)
+            return 'done'
+        out, times = run_profile(fade_loop,(),self.profile_dir,'tag')
+        self.assertEqual('done',out)
+        self.assertTrue(times['Channel'] > 0)
+        
+        # pstats, collapsed stacks and component times are written
+        prefix = os.path.join(self.profile_dir,'tag')
+        stats = pstats.Stats(prefix + '.pstats')
+        self.assertTrue(stats.total_calls > 0)
+        loop_usecs = 0
+        with open(prefix + '.collapsed') as f:
+            for line in f:
+                stack, usecs = line.rsplit(' ',1)
+                self.assertTrue(int(usecs) > 0)
+                if ':fade_loop' in stack:
+                    loop_usecs = loop_usecs + int(usecs)
+        self.assertTrue(loop_usecs > 0)
+        with open(prefix + '.json') as f:
+            summary = json.load(f)
+        self.assertEqual('tag',summary['tag'])
+        self.assertEqual(times,summary['components'])
+        
+if __name__ == '__main__':
+    unittest.main()
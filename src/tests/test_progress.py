@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Progress class unit tests.
+
+Created on Mon Oct 19 00:41:27 2026
+
+@author: Calil
+"""
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from src.progress import Progress
+from src.progress import NullProgress
+from src.parameters.parameters import Parameters
+from src.support.enumerations import SimType
+
+class ProgressTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.par = Parameters(1)
+        self.par.simulation_type = SimType.FIXED_CONF
+        self.par.n_pcks = 1000
+        self.progress_dir = tempfile.mkdtemp()
+        self.file_name = os.path.join(self.progress_dir,'progress.jsonl')
+        self.progress = Progress(self.file_name,self.par)
+        
+    def tearDown(self):
+        shutil.rmtree(self.progress_dir)
+        
+    def read_events(self):
+        with open(self.file_name) as f:
+            return [json.loads(line) for line in f]
+        
+    def test_publish(self):
+        # Nothing is published before start
+        self.assertFalse(self.progress.is_active())
+        self.progress.point_started(0,1e-4)
+        self.progress.close()
+        self.assertFalse(os.path.exists(self.file_name))
+        
+        self.progress.start(3)
+        self.assertTrue(self.progress.is_active())
+        self.progress.point_started(0,1e-4)
+        self.progress.replication_done(1,None)
+        self.progress.replication_done(2,float('inf'))
+        self.progress.sweep_finished()
+        self.progress.close()
+        self.assertFalse(self.progress.is_active())
+        
+        events = self.read_events()
+        self.assertEqual(['sweep_started', 'point_started', 'replication',
+                          'replication', 'sweep_finished'],\
+                         [event['event'] for event in events])
+        self.assertEqual(3,events[0]['n_points'])
+        self.assertEqual(1e-4,events[2]['p'])
+        self.assertIsNone(events[3]['conf_ratio'])
+        self.assertEqual(2000,events[4]['n_pcks'])
+        
+    def test_eta(self):
+        with mock.patch('time.time',return_value = 100.0):
+            self.progress.start(3)
+            self.assertIsNone(self.progress.eta())
+            self.progress.point_started(0,1e-4)
+            for n_reps in range(1,5):
+                self.progress.replication_done(n_reps,None)
+        
+        with mock.patch('time.time',return_value = 140.0):
+            # 10 s per replication. About n*ratio^2 replications are 
+            # needed, 12 more in this point, and as many in each of the 
+            # other two points
+            self.assertEqual(10.0*(12 + 2*16),self.progress.eta(4,2.0))
+            self.assertIsNone(self.progress.eta(4,None))
+            
+            # Later points need as many replications as finished ones
+            self.progress.point_finished(0,1e-4,(1e-3, 1e-5),(49.9, 0.1),\
+                                         True,10,True)
+            self.assertEqual(10.0*2*10,self.progress.eta())
+        self.progress.close()
+        
+        # Fixed seeds
+        self.par.simulation_type = SimType.FIXED_SEEDS
+        progress = Progress(self.file_name,self.par)
+        self.par.simulation_type = SimType.FIXED_CONF
+        n_seeds = len(self.par.seeds)
+        with mock.patch('time.time',return_value = 100.0):
+            progress.start(2)
+            progress.point_started(0,1e-4)
+            progress.replication_done(1,None)
+        with mock.patch('time.time',return_value = 110.0):
+            self.assertEqual(10.0*(2*n_seeds - 1),progress.eta(1,None))
+        progress.close()
+        
+    def test_null_progress(self):
+        progress = NullProgress()
+        self.assertFalse(progress.is_active())
+        progress.start(1)
+        progress.point_started(0,1e-4)
+        progress.replication_done(1,None)
+        progress.point_finished(0,1e-4,(0.0, 0.0),(50.0, 0.0),True,1)
+        progress.sweep_finished()
+        progress.close()
+        
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+ResultCache class unit tests.
+
+Created on Sun Oct 18 21:58:42 2026
+
+@author: Calil
+"""
+
+import os
+import time
+import shutil
+import tempfile
+import unittest
+
+from src.result_cache import ResultCache
+from src.result_cache import config_key
+from src.result_cache import replication_key
+from src.parameters.config import SimConfig
+from src.support.enumerations import ChannelModel
+from src.support.enumerations import PlotMode
+from src.support.enumerations import EngineType
+from src.support import fused
+
+class ResultCacheTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = ResultCache(self.cache_dir,1000)
+        self.value = {'per': 1e-3, 'thrpt': 49.9, 'markov_state': 0}
+        
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+        
+    def test_get_cache_dir(self):
+        self.assertEqual(self.cache_dir,self.cache.get_cache_dir())
+        
+    def test_get_put(self):
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual(1,self.cache.get_misses())
+        self.cache.put('a',self.value)
+        self.assertEqual(self.value,self.cache.get('a'))
+        self.assertEqual(1,self.cache.get_hits())
+        self.assertTrue(self.cache.get_size() > 0)
+        
+        # Entries persist across instances
+        cache = ResultCache(self.cache_dir,1000)
+        self.assertEqual(self.cache.get_size(),cache.get_size())
+        self.assertEqual(self.value,cache.get('a'))
+        
+    def test_evict(self):
+        # Room for about two entries
+        self.cache.put('a',self.value)
+        entry_size = self.cache.get_size()
+        cache = ResultCache(self.cache_dir,2*entry_size)
+        past = time.time() - 10
+        os.utime(os.path.join(self.cache_dir,'a.json'),(past, past))
+        cache.put('b',self.value)
+        os.utime(os.path.join(self.cache_dir,'b.json'),(past + 1, past + 1))
+        
+        # Least recently used entry is evicted first
+        self.assertIsNotNone(cache.get('a'))
+        cache.put('c',self.value)
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('c'))
+        self.assertEqual(2*entry_size,cache.get_size())
+        
+    def test_keys(self):
+        config = SimConfig(p = [1e-4, 1e-3])
+        conf_key = config_key(config)
+        
+        # Swept values and execution parameters do not change the key
+        self.assertEqual(conf_key,config_key(config.replace(p = [1e-5],\
+                                        n_workers = 4,\
+                                        plot_mode = PlotMode.NONE)))
+        self.assertNotEqual(conf_key,config_key(config.replace(n_bits = 10)))
+        self.assertNotEqual(conf_key,config_key(config.replace(\
+                                        chan_mod = ChannelModel.MARKOV)))
+        
+        # Replications are keyed by p, seed and Markov state
+        key = replication_key(conf_key,1e-4,('seed', 1),0)
+        self.assertEqual(key,replication_key(conf_key,1e-4,('seed', 1),0))
+        self.assertNotEqual(key,replication_key(conf_key,1e-3,('seed', 1),0))
+        self.assertNotEqual(key,replication_key(conf_key,1e-4,('seed', 2),0))
+        self.assertNotEqual(key,replication_key(conf_key,1e-4,('seed', 1),2))
+        
+    def test_fused_key(self):
+        # FUSED results depend on whether the compiled kernel is available
+        config = SimConfig(engine = EngineType.FUSED)
+        kernel = fused.kernel
+        try:
+            fused.kernel = False
+            numpy_key = config_key(config)
+            fused.kernel = fused.count_errors
+            numba_key = config_key(config)
+        finally:
+            fused.kernel = kernel
+        self.assertNotEqual(numpy_key,numba_key)
+        self.assertNotEqual(numpy_key,config_key(config.replace(\
+                                        engine = EngineType.BATCH)))
+        
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+ResultStore class unit tests.
+
+Created on Sun Oct 18 17:31:09 2026
+
+@author: Calil
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+from src.result_store import ResultStore
+
+class ResultStoreTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.store_dir = tempfile.mkdtemp()
+        self.store = ResultStore(self.store_dir)
+        self.reps = [(0, 10, 1e-3, 49.9, 1000, 0.5),
+                     (1, 11, 3e-3, 49.8, 1000, 0.25)]
+        
+    def tearDown(self):
+        shutil.rmtree(self.store_dir)
+        
+    def test_get_store_dir(self):
+        self.assertEqual(self.store_dir,self.store.get_store_dir())
+        self.assertTrue(os.path.exists(os.path.join(self.store_dir,\
+                                                    'meta.json')))
+        
+    def test_append_point(self):
+        self.assertEqual(0,self.store.get_n_points())
+        self.assertEqual(0,len(self.store.read()['per']))
+        
+        self.store.append_point(1e-6,(2e-3, 1e-3),(49.9, 0.1),True,\
+                                self.reps)
+        self.store.append_point(1e-5,(1e-2, 1e-3),(49.5, 0.1),False,[])
+        self.assertEqual(2,self.store.get_n_points())
+        self.assertEqual(2,self.store.get_n_reps())
+        
+        # Columns are memory-mapped
+        points = self.store.read()
+        self.assertIsInstance(points['per'],np.memmap)
+        self.assertTrue(np.all(np.array([1e-6, 1e-5]) == points['p']))
+        self.assertTrue(np.all(np.array([True, False]) == \
+                               points['converged']))
+        self.assertTrue(np.all(np.array([2, 0]) == points['n_reps']))
+        self.assertEqual(2000,points['n_pcks'][0])
+        self.assertEqual(0.75,points['elapsed'][0])
+        
+        # Replications of each point
+        reps = self.store.point_reps(0)
+        self.assertTrue(np.all(np.array([10, 11]) == reps['seed']))
+        self.assertTrue(np.all(np.array([1e-3, 3e-3]) == reps['per']))
+        self.assertEqual(0,len(self.store.point_reps(1)['per']))
+        
+        with self.assertRaises(NameError):
+            self.store.read('other')
+            
+    def test_reopen(self):
+        self.store.append_point(1e-6,(2e-3, 1e-3),(49.9, 0.1),True,\
+                                self.reps)
+        
+        # Emulate a crash while writing a point: replications are written,
+        # and the point is only partially written
+        with open(os.path.join(self.store_dir,'reps','per.bin'),'ab') as f:
+            f.write(np.array([0.5]).tobytes())
+        with open(os.path.join(self.store_dir,'points','p.bin'),'ab') as f:
+            f.write(np.array([1e-5]).tobytes())
+            
+        # Incomplete point is discarded, and new points are appended
+        store = ResultStore(self.store_dir)
+        self.assertEqual(1,store.get_n_points())
+        self.assertEqual(2,store.get_n_reps())
+        store.append_point(1e-5,(1e-2, 1e-3),(49.5, 0.1),True,self.reps[:1])
+        self.assertTrue(np.all(np.array([1e-6, 1e-5]) == store.read()['p']))
+        self.assertTrue(np.all(np.array([1e-3, 3e-3, 1e-3]) == \
+                               store.read('reps')['per']))
+        self.assertTrue(np.all(np.array([0, 0, 1]) == \
+                               store.read('reps')['point']))
+        
+    def test_sweeps(self):
+        self.assertEqual(0,self.store.get_sweep())
+        self.store.append_point(1e-6,(2e-3, 1e-3),(49.9, 0.1),True,\
+                                self.reps)
+        self.store.append_point(1e-5,(1e-2, 1e-3),(49.5, 0.1),True,[])
+        
+        # Stores opened again write a new sweep
+        store = ResultStore(self.store_dir)
+        self.assertEqual(1,store.get_sweep())
+        store.append_point(1e-6,(3e-3, 1e-3),(49.8, 0.1),True,\
+                           self.reps[:1])
+        self.assertTrue(np.all(np.array([0, 0, 1]) == \
+                               store.read()['sweep']))
+        self.assertTrue(np.all(np.array([0, 0, 1]) == \
+                               store.read('reps')['sweep']))
+        
+        # Rows are read by sweep
+        self.assertTrue(np.all(np.array([1e-6, 1e-5]) == \
+                               store.read(sweep = 0)['p']))
+        self.assertTrue(np.all(np.array([3e-3]) == \
+                               store.read(sweep = 1)['per']))
+        self.assertTrue(np.all(np.array([1e-3]) == \
+                               store.read('reps',sweep = 1)['per']))
+        self.assertEqual(0,len(store.read(sweep = 2)['p']))
+        
+        # A resumed sweep continues its number
+        store = ResultStore(self.store_dir)
+        store.truncate(2)
+        store.set_sweep(0)
+        store.append_point(1e-4,(2e-2, 1e-3),(49.0, 0.1),True,[])
+        self.assertTrue(np.all(np.array([1e-6, 1e-5, 1e-4]) == \
+                               store.read(sweep = 0)['p']))
+        
+    def test_incompatible(self):
+        # Stores with other columns are not opened, nor truncated
+        meta_file = os.path.join(self.store_dir,'meta.json')
+        with open(meta_file,'w') as f:
+            f.write('{}')
+        with self.assertRaises(NameError):
+            ResultStore(self.store_dir)
+        
+if __name__ == '__main__':
+    unittest.main()
@@ -7,16 +7,21 @@ Created on Sun Apr  2 08:42:53 2017
 @author: Calil
 """
 
+import os
+import shutil
+import tempfile
 import unittest
 import numpy as np
 from src.results import Results
 from src.parameters.parameters import Parameters
+from src.support.enumerations import PlotMode
 
 class ResultsTest(unittest.TestCase):
     
     def setUp(self):
         param = Parameters(1)
         param.p = np.logspace(-6,-4, num = 20)
+        param.plot_mode = PlotMode.BACKGROUND
         figs_dir = "test_figs/"
         self.res = Results(param, figs_dir)
         
@@ -44,6 +49,30 @@ class ResultsTest(unittest.TestCase):
         thrpt_conf = self.res.get_thrpt_conf()
         self.assertEqual(0,len(thrpt_conf))
         
+    def test_get_converged(self):
+        self.assertEqual(0,len(self.res.get_converged()))
+        
+        # Points converge by default
+        self.res.store_res((1.0e-05, 1.0e-06),(50, 0.5))
+        self.res.store_res((1.0e-05, 1.0e-06),(50, 0.5),False)
+        self.assertEqual([True, False],self.res.get_converged())
+        
+    def test_get_state(self):
+        store_dir = tempfile.mkdtemp()
+        self.res.get_param().results_dir = store_dir
+        self.res.store_res((1.0e-05, 1.0e-06),(50, 0.5))
+        state = self.res.get_state()
+        self.res.store_res((2.0e-05, 1.0e-06),(50, 0.5),False)
+        self.assertEqual(2,self.res.get_store().get_n_points())
+        
+        # Points stored after state are discarded
+        self.res.set_state(state)
+        self.res.get_param().results_dir = None
+        self.assertEqual([1.0e-05],self.res.get_per_list())
+        self.assertEqual([True],self.res.get_converged())
+        self.assertEqual(1,self.res.get_store().get_n_points())
+        shutil.rmtree(store_dir)
+        
     def test_store_res_plot(self):
         per_tpl = (1.0e-05, 1.0e-06)
         thrpt_tpl = (50, 0.5)
@@ -73,6 +102,51 @@ class ResultsTest(unittest.TestCase):
         theo_per = 1.0e-05*np.ones([len_p,])
         theo_thrpt = 50*np.ones([len_p,])
         self.res.plot(theo_per,theo_thrpt)
+        
+    def test_plot_mode(self):
+        figs_dir = tempfile.mkdtemp() + "/"
+        res = Results(self.res.get_param(),figs_dir)
+        res.store_res((1.0e-05, 1.0e-06),(50, 0.5))
+        res.store_res((1.0e-04, 1.0e-05),(49, 0.5))
+        theo_per = np.array([1.0e-05, 1.0e-04])
+        theo_thrpt = np.array([50, 49])
+        res.get_param().p = np.array([1e-6, 1e-5])
+        
+        # No figures
+        res.get_param().plot_mode = PlotMode.NONE
+        self.assertIsNone(res.plot(theo_per,theo_thrpt))
+        self.assertEqual([],os.listdir(figs_dir))
+        
+        # Figures saved without display
+        res.get_param().plot_mode = PlotMode.SAVE
+        res.plot(theo_per,theo_thrpt)
+        self.assertEqual(['per.png', 'thrpt.png'],sorted(os.listdir(figs_dir)))
+        
+        # Figures rendered in background, from a copy of results
+        shutil.rmtree(figs_dir)
+        os.mkdir(figs_dir)
+        res.get_param().plot_mode = PlotMode.BACKGROUND
+        future = res.plot(theo_per,theo_thrpt)
+        res.store_res((2.0e-05, 1.0e-06),(50, 0.5))
+        self.assertIs(future,res.get_plot_future())
+        res.wait_plot()
+        self.assertEqual(['per.png', 'thrpt.png'],sorted(os.listdir(figs_dir)))
+        
+        # Background rendering errors are raised by wait_plot(), or by the
+        # next plot() if it was not called
+        shutil.rmtree(figs_dir)
+        res = Results(self.res.get_param(),figs_dir)
+        res.store_res((1.0e-05, 1.0e-06),(50, 0.5))
+        res.store_res((1.0e-04, 1.0e-05),(49, 0.5))
+        res.plot(theo_per,theo_thrpt)
+        with self.assertRaises(FileNotFoundError):
+            res.wait_plot()
+        res.plot(theo_per,theo_thrpt)
+        with self.assertRaises(FileNotFoundError):
+            res.plot(theo_per,theo_thrpt)
+        self.assertIsNone(res.get_plot_future())
+        
+        res.get_param().p = np.logspace(-6,-4, num = 20)
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
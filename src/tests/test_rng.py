@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for random number generation helpers.
+
+Created on Sun Oct 18 14:31:50 2026
+
+@author: Calil
+"""
+
+import unittest
+import numpy as np
+
+from src.support import rng
+from src.support.enumerations import RngType
+
+class RngTest(unittest.TestCase):
+    
+    def test_random_state(self):
+        # Integer seeds reproduce legacy RandomState numbers
+        rnd_state = rng.random_state(10)
+        legacy = np.random.RandomState(10)
+        self.assertTrue(np.all(legacy.rand(10) == rnd_state.rand(10)))
+        
+        # SeedSequence seeds
+        seq = np.random.SeedSequence(10)
+        rnd_state = rng.random_state(seq)
+        self.assertFalse(np.all(legacy.rand(10) == rnd_state.rand(10)))
+        
+    def test_spawn_seeds(self):
+        seeds = rng.spawn_seeds(5,3,2)
+        self.assertEqual(2,len(seeds))
+        
+        # Same streams as spawning from root seed
+        children = np.random.SeedSequence(5).spawn(4)[3].spawn(2)
+        for k in range(0,2):
+            self.assertTrue(np.all(children[k].generate_state(4) == \
+                                   seeds[k].generate_state(4)))
+        
+        # Streams of different replications are different
+        other = rng.spawn_seeds(5,2,2)
+        self.assertFalse(np.all(other[0].generate_state(4) == \
+                                seeds[0].generate_state(4)))
+        
+    def test_random_stream(self):
+        rng_types = [RngType.LEGACY, RngType.MT19937, RngType.PCG64,\
+                     RngType.PHILOX, RngType.SFC64]
+        for rng_type in rng_types:
+            stream = rng.RandomStream(rng_type,10)
+            self.assertEqual(rng_type,stream.get_rng_type())
+            
+            # Uniforms in the given dtype
+            u = stream.random((2,100),np.float32)
+            self.assertEqual(np.float32,u.dtype)
+            self.assertEqual((2,100),u.shape)
+            self.assertTrue(np.all((u >= 0) & (u < 1)))
+            
+            # Random bits
+            b = stream.bits(1000)
+            self.assertTrue(np.all((b == 0) | (b == 1)))
+            self.assertAlmostEqual(0.5,np.mean(b),delta = 0.05)
+            
+            # Blocks of words are the same as sequences of words
+            state = stream.get_state()
+            words = stream.words((3,5))
+            self.assertEqual(np.uint32,words.dtype)
+            stream.set_state(state)
+            for k in range(0,3):
+                self.assertTrue(np.all(words[k] == stream.words(5)))
+            
+            # Restoring state repeats numbers
+            stream.set_state(state)
+            self.assertTrue(np.all(words == stream.words((3,5))))
+            
+            # Reseeding repeats numbers
+            stream.seed(10)
+            self.assertTrue(np.all(u == stream.random((2,100),np.float32)))
+            
+        # Generator bits are uint8
+        stream = rng.RandomStream(RngType.PCG64,10)
+        self.assertEqual(np.uint8,stream.bits(10).dtype)
+        
+        # Blocks of bits are the same as sequences of bits, also for 
+        # lengths that are not whole words
+        for rng_type in rng_types:
+            stream = rng.RandomStream(rng_type,10)
+            block = stream.bits((3,1001))
+            stream.seed(10)
+            for k in range(0,3):
+                self.assertTrue(np.all(block[k] == stream.bits(1001)))
+        
+        # Unknown generator should raise exception
+        with self.assertRaises(NameError):
+            rng.RandomStream(7,10)
+        
+    def test_legacy_stream(self):
+        # LEGACY stream reproduces RandomState numbers
+        stream = rng.RandomStream(RngType.LEGACY,10)
+        legacy = np.random.RandomState(10)
+        self.assertTrue(np.all(legacy.randint(2,size = 100) == \
+                               stream.bits(100)))
+        self.assertTrue(np.all(legacy.rand(100) == stream.random(100)))
+        self.assertTrue(np.all(legacy.geometric(1e-2,size = 10) == \
+                               stream.geometric(1e-2,10)))
+        self.assertTrue(np.all(legacy.binomial(1000,1e-2,size = 10) == \
+                               stream.binomial(1000,1e-2,10)))
+        
+if __name__ == '__main__':
+    unittest.main()
@@ -7,12 +7,31 @@ Created on Sun Apr  2 15:21:28 2017
 @author: Calil
 """
 
+import os
+import json
+import time
+import threading
+import multiprocessing
+import shutil
+import tempfile
 import unittest
 import numpy as np
 from src.simulation_thread import SimulationThread
+from src.simulation_thread import queue_worker
+from src.simulation_thread import merge_point
+from src.work_queue import WorkQueue
+from src.support import fused
+from src.benchmarks.startup import import_time
+from src.parameters.config import SimConfig
+from src.support.enumerations import PlotMode
 from src.parameters.parameters import Parameters
 from src.support.enumerations import ChannelModel
 from src.support.enumerations import SimType
+from src.support.enumerations import EngineType
+from src.support.enumerations import SeedMode
+from src.support.enumerations import ExecutorType
+from src.support.enumerations import TolType
+from src.theoretical import Theoretical
 
 class SimulationThreadTest(unittest.TestCase):
     
@@ -20,13 +39,29 @@ class SimulationThreadTest(unittest.TestCase):
         par = Parameters(1)
         figs_dir = "test_figs/"
         
+        # Parameters is a singleton: values changed by a test are restored
         self.par = par
+        self.saved_par = dict(par.__dict__)
         
         # Redefine parameters for easy testing
         self.par.simulation_type = SimType.FIXED_SEEDS
         new_seed = np.array([0, 1, 2, 3, 4])
         self.par.seeds = new_seed.astype(int)
         self.par.n_pcks = 1000
+        self.par.engine = EngineType.BATCH
+        self.par.packed_bits = False
+        self.par.n_workers = 1
+        self.par.seed_mode = SeedMode.LEGACY
+        self.par.n_rep_workers = 1
+        self.par.p = np.logspace(-6,-4, num = 20)
+        self.par.importance_sampling = False
+        self.par.results_dir = None
+        self.par.checkpoint_file = None
+        self.par.cache_dir = None
+        self.par.metrics_file = None
+        self.par.progress_file = None
+        self.par.queue_dir = None
+        self.par.plot_mode = PlotMode.NONE
         
         # Create thread with ideal channel
         self.par.chan_mod = ChannelModel.IDEAL
@@ -37,6 +72,15 @@ class SimulationThreadTest(unittest.TestCase):
         const_figs_dir = "test_figs/const_"
         self.sim_const = SimulationThread(self.par,const_figs_dir)
     
+    def tearDown(self):
+        self.par.__dict__.clear()
+        self.par.__dict__.update(self.saved_par)
+        
+    def test_lazy_imports(self):
+        # scipy and matplotlib should only be loaded when needed
+        elapsed, heavy = import_time('simulation_thread',1)
+        self.assertEqual([],heavy)
+        
     def test_get_seed_count(self):
         self.assertEqual(0,self.sim.get_seed_count())
         
@@ -61,9 +105,11 @@ class SimulationThreadTest(unittest.TestCase):
         per, thrpt = self.sim.stat.calc_iteration_results()
         self.assertEqual(0,per)
         self.assertEqual(50,thrpt)
-        # Test lists
-        self.assertEqual([0],self.sim.stat.get_per_list())
-        self.assertEqual([50],self.sim.stat.get_thrpt_list()) 
+        # Test accumulators
+        self.assertEqual(1,self.sim.stat.get_per_stats().get_n())
+        self.assertEqual(0,self.sim.stat.get_per_stats().get_mean())
+        self.assertEqual(1,self.sim.stat.get_thrpt_stats().get_n())
+        self.assertEqual(50,self.sim.stat.get_thrpt_stats().get_mean())
         # Test if values were reset
         self.assertEqual(0,self.sim.stat.get_n_pcks())
         self.assertEqual(0,self.sim.stat.get_n_pck_errors())
@@ -72,6 +118,117 @@ class SimulationThreadTest(unittest.TestCase):
         self.assertEqual(0,self.sim.get_seed_count())
         self.assertEqual(0,self.sim.get_ber_count())
         
+    def test_send_batch(self):
+        n_errors, pck_error = self.sim.send_batch(10)
+        self.assertEqual(10,len(n_errors))
+        self.assertFalse(np.any(n_errors))
+        self.assertFalse(np.any(pck_error))
+        
+    def test_batch_engine(self):
+        # Per packet engine
+        self.par.engine = EngineType.PER_PACKET
+        self.sim_const.chann.set_p_val(1e-3)
+        self.sim_const.pck_loop()
+        n_pcks = self.sim_const.stat.get_n_pcks()
+        n_pck_errors = self.sim_const.stat.get_n_pck_errors()
+        self.sim_const.stat.calc_iteration_results()
+        
+        # Batch engine should yield the same results for the same seed
+        self.par.engine = EngineType.BATCH
+        self.sim_const.reset_seed()
+        self.sim_const.pck_loop()
+        self.assertEqual(990,n_pcks)
+        self.assertTrue(n_pck_errors > 0)
+        self.assertEqual(n_pcks,self.sim_const.stat.get_n_pcks())
+        self.assertEqual(n_pck_errors,self.sim_const.stat.get_n_pck_errors())
+        
+    def test_packed_bits(self):
+        # Unpacked packets
+        self.sim_const.chann.set_p_val(1e-3)
+        self.sim_const.pck_loop()
+        n_pck_errors = self.sim_const.stat.get_n_pck_errors()
+        
+        # Packed packets should go through the same errors
+        self.par.packed_bits = True
+        sim_packed = SimulationThread(self.par,"test_figs/packed_")
+        sim_packed.chann.set_p_val(1e-3)
+        sim_packed.pck_loop()
+        self.assertTrue(n_pck_errors > 0)
+        self.assertEqual(n_pck_errors,sim_packed.stat.get_n_pck_errors())
+        
+    def test_send_counts(self):
+        n_errors, pck_error = self.sim.send_counts(10)
+        self.assertEqual(10,len(n_errors))
+        self.assertFalse(np.any(n_errors))
+        self.assertFalse(np.any(pck_error))
+        
+    def test_error_count_engine(self):
+        # Bit level engine
+        self.sim_const.chann.set_p_val(1e-3)
+        self.sim_const.pck_loop()
+        per_bits, thrpt_bits = self.sim_const.stat.calc_iteration_results()
+        
+        # Error count engine should be statistically equivalent
+        self.par.engine = EngineType.ERROR_COUNT
+        self.sim_const.pck_loop()
+        self.assertEqual(990,self.sim_const.stat.get_n_pcks())
+        per, thrpt = self.sim_const.stat.calc_iteration_results()
+        
+        per_theo = 1 - (1 - 1e-3)**self.par.n_bits
+        self.assertAlmostEqual(per_theo,per_bits,delta = 0.05)
+        self.assertAlmostEqual(per_theo,per,delta = 0.05)
+        
+    def test_fused_engine(self):
+        self.par.engine = EngineType.FUSED
+        kernel = fused.kernel
+        try:
+            # Without Numba, the fused engine is the batch engine
+            fused.kernel = False
+            self.sim_const.chann.set_p_val(1e-3)
+            self.sim_const.pck_loop()
+            n_pck_errors = self.sim_const.stat.get_n_pck_errors()
+            self.sim_const.stat.calc_iteration_results()
+            self.par.engine = EngineType.BATCH
+            self.sim_const.reset_seed()
+            self.sim_const.pck_loop()
+            self.assertTrue(n_pck_errors > 0)
+            self.assertEqual(n_pck_errors,\
+                             self.sim_const.stat.get_n_pck_errors())
+            
+            # Kernel, run as plain Python, should be statistically 
+            # equivalent, but not the same, and reproducible
+            self.par.engine = EngineType.FUSED
+            fused.kernel = fused.count_errors
+            self.sim_const.stat.calc_iteration_results()
+            self.sim_const.reset_seed()
+            self.sim_const.pck_loop()
+            self.assertEqual(990,self.sim_const.stat.get_n_pcks())
+            n_pck_errors = self.sim_const.stat.get_n_pck_errors()
+            per, thrpt = self.sim_const.stat.calc_iteration_results()
+            per_theo = 1 - (1 - 1e-3)**self.par.n_bits
+            self.assertAlmostEqual(per_theo,per,delta = 0.05)
+            
+            self.sim_const.reset_seed()
+            self.sim_const.pck_loop()
+            self.assertEqual(n_pck_errors,\
+                             self.sim_const.stat.get_n_pck_errors())
+            self.sim_const.stat.calc_iteration_results()
+        finally:
+            fused.kernel = kernel
+        
+    def test_markov_channel(self):
+        self.par.chan_mod = ChannelModel.MARKOV
+        self.par.p = np.array([1e-3])
+        self.par.n_pcks = 20000
+        sim = SimulationThread(self.par,"test_figs/markov_")
+        self.par.chan_mod = ChannelModel.CONSTANT
+        
+        # Simulated PER should match the steady state theory
+        sim.pck_loop()
+        per, thrpt = sim.stat.calc_iteration_results()
+        ber_theo, per_theo, thrpt_theo = sim.theo.validate()
+        self.assertAlmostEqual(per_theo[0],per,delta = 0.01)
+        
     def test_seed_loop(self):
         # Loop through all the seeds
         self.sim.seed_loop()
@@ -86,16 +243,15 @@ class SimulationThreadTest(unittest.TestCase):
         self.assertEqual(0,len(self.sim.res.get_thrpt_list()))
         self.assertEqual(0,len(self.sim.res.get_thrpt_conf()))
         
-        # Test statistics lists length
-        self.assertEqual(5,len(self.sim.stat.get_per_list()))
-        self.assertEqual(5,len(self.sim.stat.get_thrpt_list()))
+        # Test statistics accumulators length
+        self.assertEqual(5,self.sim.stat.get_per_stats().get_n())
+        self.assertEqual(5,self.sim.stat.get_thrpt_stats().get_n())
         
-        # Test statistics lists elements
-        expected_per = [0.0, 0.0, 0.0, 0.0, 0.0]
-        expected_thrpt = [50.0, 50.0, 50.0, 50.0, 50.0]
-        self.assertFalse(np.any(self.sim.stat.get_per_list() != expected_per))
-        self.assertFalse(np.any(self.sim.stat.get_thrpt_list() != \
-                                expected_thrpt))
+        # Test statistics accumulators values
+        self.assertEqual(0.0,self.sim.stat.get_per_stats().get_mean())
+        self.assertEqual(0.0,self.sim.stat.get_per_stats().get_var())
+        self.assertEqual(50.0,self.sim.stat.get_thrpt_stats().get_mean())
+        self.assertEqual(0.0,self.sim.stat.get_thrpt_stats().get_var())
         # Test if values were reset
         self.assertEqual(0,self.sim.stat.get_n_pcks())
         self.assertEqual(0,self.sim.stat.get_n_pck_errors())
@@ -111,8 +267,8 @@ class SimulationThreadTest(unittest.TestCase):
         self.assertEqual(0.0,thrpt_tpl[1])
         
         # Test wrap up after math
-        self.assertEqual(0,len(self.sim.stat.get_per_list()))
-        self.assertEqual(0,len(self.sim.stat.get_thrpt_list()))
+        self.assertEqual(0,self.sim.stat.get_per_stats().get_n())
+        self.assertEqual(0,self.sim.stat.get_thrpt_stats().get_n())
         self.assertEqual(0,self.sim.stat.get_n_pcks())
         self.assertEqual(0,self.sim.stat.get_n_pck_errors())
         
@@ -160,10 +316,8 @@ class SimulationThreadTest(unittest.TestCase):
         self.sim_conf.seed_loop()
         
         # Calculate iteration results
-        per, per_conf = \
-            self.sim_conf.stat.conf_interval(self.sim_conf.stat.get_per_list())
-        thrpt, thrpt_conf = \
-            self.sim_conf.stat.conf_interval(self.sim_conf.stat.get_thrpt_list())
+        (per, per_conf), (thrpt, thrpt_conf) = \
+            self.sim_conf.stat.iteration_conf()
             
         # Redefine minimum confidence
         conf_min = min([per_conf/per , thrpt_conf/thrpt])
@@ -175,17 +329,17 @@ class SimulationThreadTest(unittest.TestCase):
         self.assertTrue(self.sim_conf.get_seed_count() > 0)
         self.assertTrue(self.sim_conf.get_ber_count() == 0)
         
-        # Assert for list lengths
-        self.assertTrue(len(self.sim_conf.stat.get_per_list()) > 0)
-        self.assertTrue(len(self.sim_conf.stat.get_thrpt_list()) > 0)
+        # Assert for accumulator lengths
+        self.assertTrue(self.sim_conf.stat.get_per_stats().get_n() > 0)
+        self.assertTrue(self.sim_conf.stat.get_thrpt_stats().get_n() > 0)
         
         # EMULATE END OF SEEDS
         # Calculate mean and confidence
         per_tpl, thrpt_tpl = self.sim_conf.stat.wrap_up()
         
         # Test wrap up after math
-        self.assertEqual(0,len(self.sim_conf.stat.get_per_list()))
-        self.assertEqual(0,len(self.sim_conf.stat.get_thrpt_list()))
+        self.assertEqual(0,self.sim_conf.stat.get_per_stats().get_n())
+        self.assertEqual(0,self.sim_conf.stat.get_thrpt_stats().get_n())
         self.assertEqual(0,self.sim_conf.stat.get_n_pcks())
         self.assertEqual(0,self.sim_conf.stat.get_n_pck_errors())
         
@@ -220,6 +374,40 @@ class SimulationThreadTest(unittest.TestCase):
         self.assertEqual(1,self.sim_conf.get_ber_count())
         self.assertEqual(self.par.p[1],self.sim_conf.chann.get_p_val())
         
+    def test_importance_sampling(self):
+        # Same tolerance and packet budget, with and without importance 
+        # sampling, and a new seed for each replication
+        self.par.simulation_type = SimType.FIXED_CONF
+        self.par.engine = EngineType.ERROR_COUNT
+        self.par.p = np.array([1e-6])
+        self.par.tol_type = TolType.ABSOLUTE
+        self.par.conf_abs = 1e-4
+        self.par.max_pcks_point = 50*self.par.n_pcks
+        per_theo = Theoretical(self.par).validate()[1][0]
+        
+        sims = {}
+        for importance_sampling in [True, False]:
+            self.par.importance_sampling = importance_sampling
+            sim = SimulationThread(self.par,"test_figs/is_")
+            sim.reset_seed()
+            sim.seed_loop()
+            sims[importance_sampling] = sim
+        
+        # PER of 1e-3 within 1e-4 should take a few replications of 1000
+        # pcks, with an interval covering the theoretical PER
+        (per, per_conf), thrpt_tpl = sims[True].stat.iteration_conf()
+        self.assertTrue(sims[True].point_converged())
+        self.assertTrue(sims[True].get_seed_count() < 10)
+        self.assertTrue(per > 0)
+        self.assertTrue(per_conf > 0)
+        self.assertAlmostEqual(per_theo,per,delta = per_conf)
+        
+        # Plain Monte Carlo exhausts the budget without reaching it
+        (per, per_conf), thrpt_tpl = sims[False].stat.iteration_conf()
+        self.assertFalse(sims[False].point_converged())
+        self.assertEqual(50,sims[False].get_seed_count())
+        self.assertTrue(per_conf > self.par.conf_abs)
+        
     def test_new_seed(self):
         self.sim.new_seed()
         self.assertEqual(1,self.sim.get_seed_count())
@@ -235,6 +423,392 @@ class SimulationThreadTest(unittest.TestCase):
         self.sim.simulate()
         self.sim_const.simulate()
         
+    def test_simulate_plot(self):
+        self.par.p = np.array([1e-4, 1e-3])
+        figs_dir = tempfile.mkdtemp()
+        try:
+            # Figures rendered in background are done after wait_plot()
+            for plot_mode in [PlotMode.SAVE, PlotMode.BACKGROUND]:
+                self.par.plot_mode = plot_mode
+                sim = SimulationThread(self.par,figs_dir + "/ok_")
+                sim.simulate()
+                sim.res.wait_plot()
+                self.assertTrue(os.path.exists(figs_dir + "/ok_per.png"))
+                self.assertTrue(os.path.exists(figs_dir + "/ok_thrpt.png"))
+                os.remove(figs_dir + "/ok_per.png")
+                os.remove(figs_dir + "/ok_thrpt.png")
+            
+            # Rendering errors are raised by simulate() in SAVE mode, and by
+            # wait_plot() in BACKGROUND mode
+            self.par.plot_mode = PlotMode.SAVE
+            sim = SimulationThread(self.par,figs_dir + "/missing/")
+            with self.assertRaises(FileNotFoundError):
+                sim.simulate()
+            self.par.plot_mode = PlotMode.BACKGROUND
+            sim = SimulationThread(self.par,figs_dir + "/missing/")
+            sim.simulate()
+            with self.assertRaises(FileNotFoundError):
+                sim.res.wait_plot()
+        finally:
+            shutil.rmtree(figs_dir)
+        
+    def test_parallel_simulate(self):
+        self.par.p = np.array([1e-4, 1e-3, 3e-3])
+        for sim_type in [SimType.FIXED_SEEDS, SimType.FIXED_CONF]:
+            self.par.simulation_type = sim_type
+            self.par.conf_range = 0.05
+            
+            # Serial simulation
+            self.par.n_workers = 1
+            sim_serial = SimulationThread(self.par,"test_figs/serial_")
+            sim_serial.simulate()
+            
+            # Parallel simulation should yield exactly the same results
+            self.par.n_workers = 2
+            sim_parallel = SimulationThread(self.par,"test_figs/parallel_")
+            sim_parallel.simulate()
+            
+            self.assertEqual(sim_serial.res.get_per_list(),\
+                             sim_parallel.res.get_per_list())
+            self.assertEqual(sim_serial.res.get_per_conf(),\
+                             sim_parallel.res.get_per_conf())
+            self.assertEqual(sim_serial.res.get_thrpt_list(),\
+                             sim_parallel.res.get_thrpt_list())
+            self.assertEqual(sim_serial.res.get_thrpt_conf(),\
+                             sim_parallel.res.get_thrpt_conf())
+        
+    def test_result_store(self):
+        store_dir = tempfile.mkdtemp()
+        self.par.p = np.array([1e-4, 1e-3])
+        self.par.results_dir = store_dir
+        for n_workers in [1, 2]:
+            self.par.n_workers = n_workers
+            sim = SimulationThread(self.par,"test_figs/store_")
+            sim.simulate()
+        self.par.results_dir = None
+        
+        # Points of both sweeps are appended, with their replications
+        points = sim.res.get_store().read()
+        reps = sim.res.get_store().read('reps')
+        self.assertTrue(np.all(np.array([1e-4, 1e-3, 1e-4, 1e-3]) == \
+                               points['p']))
+        self.assertTrue(np.all(len(self.par.seeds) == points['n_reps']))
+        self.assertEqual(4*len(self.par.seeds),len(reps['per']))
+        self.assertTrue(np.all(self.par.seeds == \
+                               sim.res.get_store().point_reps(3)['seed']))
+        
+        # Serial and parallel sweeps store the same replications
+        self.assertTrue(np.all(reps['per'][:10] == reps['per'][10:]))
+        self.assertAlmostEqual(points['per'][3],\
+                               np.mean(sim.res.get_store().point_reps(3)['per']))
+        shutil.rmtree(store_dir)
+        
+    def test_checkpoint_resume(self):
+        ckpt_dir = tempfile.mkdtemp()
+        self.par.p = np.array([1e-4, 1e-3, 3e-3])
+        self.par.conf_range = 0.05
+        self.par.checkpoint_interval = 0
+        
+        class CrashingThread(SimulationThread):
+            """Simulation killed after a number of checkpoints."""
+            n_left = 5
+            def checkpoint(self,force = False):
+                super().checkpoint(force)
+                CrashingThread.n_left = CrashingThread.n_left - 1
+                if CrashingThread.n_left == 0:
+                    raise KeyboardInterrupt
+        
+        for sim_type, chan_mod in [(SimType.FIXED_CONF,ChannelModel.CONSTANT),\
+                                   (SimType.FIXED_SEEDS,ChannelModel.MARKOV)]:
+            self.par.simulation_type = sim_type
+            self.par.chan_mod = chan_mod
+            self.par.checkpoint_file = None
+            sim_full = SimulationThread(self.par,"test_figs/full_")
+            sim_full.simulate()
+            
+            # Simulation killed in the middle of the second point
+            self.par.checkpoint_file = ckpt_dir + "/ckpt.pkl"
+            CrashingThread.n_left = len(self.par.seeds) + 3
+            with self.assertRaises(KeyboardInterrupt):
+                CrashingThread(self.par,"test_figs/crash_").simulate()
+                
+            # Resumed simulation should yield exactly the same results
+            sim_resumed = SimulationThread(self.par,"test_figs/resumed_")
+            sim_resumed.simulate(True)
+            self.assertEqual(sim_full.res.get_per_list(),\
+                             sim_resumed.res.get_per_list())
+            self.assertEqual(sim_full.res.get_per_conf(),\
+                             sim_resumed.res.get_per_conf())
+            self.assertEqual(sim_full.res.get_thrpt_list(),\
+                             sim_resumed.res.get_thrpt_list())
+            
+        self.par.checkpoint_file = None
+        self.par.conf_range = 0.01
+        self.par.checkpoint_interval = 60.0
+        shutil.rmtree(ckpt_dir)
+        
+    def test_result_cache(self):
+        cache_dir = tempfile.mkdtemp()
+        self.par.cache_dir = cache_dir
+        for chan_mod in [ChannelModel.CONSTANT, ChannelModel.MARKOV]:
+            self.par.chan_mod = chan_mod
+            self.par.p = np.array([1e-4, 1e-3])
+            sim = SimulationThread(self.par,"test_figs/cache_")
+            sim.simulate()
+            self.assertEqual(0,sim.cache.get_hits())
+            
+            # Only the new point of an extended sweep is simulated
+            self.par.p = np.array([1e-4, 1e-3, 3e-3])
+            sim_cached = SimulationThread(self.par,"test_figs/cache_")
+            sim_cached.simulate()
+            self.assertEqual(2*len(self.par.seeds),sim_cached.cache.get_hits())
+            self.assertEqual(len(self.par.seeds),\
+                             sim_cached.cache.get_misses())
+            
+            # Cached replications give the same results
+            self.par.cache_dir = None
+            sim_full = SimulationThread(self.par,"test_figs/cache_")
+            sim_full.simulate()
+            self.par.cache_dir = cache_dir
+            self.assertEqual(sim_full.res.get_per_list(),\
+                             sim_cached.res.get_per_list())
+            self.assertEqual(sim_full.res.get_thrpt_list(),\
+                             sim_cached.res.get_thrpt_list())
+            
+        self.par.cache_dir = None
+        shutil.rmtree(cache_dir)
+        
+    def test_metrics(self):
+        metrics_dir = tempfile.mkdtemp()
+        self.par.p = np.array([1e-4, 1e-3])
+        self.par.metrics_file = metrics_dir + "/metrics.json"
+        for n_workers in [1, 2]:
+            self.par.n_workers = n_workers
+            sim = SimulationThread(self.par,"test_figs/metrics_")
+            sim.simulate()
+            with open(self.par.metrics_file) as f:
+                snapshot = json.load(f)
+                
+            # Points simulated in workers are counted too
+            n_reps = 2*len(self.par.seeds)
+            self.assertEqual(n_reps,snapshot['replications_total'])
+            self.assertEqual(n_reps*self.par.n_pcks,snapshot['packets_total'])
+            self.assertEqual([[1e-4, 5], [1e-3, 5]],\
+                             snapshot['point_replications'])
+        
+        # Stages of serial simulation are timed
+        self.par.n_workers = 1
+        sim = SimulationThread(self.par,"test_figs/metrics_")
+        sim.simulate()
+        stages = sim.metrics.snapshot()['stages']
+        for stage in ['generate', 'fade', 'error', 'statistics', \
+                      'seed_loop', 'wrap_up', 'plot']:
+            self.assertTrue(stages[stage]['seconds'] > 0)
+        self.assertEqual(2,stages['seed_loop']['calls'])
+        self.assertEqual(2*len(self.par.seeds),stages['fade']['calls'])
+        
+        self.par.metrics_file = None
+        self.assertFalse(SimulationThread(self.par,"").metrics.is_enabled())
+        shutil.rmtree(metrics_dir)
+        
+    def test_progress(self):
+        progress_dir = tempfile.mkdtemp()
+        self.par.p = np.array([1e-4, 1e-3])
+        self.par.progress_file = progress_dir + "/progress.jsonl"
+        for n_workers in [1, 2]:
+            self.par.n_workers = n_workers
+            SimulationThread(self.par,"test_figs/progress_").simulate()
+        self.par.n_workers = 1
+        self.par.progress_file = None
+        
+        with open(progress_dir + "/progress.jsonl") as f:
+            events = [json.loads(line) for line in f]
+        names = [event['event'] for event in events]
+        n_seeds = len(self.par.seeds)
+        
+        # Serial sweep publishes replications, parallel sweep only points
+        serial = ['sweep_started'] + (['point_started'] + \
+                  ['replication']*n_seeds + ['point_finished'])*2 + \
+                  ['sweep_finished']
+        parallel = ['sweep_started'] + ['point_finished']*2 + \
+                   ['sweep_finished']
+        self.assertEqual(serial + parallel,names)
+        
+        reps = [event for event in events if event['event'] == 'replication']
+        self.assertEqual(list(range(1,n_seeds + 1))*2,\
+                         [event['n_reps'] for event in reps])
+        self.assertIsNone(reps[0]['conf_ratio'])
+        self.assertTrue(reps[1]['conf_ratio'] > 0)
+        self.assertTrue(all(event['eta'] >= 0 for event in reps))
+        self.assertEqual(0.0,reps[-1]['eta'])
+        
+        points = [event for event in events \
+                  if event['event'] == 'point_finished']
+        self.assertEqual([1e-4, 1e-3]*2,[event['p'] for event in points])
+        self.assertEqual(points[0]['per'],points[2]['per'])
+        self.assertEqual(2*n_seeds*self.par.n_pcks,events[-1]['n_pcks'])
+        shutil.rmtree(progress_dir)
+        
+    def test_distributed(self):
+        queue_dir = tempfile.mkdtemp()
+        self.par.p = np.array([1e-4, 1e-3, 3e-3])
+        self.par.conf_range = 0.05
+        self.par.queue_block = 2
+        self.par.lease_time = 0.5
+        
+        def dead_worker(claimed):
+            """Claims a unit and dies."""
+            work_queue = WorkQueue(queue_dir)
+            while not claimed and not work_queue.is_stopped():
+                unit_id, unit = work_queue.claim()
+                if unit_id is not None:
+                    claimed.append(unit_id)
+                time.sleep(0.001)
+        
+        for sim_type, chan_mod, seed_mode in \
+            [(SimType.FIXED_CONF,ChannelModel.CONSTANT,SeedMode.LEGACY),\
+             (SimType.FIXED_SEEDS,ChannelModel.MARKOV,SeedMode.LEGACY),\
+             (SimType.FIXED_CONF,ChannelModel.MARKOV,SeedMode.SPAWNED)]:
+            self.par.simulation_type = sim_type
+            self.par.chan_mod = chan_mod
+            self.par.seed_mode = seed_mode
+            self.par.queue_dir = None
+            sim = SimulationThread(self.par,"test_figs/single_")
+            sim.simulate()
+            
+            # Coordinator with two workers, and one that dies
+            self.par.queue_dir = queue_dir
+            WorkQueue(queue_dir).reset()
+            workers = [multiprocessing.Process(target = queue_worker,\
+                                               args = (queue_dir,)) \
+                       for k in range(0,2)]
+            claimed = []
+            dead = threading.Thread(target = dead_worker,args = (claimed,))
+            dead.start()
+            for worker in workers:
+                worker.start()
+            sim_queue = SimulationThread(self.par,"test_figs/queue_")
+            sim_queue.simulate()
+            for worker in workers + [dead]:
+                worker.join()
+            self.assertEqual(1,len(claimed))
+            
+            # Same results of a single node
+            self.assertEqual(sim.res.get_per_list(),\
+                             sim_queue.res.get_per_list())
+            self.assertEqual(sim.res.get_per_conf(),\
+                             sim_queue.res.get_per_conf())
+            self.assertEqual(sim.res.get_thrpt_list(),\
+                             sim_queue.res.get_thrpt_list())
+            self.assertEqual(sim.res.get_converged(),\
+                             sim_queue.res.get_converged())
+            
+        self.par.queue_dir = None
+        self.par.conf_range = 0.01
+        self.par.seed_mode = SeedMode.LEGACY
+        shutil.rmtree(queue_dir)
+        
+    def test_merge_point(self):
+        self.par.simulation_type = SimType.FIXED_CONF
+        self.par.max_time_point = 10.0
+        config = SimConfig.from_parameters(self.par)
+        reps = [(k, k, 1e-3*(k + 1), 50.0 - k, 1000, 0.1) \
+                for k in range(0,4)]
+        now = time.time()
+        
+        # Point started now needs more replications
+        done, n_reps, per_tpl, thrpt_tpl, converged = \
+            merge_point(config,reps,now)
+        self.assertFalse(done)
+        
+        # Point time budget counts from the beginning of point
+        done, n_reps, per_tpl, thrpt_tpl, converged = \
+            merge_point(config,reps,now,now - 11.0)
+        self.assertTrue(done)
+        self.assertFalse(converged)
+        self.assertEqual(2,n_reps)
+        
+    def test_sim_config(self):
+        config = SimConfig.from_parameters(self.par)
+        config = config.replace(p = np.array([1e-4, 1e-3]),\
+                                plot_mode = PlotMode.NONE)
+        
+        # Many configurations in one process
+        sim_short = SimulationThread(config.replace(n_bits = 10),"")
+        sim = SimulationThread(config,"")
+        self.assertEqual(10,sim_short.param.n_bits)
+        self.assertEqual(self.par.n_bits,sim.param.n_bits)
+        sim.simulate()
+        
+        # Same results of a parallel simulation
+        sim_parallel = SimulationThread(config.replace(n_workers = 2),"")
+        sim_parallel.simulate()
+        self.assertEqual(sim.res.get_per_list(),\
+                         sim_parallel.res.get_per_list())
+        
+    def test_spawned_seeds(self):
+        self.par.seed_mode = SeedMode.SPAWNED
+        self.par.root_seed = 7
+        sim = SimulationThread(self.par,"test_figs/spawned_")
+        
+        # Streams are spawned from root seed for each replication
+        self.assertEqual((0,0),sim.station.get_seed().spawn_key)
+        self.assertEqual((0,1),sim.chann.get_seed().spawn_key)
+        sim.new_seed()
+        self.assertEqual(1,sim.get_seed_count())
+        self.assertEqual((1,0),sim.station.get_seed().spawn_key)
+        self.assertEqual(7,sim.chann.get_seed().entropy)
+        sim.reset_seed()
+        self.assertEqual((0,1),sim.chann.get_seed().spawn_key)
+        
+    def test_parallel_replications(self):
+        self.par.seed_mode = SeedMode.SPAWNED
+        self.par.chan_mod = ChannelModel.CONSTANT
+        for sim_type in [SimType.FIXED_SEEDS, SimType.FIXED_CONF]:
+            self.par.simulation_type = sim_type
+            self.par.conf_range = 0.05
+            
+            # Serial replications
+            self.par.n_rep_workers = 1
+            sim = SimulationThread(self.par,"test_figs/rep_")
+            sim.chann.set_p_val(1e-3)
+            sim.seed_loop()
+            per_tpl, thrpt_tpl = sim.stat.iteration_conf()
+            n_reps = sim.stat.get_per_stats().get_n()
+            self.assertTrue(n_reps > 1)
+            
+            # Results should not depend on number and type of workers
+            for executor in [ExecutorType.PROCESS, ExecutorType.THREAD]:
+                self.par.n_rep_workers = 3
+                self.par.rep_executor = executor
+                sim = SimulationThread(self.par,"test_figs/rep_")
+                sim.chann.set_p_val(1e-3)
+                sim.seed_loop()
+                self.assertEqual(n_reps,sim.get_seed_count())
+                self.assertEqual(n_reps,sim.stat.get_per_stats().get_n())
+                self.assertEqual((per_tpl, thrpt_tpl),\
+                                 sim.stat.iteration_conf())
+        
+    def test_budget(self):
+        # Point that can not converge within its packet budget
+        self.par.simulation_type = SimType.FIXED_CONF
+        self.par.conf_range = 1e-6
+        self.par.max_pcks_point = 4000
+        sim = SimulationThread(self.par,"test_figs/budget_")
+        sim.chann.set_p_val(1e-3)
+        sim.seed_loop()
+        self.par.max_pcks_point = None
+        self.par.conf_range = 0.01
+        
+        self.assertEqual(4,sim.stat.get_per_stats().get_n())
+        self.assertFalse(sim.point_converged())
+        self.assertEqual(4000,sim.stopper.get_sweep_pcks())
+        
+        # Convergence is stored with results
+        per_tpl, thrpt_tpl = sim.stat.wrap_up()
+        sim.res.store_res(per_tpl,thrpt_tpl,sim.point_converged())
+        self.assertEqual([False],sim.res.get_converged())
+        
     def test_conf_simulate(self):
         # Create thread with constant confidence and range of 1% of mean
         self.par.simulation_type = SimType.FIXED_CONF
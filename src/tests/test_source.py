@@ -11,6 +11,7 @@ import unittest
 import numpy as np
 
 from src.source import Source
+from src.support.enumerations import RngType
 
 class SourceTest(unittest.TestCase):
     
@@ -66,5 +67,78 @@ class SourceTest(unittest.TestCase):
         pck2 = self.source.generate_packet()
         self.assertFalse(np.all(self.pck == pck2))
         
+    def test_generate_batch(self):
+        # Batch should draw the same bits as sequential packets
+        source = Source(1000,10)
+        pcks = source.generate_batch(3)
+        self.assertEqual((3,1000),pcks.shape)
+        self.assertTrue(np.all(self.pck == pcks[0]))
+        self.assertTrue(np.all(pcks == source.get_last_pck()))
+        
+        # Errors are calculated for each packet in batch
+        pcks2 = np.array(pcks,copy = True)
+        pcks2[1,0:2] = abs(pcks2[1,0:2] - 1)
+        n_errors, pck_error = source.calculate_error(pcks2)
+        self.assertTrue(np.all(np.array([0, 2, 0]) == n_errors))
+        self.assertTrue(np.all(np.array([False, True, False]) == pck_error))
+        
+    def test_packed(self):
+        n_bits = 1001
+        source = Source(n_bits,10,True)
+        self.assertTrue(source.is_packed())
+        self.assertFalse(self.source.is_packed())
+        
+        # Packets are stored in uint8 words, with zeroed padding bits
+        pck = source.generate_packet()
+        self.assertEqual(np.uint8,pck.dtype)
+        self.assertEqual(126,len(pck))
+        self.assertEqual(0,pck[-1] & 0x7F)
+        self.assertAlmostEqual(0.5,np.mean(np.unpackbits(pck)[:n_bits]),\
+                               delta = 0.05)
+        
+        # Errors are counted with popcount
+        n_errors, pck_error = source.calculate_error(pck)
+        self.assertEqual(0,n_errors)
+        self.assertFalse(pck_error)
+        pck2 = np.array(pck,copy = True)
+        pck2[0] ^= 0x81
+        pck2[-1] ^= 0x80
+        n_errors, pck_error = source.calculate_error(pck2)
+        self.assertEqual(3,n_errors)
+        self.assertTrue(pck_error)
+        
+        # Blocks of packets are the same as sequences of packets
+        source.set_seed(3)
+        pck = source.generate_packet()
+        source.set_seed(3)
+        pcks = source.generate_batch(4)
+        self.assertEqual((4,126),pcks.shape)
+        self.assertTrue(np.all(pck == pcks[0]))
+        pcks[2,5] ^= 0x10
+        n_errors, pck_error = source.calculate_error(pcks)
+        self.assertTrue(np.all(np.array([0, 0, 1, 0]) == n_errors))
+        
+    def test_rng_type(self):
+        # Legacy source reproduces RandomState numbers
+        legacy = np.random.RandomState(10)
+        self.assertTrue(np.all(legacy.randint(2,size = 1000) == self.pck))
+        
+        # Generator source draws uint8 bits
+        source = Source(1000,10,rng_type = RngType.SFC64)
+        self.assertEqual(RngType.SFC64,source.get_rnd_state().get_rng_type())
+        pck = source.generate_packet()
+        self.assertEqual(np.uint8,pck.dtype)
+        self.assertAlmostEqual(0.5,np.mean(pck),delta = 0.05)
+        n_errors, pck_error = source.calculate_error(pck)
+        self.assertEqual(0,n_errors)
+        
+        # Generator batches draw the same bits as sequential packets, also 
+        # for sizes that are not whole words
+        source = Source(1001,10,rng_type = RngType.PCG64)
+        pcks = source.generate_batch(3)
+        source.set_seed(10)
+        for k in range(0,3):
+            self.assertTrue(np.all(pcks[k] == source.generate_packet()))
+        
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
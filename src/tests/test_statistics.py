@@ -8,8 +8,10 @@ Created on Mon Mar 27 14:54:10 2017
 """
 
 import unittest
+import numpy as np
 
 from src.statistics import Statistics
+from src.statistics import RunningStats
 
 class StatisticsTest(unittest.TestCase):
     
@@ -35,11 +37,11 @@ class StatisticsTest(unittest.TestCase):
     def test_get_n_pck_errors(self):
         self.assertEqual(0,self.stat.get_n_pck_errors())
         
-    def test_get_per_list(self):
-        self.assertEqual(0,len(self.stat.get_per_list()))
+    def test_get_per_stats(self):
+        self.assertEqual(0,self.stat.get_per_stats().get_n())
         
-    def test_get_thrpt_list(self):
-        self.assertEqual(0,len(self.stat.get_thrpt_list()))
+    def test_get_thrpt_stats(self):
+        self.assertEqual(0,self.stat.get_thrpt_stats().get_n())
         
     def test_pck_received(self):
         self.stat.pck_received(False)
@@ -55,8 +57,29 @@ class StatisticsTest(unittest.TestCase):
         self.assertEqual(0.25,per)
         self.assertEqual(37.5,thrpt)
         
-        self.assertEqual([0.25],self.stat.get_per_list())
-        self.assertEqual([37.5],self.stat.get_thrpt_list())     
+        self.assertEqual(1,self.stat.get_per_stats().get_n())
+        self.assertEqual(0.25,self.stat.get_per_stats().get_mean())
+        self.assertEqual(1,self.stat.get_thrpt_stats().get_n())
+        self.assertEqual(37.5,self.stat.get_thrpt_stats().get_mean())
+        
+    def test_batch_received(self):
+        self.stat.batch_received(np.array([False, False, False, True]))
+        
+        self.assertEqual(4,self.stat.get_n_pcks())
+        self.assertEqual(1,self.stat.get_n_pck_errors())
+        
+        per, thrpt = self.stat.calc_iteration_results()
+        self.assertEqual(0.25,per)
+        self.assertEqual(37.5,thrpt)
+        
+        # Weighted packet errors
+        self.stat.batch_received(np.array([False, True, False, True]),\
+                                 np.array([0.5, 0.25, 2.0, 0.75]))
+        self.assertEqual(1.0,self.stat.get_n_pck_errors())
+        self.stat.pck_received(True,0.5)
+        self.assertEqual(1.5,self.stat.get_n_pck_errors())
+        per, thrpt = self.stat.calc_iteration_results()
+        self.assertEqual(0.3,per)
         
     def test_conf_interval(self):
         # Data with zero standard deviation
@@ -71,6 +94,30 @@ class StatisticsTest(unittest.TestCase):
         self.assertAlmostEqual(4.5e-05,meanVal, delta = 0.05e-05)
         self.assertAlmostEqual(6.42995e-05,interv,delta=0.05e-05)
         
+    def test_iteration_conf(self):
+        # Same confidence interval as the whole data
+        data = [1.0e-04, 5.0e-05, 1.0e-05, 2.0e-05]
+        for per in data:
+            self.stat.store_iteration(per,50*(1 - per))
+        per_tpl, thrpt_tpl = self.stat.iteration_conf()
+        meanVal, interv = self.stat.conf_interval(data)
+        self.assertAlmostEqual(meanVal,per_tpl[0],delta = 1e-15)
+        self.assertAlmostEqual(interv,per_tpl[1],delta = 1e-15)
+        self.assertAlmostEqual(50*interv,thrpt_tpl[1],delta = 1e-12)
+        
+    def test_merge(self):
+        stat2 = Statistics(1000,50,0.95)
+        stat2.store_iteration(0.25,37.5)
+        stat2.store_iteration(0.5,25.0)
+        self.stat.store_iteration(0.0,50.0)
+        self.stat.merge(stat2)
+        
+        per_stats = self.stat.get_per_stats()
+        self.assertEqual(3,per_stats.get_n())
+        self.assertAlmostEqual(0.25,per_stats.get_mean(),delta = 1e-15)
+        self.assertAlmostEqual(0.0625,per_stats.get_var(),delta = 1e-15)
+        self.assertEqual(3,self.stat.get_thrpt_stats().get_n())
+        
     def test_wrap_up(self):
         # Simulating iteration: 4 packets with tha same seed
         self.stat.pck_received(False)
@@ -90,9 +137,11 @@ class StatisticsTest(unittest.TestCase):
         self.assertEqual(0,self.stat.get_n_pcks())
         self.assertEqual(0,self.stat.get_n_pck_errors())
         
-        # calc_iteration_results() should not reset lists, though
-        self.assertEqual([0.25],self.stat.get_per_list())
-        self.assertEqual([37.5],self.stat.get_thrpt_list()) 
+        # calc_iteration_results() should not reset accumulators, though
+        self.assertEqual(1,self.stat.get_per_stats().get_n())
+        self.assertEqual(0.25,self.stat.get_per_stats().get_mean())
+        self.assertEqual(1,self.stat.get_thrpt_stats().get_n())
+        self.assertEqual(37.5,self.stat.get_thrpt_stats().get_mean())
         
         # Simulating another iteration
         self.stat.pck_received(False)
@@ -110,9 +159,56 @@ class StatisticsTest(unittest.TestCase):
         self.assertEqual(37.5,thrpt_tpl[0])
         self.assertEqual(0,thrpt_tpl[1])
         
-        # wrap_up() should reset lists
-        self.assertEqual(0,len(self.stat.get_per_list()))
-        self.assertEqual(0,len(self.stat.get_thrpt_list()))
+        # wrap_up() should reset accumulators
+        self.assertEqual(0,self.stat.get_per_stats().get_n())
+        self.assertEqual(0,self.stat.get_thrpt_stats().get_n())
+        
+class RunningStatsTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.data = np.array([1.0e-04, 5.0e-05, 1.0e-05, 2.0e-05, 7.0e-05])
+        self.acc = RunningStats()
+        for x in self.data:
+            self.acc.add(x)
+        
+    def test_add(self):
+        self.assertEqual(5,self.acc.get_n())
+        self.assertAlmostEqual(np.mean(self.data),self.acc.get_mean(),\
+                               delta = 1e-18)
+        self.assertAlmostEqual(np.var(self.data,ddof = 1),\
+                               self.acc.get_var(),delta = 1e-20)
+        
+        # Variance is undefined with less than two samples
+        acc = RunningStats()
+        acc.add(1.0)
+        self.assertTrue(np.isnan(acc.get_var()))
+        
+    def test_merge(self):
+        acc1 = RunningStats()
+        acc2 = RunningStats()
+        for x in self.data[0:2]:
+            acc1.add(x)
+        for x in self.data[2:]:
+            acc2.add(x)
+        acc1.merge(acc2)
+        
+        # Merged accumulator should have the statistics of all data
+        self.assertEqual(5,acc1.get_n())
+        self.assertAlmostEqual(self.acc.get_mean(),acc1.get_mean(),\
+                               delta = 1e-18)
+        self.assertAlmostEqual(self.acc.get_var(),acc1.get_var(),\
+                               delta = 1e-20)
+        
+        # Merging an empty accumulator changes nothing
+        acc1.merge(RunningStats())
+        self.assertEqual(5,acc1.get_n())
+        
+    def test_conf_interval(self):
+        stat = Statistics(1000,50,0.95)
+        meanVal, interv = stat.conf_interval(self.data)
+        mean_acc, interv_acc = self.acc.conf_interval(0.95)
+        self.assertAlmostEqual(meanVal,mean_acc,delta = 1e-18)
+        self.assertAlmostEqual(interv,interv_acc,delta = 1e-18)
         
 if __name__ == '__main__':
     unittest.main()
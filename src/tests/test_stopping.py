@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+StoppingRule class unit tests.
+
+Created on Sun Oct 18 17:05:12 2026
+
+@author: Calil
+"""
+
+import unittest
+import copy
+import numpy as np
+
+from src.stopping import StoppingRule
+from src.stopping import rel_conf
+from src.stopping import zero_error_conf
+from src.parameters.parameters import Parameters
+from src.support.enumerations import TolType
+
+class StoppingRuleTest(unittest.TestCase):
+    
+    def setUp(self):
+        # Parameters is a singleton: values changed by a test are restored
+        self.par = Parameters(1)
+        self.saved_par = dict(self.par.__dict__)
+        self.par.tol_type = TolType.RELATIVE
+        self.par.conf_range = 0.01
+        self.par.conf_abs = 1e-4
+        self.par.first_rep_batch = 2
+        self.par.rep_batch_growth = 2.0
+        self.par.n_pcks = 1000
+        self.par.n_warm_up_pcks = 10
+        self.par.conf = 0.95
+        self.par.max_pcks_point = None
+        self.par.max_time_point = None
+        self.par.max_pcks_sweep = None
+        self.par.max_time_sweep = None
+        
+        self.stop = StoppingRule(self.par)
+        
+        # Confidence intervals
+        self.wide = ((1e-3, 1e-4), (50.0, 5.0))
+        self.narrow = ((1e-3, 1e-6), (50.0, 5.0))
+        
+    def tearDown(self):
+        self.par.__dict__.clear()
+        self.par.__dict__.update(self.saved_par)
+        
+    def test_rel_conf(self):
+        self.assertEqual(0.1,rel_conf(10.0,1.0))
+        self.assertEqual(np.inf,rel_conf(0.0,0.0))
+        self.assertEqual(np.inf,rel_conf(0.0,1e-3))
+        
+    def test_zero_error_conf(self):
+        # No errors in n packets bound PER by about 3/n at 95%
+        self.assertAlmostEqual(3e-4,zero_error_conf(10000,0.95),delta = 1e-5)
+        self.assertAlmostEqual(0.05,(1 - zero_error_conf(500,0.95))**500)
+        
+    def test_checked_conf(self):
+        # Points with errors are checked as they are
+        self.assertEqual(self.narrow,self.stop.checked_conf(2,*self.narrow))
+        
+        # A PER of 0 +- 0 is checked against the zero-error bound
+        zero = ((0.0, 0.0), (50.0, 0.0))
+        per_tpl, thrpt_tpl = self.stop.checked_conf(2,*zero)
+        bound = zero_error_conf(2*990,0.95)
+        self.assertEqual((0.0, bound),per_tpl)
+        self.assertEqual((50.0, 50.0*bound),thrpt_tpl)
+        
+        # With absolute tolerance, it only converges when the bound is
+        # within tolerance, after about 3e4 packets
+        self.par.tol_type = TolType.ABSOLUTE
+        self.par.rep_batch_growth = 1.0
+        stop = StoppingRule(self.par)
+        self.assertFalse(stop.point_done(2,*zero))
+        self.assertFalse(stop.point_done(30,*zero))
+        self.assertTrue(stop.point_done(32,*zero))
+        self.assertTrue(stop.is_converged())
+        
+    def test_tol_reached(self):
+        self.assertFalse(self.stop.tol_reached(*self.wide))
+        self.assertTrue(self.stop.tol_reached(*self.narrow))
+        
+        # Zero PER should not divide by zero
+        self.assertTrue(self.stop.tol_reached((0.0, 0.0),(50.0, 0.0)))
+        self.assertFalse(self.stop.tol_reached((0.0, 1e-3),(50.0, 5.0)))
+        
+        # Absolute tolerance
+        self.par.tol_type = TolType.ABSOLUTE
+        stop = StoppingRule(self.par)
+        self.assertEqual(TolType.ABSOLUTE,stop.get_tol_type())
+        self.assertTrue(stop.tol_reached(*self.wide))
+        self.assertTrue(stop.tol_reached((0.0, 1e-5),(50.0, 5.0)))
+        self.assertFalse(stop.tol_reached((0.0, 1e-3),(50.0, 5.0)))
+        
+    def test_conf_ratio(self):
+        self.assertAlmostEqual(10.0,self.stop.conf_ratio(*self.wide))
+        self.assertAlmostEqual(0.1,self.stop.conf_ratio(*self.narrow))
+        
+        self.par.tol_type = TolType.ABSOLUTE
+        stop = StoppingRule(self.par)
+        self.assertAlmostEqual(1.0,stop.conf_ratio(*self.wide))
+        self.assertAlmostEqual(10.0,stop.conf_ratio((0.0, 1e-3),(50.0, 5.0)))
+        
+    def test_point_done(self):
+        # Tolerance is only checked at the end of batches of 2, 4, 8...
+        checks = []
+        for n_reps in range(0,20):
+            probe = copy.deepcopy(self.stop)
+            if probe.point_done(n_reps,*self.narrow):
+                checks.append(n_reps)
+            self.assertFalse(self.stop.point_done(n_reps,*self.wide))
+        self.assertEqual([2, 6, 14],checks)
+        self.assertFalse(self.stop.is_converged())
+        
+        # Converged points stop at the end of a batch
+        self.stop.start_point()
+        self.assertFalse(self.stop.point_done(1,*self.narrow))
+        self.assertTrue(self.stop.point_done(2,*self.narrow))
+        self.assertTrue(self.stop.is_converged())
+        
+    def test_get_state(self):
+        # Restored rule should continue the same batches
+        self.assertFalse(self.stop.point_done(2,*self.wide))
+        state = self.stop.get_state()
+        stop = StoppingRule(self.par)
+        stop.set_state(state)
+        self.assertFalse(stop.point_done(5,*self.narrow))
+        self.assertTrue(stop.point_done(6,*self.narrow))
+        
+    def test_budgets(self):
+        # Point packet budget
+        self.par.max_pcks_point = 5000
+        stop = StoppingRule(self.par)
+        self.assertFalse(stop.point_done(4,*self.wide))
+        self.assertTrue(stop.point_done(5,*self.wide))
+        self.assertFalse(stop.is_converged())
+        
+        # Sweep packet budget includes finished points
+        self.par.max_pcks_point = None
+        self.par.max_pcks_sweep = 8000
+        stop = StoppingRule(self.par)
+        stop.end_point(5)
+        self.assertEqual(5000,stop.get_sweep_pcks())
+        stop.start_point()
+        self.assertFalse(stop.point_done(2,*self.wide))
+        self.assertTrue(stop.point_done(3,*self.wide))
+        
+        # Sweep time budget
+        self.par.max_pcks_sweep = None
+        self.par.max_time_sweep = 10.0
+        stop = StoppingRule(self.par)
+        self.assertFalse(stop.point_done(2,*self.wide))
+        stop.start_sweep(stop.get_sweep_start() - 11.0)
+        self.assertTrue(stop.point_done(3,*self.wide))
+        self.assertFalse(stop.is_converged())
+        self.par.max_time_sweep = None
+        
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Sweep class unit tests.
+
+Created on Sun Oct 18 21:10:32 2026
+
+@author: Calil
+"""
+
+import unittest
+import numpy as np
+
+from src.sweep import Sweep
+from src.sweep import job_cost
+from src.sweep import simulate_job
+from src.parameters.config import SimConfig
+from src.support.enumerations import ChannelModel
+from src.support.enumerations import SimType
+from src.support.enumerations import PlotMode
+
+class SweepTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.config = SimConfig(simulation_type = SimType.FIXED_SEEDS,\
+                                seeds = [0, 1, 2],n_pcks = 300,\
+                                p = [1e-3, 1e-2],plot_mode = PlotMode.NONE)
+        self.axes = [('n_bits', [100, 400]),\
+                     ('chan_mod', [ChannelModel.CONSTANT,ChannelModel.MARKOV])]
+        self.sweep = Sweep(self.config,self.axes,1)
+        
+    def test_jobs(self):
+        # p is the last axis
+        self.assertEqual(['n_bits', 'chan_mod', 'p'],\
+                         [name for name, values in self.sweep.get_axes()])
+        self.assertEqual((2, 2, 2),self.sweep.get_shape())
+        
+        jobs = self.sweep.jobs()
+        self.assertEqual(8,len(jobs))
+        index, config = jobs[-1]
+        self.assertEqual((1, 1, 1),index)
+        self.assertEqual(400,config.n_bits)
+        self.assertEqual(ChannelModel.MARKOV,config.chan_mod)
+        self.assertTrue(np.all(np.array([1e-2]) == config.p))
+        
+    def test_ordered_jobs(self):
+        # Long packets first
+        costs = [job_cost(config) for index, config in \
+                 self.sweep.ordered_jobs()]
+        self.assertEqual(sorted(costs,reverse = True),costs)
+        self.assertEqual(400,self.sweep.ordered_jobs()[0][1].n_bits)
+        
+        # With FIXED_CONF, low p first
+        sweep = Sweep(self.config.replace(simulation_type = \
+                                          SimType.FIXED_CONF),[],1)
+        index, config = sweep.ordered_jobs()[0]
+        self.assertEqual(1e-3,config.p[0])
+        
+    def test_run(self):
+        result = self.sweep.run()
+        self.assertEqual((2, 2, 2),result.get_per().shape)
+        self.assertFalse(np.any(np.isnan(result.get_per())))
+        self.assertTrue(np.all(result.get_converged()))
+        self.assertEqual(3,len(result.get_reps((0, 1, 0))))
+        
+        # Results should be close to theory
+        self.assertTrue(np.allclose(result.get_per_theo(),\
+                                    result.get_per(),atol = 0.05))
+        
+        # Jobs are independent: same results on a pool of workers
+        parallel = Sweep(self.config,self.axes,2).run()
+        self.assertTrue(np.all(result.get_per() == parallel.get_per()))
+        self.assertTrue(np.all(result.get_thrpt_conf() == \
+                               parallel.get_thrpt_conf()))
+        
+        # Same results of a single job
+        index, config = self.sweep.jobs()[3]
+        per_tpl, thrpt_tpl, converged, reps, theo = simulate_job(config)
+        self.assertEqual(per_tpl[0],result.get_per()[index])
+        
+if __name__ == '__main__':
+    unittest.main()
@@ -12,6 +12,9 @@ import numpy as np
 
 from src.support.enumerations import ChannelModel
 from src.theoretical import Theoretical
+from src.theoretical import steady_state
+from src.theoretical import is_bias
+from src.theoretical import is_rel_var
 from src.parameters.parameters import Parameters
 
 class TheoreticalTest(unittest.TestCase):
@@ -39,9 +42,7 @@ class TheoreticalTest(unittest.TestCase):
         param.chan_mod = ChannelModel.MARKOV
         param.p = np.array([0.5, 1.0e-4])
         
-        # Ideal channel object
-        with self.assertRaises(NotImplementedError):
-            self.theo_markov = Theoretical(param)
+        self.theo_markov = Theoretical(param)
         
     def test_get_model(self):
         mod = self.theo.get_model()
@@ -75,9 +76,43 @@ class TheoreticalTest(unittest.TestCase):
         self.assertAlmostEqual(0,thrpt[0],delta = 0.05)
         self.assertAlmostEqual(45.242,thrpt[1],delta = 0.05)
             
-        # For now, Markov channel sould return exception
-        with self.assertRaises(NotImplementedError):
-            ber, per, thrpt = self.theo.validate_markov()
+        # Markov channel with default matrix: states 0.8, 0.1 and 0.1
+        ber, per, thrpt = self.theo_markov.validate()
+        self.assertEqual(2,len(per))
+        self.assertAlmostEqual(0.2,per[0],delta = 1e-9)
+        self.assertAlmostEqual(0.1*0.5 + 0.1*1e-4,ber[1],delta = 1e-12)
+        self.assertAlmostEqual(0.1 + 0.1*9.517e-2,per[1],delta = 1e-4)
+        self.assertTrue(np.allclose(50*(1 - per),thrpt))
+        
+    def test_is_bias(self):
+        # Unbiased relative variance is (1 - PER)/PER
+        per = 1 - (1 - 1e-6)**1000
+        self.assertAlmostEqual((1 - per)/per,is_rel_var(1e-6,1e-6,1000),\
+                               delta = 1e-6)
+        
+        # Bias at low p should reduce the variance by orders of magnitude
+        q_val = is_bias(1e-6,1000)
+        self.assertTrue(1e-4 < q_val < 1e-2)
+        self.assertTrue(is_rel_var(1e-6,q_val,1000) < 10)
+        
+        # No bias when it does not help
+        self.assertEqual(0.1,is_bias(0.1,1000))
+        self.assertEqual(0,is_bias(0,1000))
+        
+    def test_markov_solve(self):
+        ps = self.theo_markov.get_state_ps()
+        self.assertTrue(np.allclose([0.8, 0.1, 0.1],ps))
+        
+        # Steady state of a chain with unequal rows
+        mtx = ((0.9, 0.1, 0.0), (0.5, 0.0, 0.5), (0.0, 0.5, 0.5))
+        ps = np.array(steady_state(mtx))
+        self.assertAlmostEqual(1.0,np.sum(ps))
+        self.assertTrue(np.allclose(ps,ps @ np.array(mtx)))
+        
+        # Solutions are cached per matrix
+        hits = steady_state.cache_info().hits
+        steady_state(mtx)
+        self.assertEqual(hits + 1,steady_state.cache_info().hits)
     
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+WorkQueue class unit tests.
+
+Created on Mon Oct 19 01:38:20 2026
+
+@author: Calil
+"""
+
+import os
+import time
+import shutil
+import tempfile
+import unittest
+
+from src.work_queue import WorkQueue
+from src.work_queue import LeaseKeeper
+
+class WorkQueueTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.queue_dir = tempfile.mkdtemp()
+        self.queue = WorkQueue(self.queue_dir)
+        
+    def tearDown(self):
+        shutil.rmtree(self.queue_dir)
+        
+    def leased_file(self,unit_id):
+        return os.path.join(self.queue_dir,'leased',unit_id + '.pkl')
+        
+    def test_get_queue_dir(self):
+        self.assertEqual(self.queue_dir,self.queue.get_queue_dir())
+        
+    def test_claim(self):
+        self.assertEqual((None, None),self.queue.claim())
+        self.queue.put('b',{'rep': 1})
+        self.queue.put('a',{'rep': 0})
+        self.assertEqual(2,self.queue.n_units())
+        
+        # Units are claimed once, in sorted order
+        self.assertEqual(('a', {'rep': 0}),self.queue.claim())
+        self.assertEqual(('b', {'rep': 1}),self.queue.claim())
+        self.assertEqual((None, None),self.queue.claim())
+        self.assertEqual(2,self.queue.n_units('leased'))
+        
+        self.queue.complete('a',[0.1])
+        self.assertEqual(1,self.queue.n_units('leased'))
+        self.assertEqual([('a', [0.1])],self.queue.results())
+        self.assertEqual([],self.queue.results())
+        
+    def test_requeue_expired(self):
+        self.queue.put('a',1)
+        self.queue.put('b',2)
+        self.queue.claim()
+        self.queue.claim()
+        
+        # Worker of a died, worker of b renews its lease
+        past = time.time() - 10
+        os.utime(self.leased_file('a'),(past, past))
+        os.utime(self.leased_file('b'),(past, past))
+        self.queue.renew('b')
+        self.assertEqual(['a'],self.queue.requeue_expired(5.0))
+        self.assertEqual(('a', 1),self.queue.claim())
+        self.assertEqual([],self.queue.requeue_expired(5.0))
+        
+        # Result of a unit queued again is still collected
+        self.queue.renew('c')
+        self.queue.complete('c',3)
+        self.assertEqual([('c', 3)],self.queue.results())
+        
+        # Units queued longer than the lease time get a full lease
+        self.queue.put('d',4)
+        todo = os.path.join(self.queue_dir,'todo','d.pkl')
+        os.utime(todo,(past, past))
+        self.assertEqual(('d', 4),self.queue.claim())
+        self.assertEqual([],self.queue.requeue_expired(5.0))
+        
+    def test_lease_keeper(self):
+        self.queue.put('a',1)
+        self.queue.claim()
+        past = time.time() - 10
+        os.utime(self.leased_file('a'),(past, past))
+        with LeaseKeeper(self.queue,'a',0.01):
+            time.sleep(0.1)
+        self.assertEqual([],self.queue.requeue_expired(5.0))
+        
+    def test_stop(self):
+        self.assertFalse(self.queue.is_stopped())
+        self.queue.stop()
+        self.assertTrue(self.queue.is_stopped())
+        self.queue.put('a',1)
+        
+        self.queue.reset()
+        self.assertFalse(self.queue.is_stopped())
+        self.assertEqual(0,self.queue.n_units())
+        
+        # Queuing units removes the stop file of a previous sweep
+        self.queue.stop()
+        self.assertIsNotNone(self.queue.get_stop_time())
+        self.queue.put('a',1)
+        self.assertIsNone(self.queue.get_stop_time())
+        self.assertFalse(self.queue.is_stopped())
+        
+        # Workers ignore a stop file older than themselves
+        self.queue.stop()
+        stale = self.queue.get_stop_time()
+        self.assertFalse(self.queue.is_stopped(stale))
+        self.queue.reset()
+        self.queue.stop()
+        self.assertTrue(self.queue.is_stopped(stale))
+        
+if __name__ == '__main__':
+    unittest.main()
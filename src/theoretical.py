@@ -8,8 +8,79 @@ Created on Sun Apr  2 11:16:43 2017
 """
 
 import numpy as np
+from functools import lru_cache
 from src.support.enumerations import ChannelModel
 
+@lru_cache(maxsize = 256)
+def steady_state(mtx_rows):
+    """
+    Solves the steady state probabilities of a Markov chain, pi*T = pi with
+    sum(pi) = 1, as a linear system. Solutions are cached, since the same 
+    chain is solved for every point of a parameter grid.
+    
+    Keyword parameters:
+        mtx_rows -- transition matrix, as a tuple of row tuples
+        
+    Returns:
+        state_probs -- tuple of state probabilities
+    """
+    mtx = np.array(mtx_rows,dtype = np.float64)
+    n_states = len(mtx)
+    
+    # One of the balance equations is redundant: replace it by sum(pi) = 1
+    a_mtx = mtx.T - np.eye(n_states)
+    a_mtx[-1,:] = 1.0
+    b_vec = np.zeros(n_states)
+    b_vec[-1] = 1.0
+    return tuple(np.linalg.solve(a_mtx,b_vec))
+
+def is_rel_var(p_val,q_val,n_bits):
+    """
+    Relative variance of the PER estimate of one packet, sent with biased
+    BER q_val and weighted by its likelihood ratio, for a constant channel
+    with BER p_val. q_val = p_val gives the variance without bias.
+    
+    Keyword parameters:
+        p_val -- BER of channel
+        q_val -- biased BER, scalar or numpy array
+        n_bits -- number of bits per packet
+        
+    Returns:
+        rel_var -- variance of weighted packet error, divided by PER**2
+    """
+    q_val = np.asarray(q_val,dtype = np.float64)
+    per = -np.expm1(n_bits*np.log1p(-p_val))
+    
+    # Second moment of weight: a**n - b**n, computed as b**n*((a/b)**n - 1)
+    log_a = np.log(p_val**2/q_val + (1 - p_val)**2/(1 - q_val))
+    log_b = np.log((1 - p_val)**2/(1 - q_val))
+    with np.errstate(over = 'ignore'):
+        second = np.exp(n_bits*log_b)*np.expm1(n_bits*(log_a - log_b))
+    return second/per**2 - 1
+
+@lru_cache(maxsize = 1024)
+def is_bias(p_val,n_bits,n_grid = 512):
+    """
+    Chooses the biased BER of importance sampling, minimizing the relative
+    variance over a log grid between p_val and 0.5. Values are cached, 
+    since the same BER is set for every replication of a point.
+    
+    Keyword parameters:
+        p_val -- BER of channel
+        n_bits -- number of bits per packet
+        n_grid -- number of points of grid
+        
+    Returns:
+        q_val -- biased BER, p_val itself if no bias reduces the variance
+    """
+    if p_val <= 0 or p_val >= 0.5:
+        return p_val
+    q_grid = np.logspace(np.log10(p_val),np.log10(0.5),n_grid)
+    rel_var = is_rel_var(p_val,q_grid,n_bits)
+    rel_var[np.isnan(rel_var)] = np.inf
+    best = int(np.argmin(rel_var))
+    return float(q_grid[best]) if rel_var[best] < rel_var[0] else p_val
+
 class Theoretical(object):
     
     def __init__(self,param):
@@ -18,6 +89,7 @@ class Theoretical(object):
             self.__model -- parameters object
             self.__p -- PER numpy array
             self.__state_ps -- state probabilities for Markov channel
+            self.__transition_mtx -- transition matrix of Markov channel
         
         Keyword parameters:
            model -- channel model
@@ -27,6 +99,7 @@ class Theoretical(object):
         self.__p = param.p
         self.__tx_rate = param.tx_rate
         self.__model = param.chan_mod
+        self.__transition_mtx = np.asarray(param.transition_mtx)
         if self.__model == ChannelModel.MARKOV:
             self.__state_ps = self.markov_solve()
         else:
@@ -67,6 +140,10 @@ class Theoretical(object):
         """Getter for number of bits per packet."""
         return self.__n_bits
     
+    def get_transition_mtx(self):
+        """Getter for transition matrix of Markov channel."""
+        return self.__transition_mtx
+    
     def get_state_ps(self):
         """Getter for state probabilities."""
         return self.__state_ps
@@ -101,15 +178,26 @@ class Theoretical(object):
     
     def validate_markov(self):
         """
-        Calculates theoretical BER, PER and Throughput for Markov channel.
+        Calculates theoretical BER, PER and Throughput for Markov channel,
+        for all values of p at once. Each packet sees the BER of its state:
+        0 in state 0, 0.5 in state 1 and p in state 2.
         
         Returns:
             ber_mean -- theoretical mean value of BER
             per_mean -- theoretical mean value of PER
             thrpt_mean -- theoretical mean value of Throughput
         """
-        raise NotImplementedError
+        p = np.asarray(self.get_p(),dtype = np.float64)
+        state_ps = self.get_state_ps()
         
+        # (n_states x n_p) BER and PER of each state
+        state_ber = np.array([np.zeros_like(p), 0.5*np.ones_like(p), p])
+        state_per = 1 - np.power(1 - state_ber,self.__n_bits)
+        
+        ber_mean = state_ps @ state_ber
+        per_mean = state_ps @ state_per
+        thrpt_mean = self.get_tx_rate()*(1 - per_mean)
+        return ber_mean, per_mean, thrpt_mean
         
     def markov_solve(self):
         """
@@ -119,4 +207,6 @@ class Theoretical(object):
         Returns:
             state_probs -- numpy array of state probabilities
         """
-        raise NotImplementedError
\ No newline at end of file
+        mtx_rows = tuple(map(tuple,np.asarray(self.get_transition_mtx(),\
+                                              dtype = np.float64)))
+        return np.array(steady_state(mtx_rows))
\ No newline at end of file
@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""
+WorkQueue class: file-based queue of work units, shared by a coordinator
+and workers running on any host that mounts the queue directory.
+
+A unit moves between three sub-directories:
+    todo   -- queued by the coordinator
+    leased -- claimed by a worker, by an atomic rename. The worker touches
+              the file while it works, and the coordinator queues it again
+              when it is not touched for a lease time, e.g. because the
+              worker died
+    done   -- result written by the worker
+A stop file tells the workers that the sweep is over. It is removed when
+units are queued, and workers ignore a stop file that was already there
+when they started, left by a previous sweep.
+
+Files are written to a temporary name and renamed, so a unit or result is
+never seen half written.
+
+Created on Mon Oct 19 01:03:58 2026
+
+@author: Calil
+"""
+
+import os
+import time
+import pickle
+import socket
+import threading
+
+# Sub-directories of a queue
+DIRS = ['todo', 'leased', 'done']
+
+# Time between polls of the queue, in seconds
+POLL_INTERVAL = 0.1
+
+class WorkQueue(object):
+
+    def __init__(self,queue_dir):
+        """
+        Class constructor. Creates the queue directories, if needed.
+
+        Keyword parameters:
+            queue_dir -- directory of queue
+        """
+        self.__queue_dir = queue_dir
+        for name in DIRS:
+            os.makedirs(os.path.join(queue_dir,name),exist_ok = True)
+
+    def get_queue_dir(self):
+        """Returns directory of queue."""
+        return self.__queue_dir
+
+    def reset(self):
+        """Removes all units, results and the stop file."""
+        for name in DIRS:
+            for unit_id in self.__list(name):
+                self.__remove(self.__file(name,unit_id))
+        self.__remove(self.__stop_file())
+
+    def put(self,unit_id,unit):
+        """
+        Queues a unit.
+
+        Keyword parameters:
+            unit_id -- unit identifier, units are claimed in sorted order
+            unit -- picklable unit
+        """
+        self.__remove(self.__stop_file())
+        self.__write(self.__file('todo',unit_id),unit)
+
+    def claim(self):
+        """
+        Claims the first queued unit. The unit is touched before it is
+        renamed, since the rename keeps the time it was queued, and a unit
+        queued longer than the lease time would be taken as expired.
+
+        Returns:
+            unit_id -- unit identifier, None if no unit is queued
+            unit -- unit, None if no unit is queued
+        """
+        for unit_id in sorted(self.__list('todo')):
+            todo = self.__file('todo',unit_id)
+            leased = self.__file('leased',unit_id)
+            try:
+                os.utime(todo)
+                os.rename(todo,leased)
+                with open(leased,'rb') as f:
+                    return unit_id, pickle.load(f)
+            except OSError:
+                # Claimed by another worker, or queued again
+                continue
+        return None, None
+
+    def renew(self,unit_id):
+        """
+        Renews the lease of a claimed unit.
+
+        Keyword parameters:
+            unit_id -- unit identifier
+        """
+        try:
+            os.utime(self.__file('leased',unit_id))
+        except OSError:
+            # Lease expired and unit queued again
+            pass
+
+    def complete(self,unit_id,result):
+        """
+        Stores the result of a claimed unit and releases it.
+
+        Keyword parameters:
+            unit_id -- unit identifier
+            result -- picklable result
+        """
+        self.__write(self.__file('done',unit_id),result)
+        self.__remove(self.__file('leased',unit_id))
+
+    def results(self):
+        """
+        Collects the results written by workers, removing them from the
+        queue.
+
+        Returns:
+            results -- list of (unit_id, result) pairs
+        """
+        results = []
+        for unit_id in sorted(self.__list('done')):
+            done = self.__file('done',unit_id)
+            with open(done,'rb') as f:
+                results.append((unit_id, pickle.load(f)))
+            self.__remove(done)
+        return results
+
+    def requeue_expired(self,lease_time):
+        """
+        Queues again the units whose lease was not renewed.
+
+        Keyword parameters:
+            lease_time -- time without renewal after which a worker is
+                          taken as dead, in seconds
+
+        Returns:
+            unit_ids -- list of identifiers of units queued again
+        """
+        unit_ids = []
+        now = time.time()
+        for unit_id in self.__list('leased'):
+            leased = self.__file('leased',unit_id)
+            try:
+                if now - os.path.getmtime(leased) < lease_time:
+                    continue
+                os.rename(leased,self.__file('todo',unit_id))
+            except OSError:
+                # Completed in the meantime
+                continue
+            unit_ids.append(unit_id)
+        return unit_ids
+
+    def n_units(self,name = 'todo'):
+        """
+        Returns the number of units in a sub-directory.
+
+        Keyword parameters:
+            name -- 'todo', 'leased' or 'done'
+        """
+        return len(self.__list(name))
+
+    def stop(self):
+        """Tells the workers to exit."""
+        with open(self.__stop_file(),'w'):
+            pass
+
+    def get_stop_time(self):
+        """
+        Returns the modification time of the stop file, in nanoseconds, 
+        None if there is none.
+        """
+        try:
+            return os.stat(self.__stop_file()).st_mtime_ns
+        except OSError:
+            return None
+
+    def is_stopped(self,stale = None):
+        """
+        Returns True if workers must exit.
+
+        Keyword parameters:
+            stale -- stop time to ignore, returned by get_stop_time() when 
+                     the worker started
+        """
+        stop_time = self.get_stop_time()
+        return stop_time is not None and stop_time != stale
+
+    def __stop_file(self):
+        """Returns the stop file."""
+        return os.path.join(self.get_queue_dir(),'stop')
+
+    def __file(self,name,unit_id):
+        """Returns the file of a unit in a sub-directory."""
+        return os.path.join(self.get_queue_dir(),name,unit_id + '.pkl')
+
+    def __list(self,name):
+        """Returns the identifiers of the units in a sub-directory."""
+        return [file_name[:-4] for file_name in \
+                os.listdir(os.path.join(self.get_queue_dir(),name)) \
+                if file_name.endswith('.pkl')]
+
+    def __write(self,file_name,obj):
+        """Writes an object atomically, through a temporary file."""
+        tmp_name = os.path.join(self.get_queue_dir(),\
+                                os.path.basename(file_name) + '.' + \
+                                socket.gethostname() + '.' + \
+                                str(os.getpid()) + '.tmp')
+        with open(tmp_name,'wb') as f:
+            pickle.dump(obj,f,protocol = pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_name,file_name)
+
+    def __remove(self,file_name):
+        """Removes a file, if it exists."""
+        try:
+            os.remove(file_name)
+        except OSError:
+            pass
+
+class LeaseKeeper(object):
+
+    def __init__(self,work_queue,unit_id,interval):
+        """
+        Class constructor. Renews the lease of a unit from a background
+        thread, while a worker simulates it.
+
+        Keyword parameters:
+            work_queue -- WorkQueue object
+            unit_id -- unit identifier
+            interval -- time between renewals, in seconds
+        """
+        self.__queue = work_queue
+        self.__unit_id = unit_id
+        self.__interval = interval
+        self.__stop = threading.Event()
+        self.__thread = threading.Thread(target = self.__run,daemon = True)
+
+    def __enter__(self):
+        self.__thread.start()
+        return self
+
+    def __exit__(self,exc_type,exc_value,traceback):
+        self.__stop.set()
+        self.__thread.join()
+
+    def __run(self):
+        """Renews the lease until stopped."""
+        while not self.__stop.wait(self.__interval):
+            self.__queue.renew(self.__unit_id)